@@ -1,13 +1,16 @@
 import streamlit as st
-import hashlib
 from typing import Optional, Tuple
-from database import User, SessionLocal
+from sqlalchemy import select, update
+from database import User, SessionLocal, bootstrap_db
 from database import User, SessionLocal, Student, Teacher
+from passwords import hash_password, verify_password
+from sessions import create_session, resolve_session, revoke_session, revoke_user_sessions, SESSION_TTL
+from permissions import acts_as, can, get_permissions
 
+# Cookie carrying the signed session token, so a browser refresh keeps the login.
+# It is never put in the URL, where it would end up in history, Referer headers and shared links.
+SESSION_COOKIE = "cm_session"
 
-def hash_password(password: str) -> str:
-    """Hash a password for storing."""
-    return hashlib.sha256(password.encode()).hexdigest()
 
 def init_auth():
     """Initialize authentication state"""
@@ -18,36 +21,92 @@ def init_auth():
     if 'username' not in st.session_state:
         st.session_state.username = None
     
-    # Check if admin user exists, if not create one
-    db = SessionLocal()
-    try:
-        admin_user = db.query(User).filter(User.username == 'admin').first()
-        if not admin_user:
-            # Create default admin user
-            admin_user = User(
-                username='admin',
-                password=hash_password('admin123'),
-                role='admin'
-            )
-            db.add(admin_user)
-            db.commit()
-            print("Default admin user created")
-    except Exception as e:
-        print(f"Error checking for admin user: {str(e)}")
-    finally:
-        db.close()
+    # Tables and the default admin account are set up once per process, not on every rerun
+    bootstrap_db()
+    _restore_session()
+    _write_session_cookie()
+
+def _set_session_state(record: Optional[dict]):
+    st.session_state.authenticated = record is not None
+    st.session_state.user_role = record['role'] if record else None
+    st.session_state.username = record['username'] if record else None
+
+def _cookie_token() -> Optional[str]:
+    """The token cookie the browser sent when this tab connected, unless it has been dropped since."""
+    token = st.context.cookies.get(SESSION_COOKIE)
+    if token and token != st.session_state.get('dropped_session_cookie'):
+        return token
+    return None
+
+def _session_token() -> Optional[str]:
+    return st.session_state.get('session_token') or _cookie_token()
+
+def _set_session_cookie(token: Optional[str]):
+    """Queue setting (or with None, clearing) the token cookie; written by the next init_auth."""
+    st.session_state.pending_session_cookie = token or ""
+
+def _write_session_cookie():
+    """Write a queued cookie change in the browser.
+
+    Streamlit cannot send Set-Cookie headers, so the cookie is set from a
+    script; it is not HttpOnly, but SameSite=Strict and Secure over HTTPS.
+    """
+    token = st.session_state.pop('pending_session_cookie', None)
+    if token is None:
+        return
+    max_age = SESSION_TTL if token else 0
+    st.html(
+        f"<script>document.cookie = '{SESSION_COOKIE}={token}; Path=/; Max-Age={max_age}; SameSite=Strict'"
+        " + (location.protocol === 'https:' ? '; Secure' : '');</script>",
+        unsafe_allow_javascript=True
+    )
+
+def _drop_cookie_token():
+    """Stop using the token cookie this tab connected with and clear it in the browser."""
+    token = st.context.cookies.get(SESSION_COOKIE)
+    if token:
+        # st.context.cookies keeps the connect-time value until the page reloads
+        st.session_state.dropped_session_cookie = token
+        _set_session_cookie(None)
+
+def current_session() -> Optional[dict]:
+    """The session record behind this browser tab, from the session store (never the users table)."""
+    token = _session_token()
+    return resolve_session(token) if token else None
+
+def _restore_session():
+    """Sync the login state with the session store: restore it after a refresh, drop it once revoked or expired."""
+    token = _session_token()
+    record = resolve_session(token) if token else None
+    if record is not None:
+        st.session_state.session_token = token
+        _set_session_state(record)
+    elif st.session_state.authenticated or token:
+        st.session_state.pop('session_token', None)
+        _drop_cookie_token()
+        _set_session_state(None)
 
 def login(username: str, password: str) -> bool:
     """Authenticate a user and set up their session using database."""
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.username == username).first()
-        if user and user.password == hash_password(password):
-            st.session_state.authenticated = True
-            st.session_state.user_role = user.role
-            st.session_state.username = username
-            return True
-        return False
+        user = db.execute(
+            select(User.id, User.password, User.role).where(User.username == username)
+        ).first()
+        if not user:
+            return False
+        matches, needs_rehash = verify_password(password, user.password)
+        if not matches:
+            return False
+        if needs_rehash:
+            # Upgrade legacy SHA-256 (or outdated cost) hashes now that we know the password
+            db.execute(update(User).where(User.id == user.id).values(password=hash_password(password)))
+            db.commit()
+        token = create_session(username, user.role)
+        st.session_state.session_token = token
+        _set_session_cookie(token)
+        _set_session_state({'username': username, 'role': user.role})
+        return True
     except Exception as e:
         print(f"Login error: {str(e)}")
         return False
@@ -55,14 +114,17 @@ def login(username: str, password: str) -> bool:
         db.close()
 
 def logout():
-    """Clear the session state."""
-    st.session_state.authenticated = False
-    st.session_state.user_role = None
-    st.session_state.username = None
+    """Revoke the server-side session and clear the session state."""
+    token = st.session_state.pop('session_token', None)
+    if token:
+        revoke_session(token)
+    _drop_cookie_token()
+    _set_session_cookie(None)
+    _set_session_state(None)
 
 def register_user(username: str, password: str, role: str) -> Tuple[bool, str]:
     """Register a new user in the database."""
-    if role not in ['admin', 'teacher', 'student']:
+    if role not in get_permissions().capabilities:
         return False, "Invalid role"
     
     db = SessionLocal()
@@ -132,7 +194,7 @@ def show_login_form():
 
 def show_register_form():
     """Display the registration form."""
-    if st.session_state.get('user_role') != 'admin':
+    if not can(st.session_state.get('user_role'), 'manage_users'):
         st.error("Only administrators can register new users")
         return
 
@@ -150,19 +212,40 @@ def show_register_form():
             else:
                 st.error(message)
 
-def require_auth(role: Optional[str] = None):
-    """Decorator to require authentication and optionally a specific role."""
+def change_user_role(username: str, role: str) -> Tuple[bool, str]:
+    """Change a user's role and log them out everywhere so their sessions pick up the new permissions."""
+    if role not in get_permissions().capabilities:
+        return False, "Invalid role"
+
+    db = SessionLocal()
+    try:
+        updated = db.execute(update(User).where(User.username == username).values(role=role)).rowcount
+        if not updated:
+            return False, "User not found"
+        db.commit()
+        revoke_user_sessions(username)
+        return True, "Role updated"
+    except Exception as e:
+        db.rollback()
+        return False, f"Role update error: {str(e)}"
+    finally:
+        db.close()
+
+def require_auth(role: Optional[str] = None, capability: Optional[str] = None):
+    """Decorator to require authentication and optionally a role (or a role inheriting it) or a capability."""
     def decorator(func):
         def wrapper(*args, **kwargs):
-            if not st.session_state.authenticated:
+            # Checked against the session store so revoked or expired sessions are refused immediately
+            session = current_session()
+            if session is None:
                 st.error("Please log in to access this page")
                 show_login_form()
                 return
 
-            if role and st.session_state.user_role != role and st.session_state.user_role != 'admin':
+            if (role and not acts_as(session['role'], role)) or (capability and not can(session['role'], capability)):
                 st.error("You don't have permission to access this page")
                 return
 
             return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
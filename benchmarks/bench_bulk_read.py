@@ -0,0 +1,57 @@
+"""Compare the ORM roster read with the columnar bulk-read path.
+
+Usage: python -m benchmarks.bench_bulk_read [sizes...]   (default: 10000 100000 1000000)
+"""
+import sys
+
+import pandas as pd
+
+from benchmarks.common import use_sqlite, seed_students, timed, print_table
+from bulk_read import fetch_frame, STUDENT_COLUMNS
+from database import SessionLocal, Student
+
+
+def orm_get_all_students():
+    """The previous implementation: full ORM objects copied into dicts."""
+    db = SessionLocal()
+    try:
+        students = db.query(Student).all()
+        return pd.DataFrame([
+            {
+                'ID': str(s.id),
+                'Name': s.name,
+                'Department': s.department,
+                'Year': s.year,
+                'Email': s.email,
+                'Phone': s.phone
+            }
+            for s in students
+        ])
+    finally:
+        db.close()
+
+
+def main(sizes):
+    rows = []
+    for size in sizes:
+        engine = use_sqlite()
+        seed_students(engine, size)
+        results = {}
+        with timed(results, 'orm'):
+            orm_frame = orm_get_all_students()
+        with timed(results, 'columnar'):
+            fetch_frame(STUDENT_COLUMNS, use_arrow=False)
+        with timed(results, 'arrow'):
+            arrow_frame = fetch_frame(STUDENT_COLUMNS)
+        with timed(results, 'arrow_chunked'):
+            fetch_frame(STUDENT_COLUMNS, chunk_size=50000)
+        assert list(arrow_frame.columns) == list(orm_frame.columns)
+        assert (arrow_frame.dtypes == orm_frame.dtypes).all()
+        rows.append([size] + [f"{results[k]:.0f}" for k in ('orm', 'columnar', 'arrow', 'arrow_chunked')]
+                    + [f"{results['orm'] / results['arrow']:.1f}x"])
+        engine.dispose()
+    print_table(['rows', 'orm_ms', 'columnar_ms', 'arrow_ms', 'chunked_ms', 'speedup'], rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
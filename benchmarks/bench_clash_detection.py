@@ -0,0 +1,89 @@
+"""Benchmark the timetable clash index against a linear scan.
+
+Usage: python -m benchmarks.bench_clash_detection [sections]   (default: 50000)
+"""
+import random
+import sys
+import time
+from datetime import time as clock
+
+from sqlalchemy import insert
+
+from benchmarks.common import use_sqlite, print_table
+from clash_detection import ClashIndex, to_minutes
+from database import SessionLocal, ClassSchedule, Course, Teacher
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+SEMESTERS = ["Fall 2025", "Spring 2026"]
+
+
+def make_sections(count, rooms, teachers):
+    random.seed(7)
+    sections = []
+    for i in range(count):
+        start = random.randrange(8 * 60, 18 * 60, 30)
+        end = start + random.choice([60, 90, 120])
+        sections.append({
+            'id': i + 1, 'course_id': 1, 'teacher_id': random.randint(1, teachers),
+            'day_of_week': random.choice(DAYS), 'semester': random.choice(SEMESTERS),
+            'start_time': clock(start // 60, start % 60), 'end_time': clock(end // 60, end % 60),
+            'room_number': f"R{random.randint(1, rooms)}"
+        })
+    return sections
+
+
+def linear_conflicts(sections, probe):
+    """The naive approach: compare against every section."""
+    start, end = to_minutes(probe['start_time']), to_minutes(probe['end_time'])
+    return [
+        s['id'] for s in sections
+        if s['semester'] == probe['semester'] and s['day_of_week'] == probe['day_of_week']
+        and (s['room_number'] == probe['room_number'] or s['teacher_id'] == probe['teacher_id'])
+        and to_minutes(s['start_time']) < end and start < to_minutes(s['end_time'])
+    ]
+
+
+def main(count):
+    sections = make_sections(count, rooms=count // 20, teachers=count // 10)
+    probes = make_sections(1000, rooms=count // 20, teachers=count // 10)
+
+    engine = use_sqlite()
+    with engine.begin() as conn:
+        conn.execute(insert(Course).values(course_code="B1", title="Bench", department="CS", credit_hours=3))
+        conn.execute(insert(Teacher), [
+            {'name': f"T{i}", 'department': "CS", 'subjects': "x", 'email': "t@x.io", 'phone': "0123456789"}
+            for i in range(count // 10)
+        ])
+        conn.execute(insert(ClassSchedule), sections)
+
+    index = ClashIndex()
+    db = SessionLocal()
+    started = time.perf_counter()
+    index.load(db)
+    load_ms = (time.perf_counter() - started) * 1000
+    db.close()
+
+    started = time.perf_counter()
+    for probe in probes:
+        index.conflicts(probe['semester'], probe['day_of_week'], probe['start_time'], probe['end_time'],
+                        probe['room_number'], probe['teacher_id'])
+    index_us = (time.perf_counter() - started) * 1e6 / len(probes)
+
+    sample = probes[:50]
+    started = time.perf_counter()
+    for probe in sample:
+        linear_conflicts(sections, probe)
+    linear_us = (time.perf_counter() - started) * 1e6 / len(sample)
+
+    for probe in sample:
+        found = index.conflicts(probe['semester'], probe['day_of_week'], probe['start_time'], probe['end_time'],
+                                probe['room_number'], probe['teacher_id'])
+        assert set(found.get('room', []) + found.get('teacher', [])) == set(linear_conflicts(sections, probe))
+
+    print_table(['sections', 'index_load_ms', 'index_check_us', 'linear_check_us', 'speedup'], [
+        [count, f"{load_ms:.0f}", f"{index_us:.1f}", f"{linear_us:.0f}", f"{linear_us / index_us:.0f}x"]
+    ])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,52 @@
+"""Time show_dashboard() with and without the shared figure cache.
+
+Streamlit calls run in bare mode (no browser), so this measures the
+server-side work of one dashboard render.
+
+Usage: python -m benchmarks.bench_dashboard_render [sizes...]   (default: 1000 10000 100000)
+"""
+import logging
+import statistics
+import sys
+import time
+
+from benchmarks.common import use_sqlite, seed_students, seed_teachers, print_table
+from components.dashboard import show_dashboard
+from figure_cache import figure_cache
+from stats import refresh_stats
+
+
+def _median_ms(func, repeat=10):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def render_uncached():
+    figure_cache.clear()
+    show_dashboard()
+
+
+def main(sizes):
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    rows = []
+    for size in sizes:
+        engine = use_sqlite()
+        seed_students(engine, size)
+        seed_teachers(engine, max(size // 20, 1))
+        refresh_stats()
+        show_dashboard()  # warm imports and the stats table
+        uncached_ms = _median_ms(render_uncached)
+        show_dashboard()
+        cached_ms = _median_ms(show_dashboard)
+        rows.append([size, f"{uncached_ms:.1f}", f"{cached_ms:.1f}", f"{uncached_ms / cached_ms:.1f}x"])
+        engine.dispose()
+    print_table(['students', 'uncached_ms', 'cached_ms', 'speedup'], rows)
+    print("figure cache:", figure_cache.stats())
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,50 @@
+"""Compare dashboard aggregate sources: full roster + value_counts, GROUP BY, materialized table.
+
+Usage: python -m benchmarks.bench_dashboard_stats [sizes...]   (default: 10000 100000 1000000)
+"""
+import sys
+
+from benchmarks.common import use_sqlite, seed_students, seed_teachers, timed, print_table
+from bulk_read import fetch_frame, STUDENT_COLUMNS, TEACHER_COLUMNS
+from database import SessionLocal
+from stats import compute_stats, refresh_stats, get_dashboard_stats
+
+
+def roster_value_counts():
+    """The previous approach: load both rosters, then count in pandas."""
+    students = fetch_frame(STUDENT_COLUMNS)
+    teachers = fetch_frame(TEACHER_COLUMNS)
+    return (students['Department'].value_counts(), students['Year'].value_counts(),
+            teachers['Department'].value_counts(), len(students), len(teachers))
+
+
+def group_by():
+    db = SessionLocal()
+    try:
+        return compute_stats(db)
+    finally:
+        db.close()
+
+
+def main(sizes):
+    rows = []
+    for size in sizes:
+        engine = use_sqlite()
+        seed_students(engine, size)
+        seed_teachers(engine, max(size // 20, 1))
+        results = {}
+        with timed(results, 'refresh'):
+            refresh_stats()
+        with timed(results, 'roster'):
+            roster_value_counts()
+        with timed(results, 'group_by'):
+            group_by()
+        with timed(results, 'materialized'):
+            get_dashboard_stats()
+        rows.append([size] + [f"{results[k]:.1f}" for k in ('roster', 'group_by', 'materialized', 'refresh')])
+        engine.dispose()
+    print_table(['students', 'roster_ms', 'group_by_ms', 'materialized_ms', 'refresh_job_ms'], rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,47 @@
+"""Measure the per-rerun cost of auth.init_auth() before and after the one-time bootstrap.
+
+Usage: python -m benchmarks.bench_init_auth [reruns]   (default: 1000)
+"""
+import sys
+import time
+
+from sqlalchemy import event
+
+from auth import init_auth
+from benchmarks.common import use_sqlite, print_table
+from database import SessionLocal, User, bootstrap_db
+
+
+def admin_check_per_rerun():
+    """The previous init_auth(): look up the admin account on every rerun."""
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.username == 'admin').first()
+    finally:
+        db.close()
+
+
+def measure(engine, func, reruns):
+    statements = []
+    record = lambda *args: statements.append(1)
+    event.listen(engine, "before_cursor_execute", record)
+    started = time.perf_counter()
+    for _ in range(reruns):
+        func()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    event.remove(engine, "before_cursor_execute", record)
+    return len(statements) / reruns, elapsed_ms / reruns
+
+
+def main(reruns):
+    engine = use_sqlite()
+    bootstrap_db()
+    rows = []
+    for label, func in [("query per rerun (before)", admin_check_per_rerun), ("init_auth (after)", init_auth)]:
+        queries, ms = measure(engine, func, reruns)
+        rows.append([label, f"{queries:.2f}", f"{ms:.4f}"])
+    print_table(["variant", "queries/rerun", "ms/rerun"], rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
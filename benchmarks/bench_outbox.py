@@ -0,0 +1,89 @@
+"""Notification delivery: sending inline from the page vs the outbox and its worker pool.
+
+The fake SMTP/Twilio transports add a fixed per-message latency (standing in
+for the provider round trip) and fail a share of messages transiently.
+Reports how long the send button blocks and the delivery throughput.
+
+Usage: python -m benchmarks.bench_outbox [emails] [sms] [latency ms]   (default: 2000 1000 5)
+"""
+import sys
+import time
+
+from benchmarks.common import use_sqlite, print_table
+import outbox
+from outbox import (DeliveryEngine, FakeSMTPServer, FakeTwilioClient, SMTPTransport, TwilioTransport,
+                    enqueue_notifications)
+
+FAILURE_RATE = 0.05
+
+
+def messages(emails, sms, scope):
+    for i in range(emails):
+        yield {'channel': 'email', 'recipient': f"student{i}@college.edu", 'body': f"Reminder {scope}"}
+    for i in range(sms):
+        yield {'channel': 'sms', 'recipient': f"{7000000000 + i}", 'body': f"Reminder {scope}"}
+
+
+def transports(latency):
+    return {
+        'email': SMTPTransport(connect=FakeSMTPServer(latency=latency, failure_rate=FAILURE_RATE)),
+        'sms': TwilioTransport(client=FakeTwilioClient(latency=latency, failure_rate=FAILURE_RATE))
+    }
+
+
+def inline(emails, sms, latency):
+    """Every message sent from the request, one SMTP connection each (what a naive send button would do)."""
+    channels = transports(latency)
+    started = time.perf_counter()
+    delivered = 0
+    for i, message in enumerate(messages(emails, sms, "inline")):
+        message.update(id=i, idempotency_key=str(i), subject=None)
+        try:
+            channels[message['channel']].send(message)
+            delivered += 1
+        except Exception:
+            pass
+    return time.perf_counter() - started, delivered
+
+
+def queued(emails, sms, latency, concurrency, scope):
+    """Enqueue everything, then let a fresh engine drain it."""
+    engine = DeliveryEngine(transports(latency), concurrency=concurrency, poll_interval=0.05)
+    outbox._engine = engine
+    started = time.perf_counter()
+    count = enqueue_notifications(messages(emails, sms, scope))
+    blocked = time.perf_counter() - started
+    engine.start()
+    assert engine.wait_until_delivered(timeout=600), engine.stats()
+    elapsed = time.perf_counter() - started
+    engine.stop()
+    retried = sum(counts['retried'] for counts in engine.metrics.snapshot().values())
+    return blocked, elapsed, count, retried
+
+
+def main(emails, sms, latency_ms):
+    use_sqlite()
+    # Retries come due quickly so the run measures throughput, not backoff
+    outbox.NOTIFY_RETRY_BASE = 0.05
+    latency = latency_ms / 1000
+    total = emails + sms
+    rows = []
+
+    elapsed, delivered = inline(emails, sms, latency)
+    rows.append(["inline, one connection per message", f"{elapsed * 1000:.0f}", f"{delivered / elapsed:.0f}",
+                 f"{total - delivered} lost"])
+
+    for label, concurrency in [("outbox, 1 worker per channel", {'email': 1, 'sms': 1}),
+                               ("outbox, 4 email / 2 sms workers", None),
+                               ("outbox, 8 email / 4 sms workers", {'email': 8, 'sms': 4})]:
+        blocked, elapsed, count, retried = queued(emails, sms, latency, concurrency, label)
+        assert count == total
+        rows.append([label, f"{blocked * 1000:.0f}", f"{total / elapsed:.0f}", f"{retried} retried"])
+
+    print(f"{emails} emails + {sms} SMS, {latency_ms} ms per message, {FAILURE_RATE:.0%} transient failures")
+    print_table(["path", "send button blocks (ms)", "messages/s", "failures"], rows)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [2000, 1000, 5][len(args):]))
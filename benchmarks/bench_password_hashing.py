@@ -0,0 +1,54 @@
+"""Report single-core logins per second for each password hashing cost setting.
+
+Each row times ``verify_password`` on one thread with the verification
+cache disabled, which is the KDF cost one login pays on one core; the
+last row shows a repeat login answered from the cache.
+
+Usage: python -m benchmarks.bench_password_hashing [seconds per setting]   (default: 1)
+"""
+import hashlib
+import sys
+import time
+
+from benchmarks.common import print_table
+from passwords import ScryptHasher, PBKDF2Hasher, VerificationCache, verify_password
+import passwords
+
+SETTINGS = [
+    ("sha256 (legacy)", None),
+    ("pbkdf2_sha256 100k", PBKDF2Hasher(100000)),
+    ("pbkdf2_sha256 310k", PBKDF2Hasher(310000)),
+    ("pbkdf2_sha256 600k", PBKDF2Hasher(600000)),
+    ("scrypt n=2^13", ScryptHasher(2 ** 13)),
+    ("scrypt n=2^14", ScryptHasher(2 ** 14)),
+    ("scrypt n=2^15", ScryptHasher(2 ** 15)),
+    ("scrypt n=2^16", ScryptHasher(2 ** 16)),
+]
+
+
+def rate(encoded, seconds):
+    """Verifications per second of one password against ``encoded``."""
+    count, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        assert verify_password("correct horse", encoded)[0]
+        count += 1
+    elapsed = time.perf_counter() - started
+    return count / elapsed, elapsed * 1000 / count
+
+
+def main(seconds):
+    rows = []
+    passwords.verification_cache = VerificationCache(max_entries=0)
+    for label, hasher in SETTINGS:
+        encoded = hasher.hash("correct horse") if hasher else hashlib.sha256(b"correct horse").hexdigest()
+        per_second, ms = rate(encoded, seconds)
+        rows.append([label, f"{ms:.2f}", f"{per_second:.0f}"])
+
+    passwords.verification_cache = VerificationCache()
+    per_second, ms = rate(ScryptHasher().hash("correct horse"), seconds)
+    rows.append(["scrypt default, cached", f"{ms:.4f}", f"{per_second:.0f}"])
+    print_table(["setting", "ms/login", "logins/s/core"], rows)
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1)
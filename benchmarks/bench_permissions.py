@@ -0,0 +1,48 @@
+"""Per-call cost of permission checks: the previous inline role comparisons vs the lookup table.
+
+Usage: python -m benchmarks.bench_permissions [calls]   (default: 1000000)
+"""
+import sys
+import timeit
+
+from benchmarks.common import print_table
+from permissions import PAGE_CAPABILITIES, acts_as, can, pages_for, reload_permissions
+
+ROLES = ['admin', 'teacher', 'student']
+
+
+def inline_page_check(role, page):
+    """The previous routing conditions in main.py."""
+    if page == "Dashboard" or page == "Class Schedule":
+        return True
+    if page == "Student Management":
+        return role in ['admin', 'teacher']
+    if page in ("Teacher Management", "User Management", "Database Diagnostics"):
+        return role == 'admin'
+    return False
+
+
+def inline_role_check(user_role, role):
+    """The previous require_auth comparison."""
+    return not (role and user_role != role and user_role != 'admin')
+
+
+def main(calls):
+    cases = [
+        ("page check, inline", lambda: inline_page_check('teacher', "Database Diagnostics")),
+        ("page check, can()", lambda: can('teacher', PAGE_CAPABILITIES["Database Diagnostics"])),
+        ("role check, inline", lambda: inline_role_check('student', 'teacher')),
+        ("role check, acts_as()", lambda: acts_as('student', 'teacher')),
+        ("navigation pages, pages_for()", lambda: pages_for(ROLES[1])),
+        ("rebuild table, reload_permissions()", reload_permissions),
+    ]
+    rows = []
+    for label, func in cases:
+        number = calls if "rebuild" not in label else max(1, calls // 1000)
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        rows.append([label, f"{seconds / number * 1e9:.0f}"])
+    print_table(["check", "ns/call"], rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,87 @@
+"""Recipient resolution for bulk notifications: loading ORM objects vs COUNT/LIMIT/streaming queries.
+
+"render" is what the Bulk tab does on every rerun (count plus preview);
+"send" queues one email per student of the whole campus into the outbox.
+Peak memory is measured with tracemalloc.
+
+Usage: python -m benchmarks.bench_recipients [students]   (default: 100000)
+"""
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+import outbox
+from benchmarks.common import use_sqlite, seed_students, print_table
+from database import SessionLocal, Student
+from outbox import DeliveryEngine, enqueue_notifications, messages_for
+from recipients import audience_query, count_recipients, preview_recipients, iter_recipients
+
+
+def orm_render():
+    """The previous Bulk tab: every Student object, counted with len() and turned into a preview frame."""
+    db = SessionLocal()
+    try:
+        recipients = db.query(Student).all()
+        frame = pd.DataFrame([
+            {"ID": r.id, "Name": r.name, "Department": r.department, "Year": r.year, "Email": r.email, "Phone": r.phone}
+            for r in recipients
+        ])
+        return len(recipients), frame
+    finally:
+        db.close()
+
+
+def query_render():
+    query = audience_query('all')
+    return count_recipients(query), preview_recipients(query)
+
+
+def orm_send():
+    db = SessionLocal()
+    try:
+        recipients = db.query(Student).all()
+        return enqueue_notifications(messages_for(recipients, ['email'], "ORM send"), scope="orm")
+    finally:
+        db.close()
+
+
+def stream_send():
+    return enqueue_notifications(messages_for(iter_recipients(audience_query('all')), ['email'], "Streamed send"),
+                                 scope="stream")
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(students):
+    engine = use_sqlite()
+    # As with InnoDB on MySQL, the open streaming read must not block the outbox inserts
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    seed_students(engine, students)
+    # Measure queueing only; no workers drain the outbox meanwhile
+    outbox._engine = DeliveryEngine(transports={})
+
+    rows = []
+    for label, func in [("render, ORM objects", orm_render), ("render, COUNT + LIMIT", query_render),
+                        ("send, ORM objects", orm_send), ("send, streamed", stream_send)]:
+        result, elapsed, peak = measure(func)
+        count = result[0] if isinstance(result, tuple) else result
+        assert count == students, (label, count)
+        rows.append([label, f"{elapsed * 1000:.0f}", f"{peak / 2 ** 20:.1f}"])
+
+    print(f"{students} students")
+    print_table(["path", "ms", "peak MiB"], rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,45 @@
+"""Compare the old in-memory DataFrame scan with indexed search.
+
+Usage: python -m benchmarks.bench_search [sizes...]   (default: 100000 500000)
+"""
+import statistics
+import sys
+import time
+
+from benchmarks.common import use_sqlite, seed_students, print_table
+from bulk_read import fetch_frame, STUDENT_COLUMNS
+from search import ensure_search_index, search_students
+
+TERMS = ["student4242", "mech", "civil stud", "college.edu", "123"]
+
+
+def _latency_ms(func, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main(sizes):
+    rows = []
+    for size in sizes:
+        engine = use_sqlite()
+        seed_students(engine, size)
+        started = time.perf_counter()
+        ensure_search_index(engine)
+        build_ms = (time.perf_counter() - started) * 1000
+        frame = fetch_frame(STUDENT_COLUMNS)
+        for term in TERMS:
+            scan_ms = _latency_ms(lambda: frame[
+                frame['Name'].str.contains(term, case=False) | frame['ID'].str.contains(term, case=False)
+            ])
+            index_ms = _latency_ms(lambda: search_students(term))
+            rows.append([size, term, f"{scan_ms:.1f}", f"{index_ms:.1f}", f"{build_ms:.0f}"])
+        engine.dispose()
+    print_table(['rows', 'term', 'scan_ms', 'indexed_ms', 'index_build_ms'], rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100000, 500000])
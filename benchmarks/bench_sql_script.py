@@ -0,0 +1,112 @@
+"""Setup script execution: split on ';' with a commit per statement vs the transactional runner.
+
+The generated script creates a table and seeds it with single-row INSERT
+statements, the way hand-written seed sections look. "rerun" runs the same
+script again, where the runner skips every statement recorded in
+``sql_script_log``. "parse" compares re-reading and parsing the file on
+every page render with the cached ``load_script``.
+
+Usage: python -m benchmarks.bench_sql_script [rows]   (default: 5000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.common import print_table
+from sql_script import load_script, parse_script, run_script
+
+PARSE_REPEAT = 20
+
+
+def write_script(path, rows):
+    with open(path, "w") as f:
+        f.write("-- Generated seed script\n")
+        f.write("CREATE TABLE IF NOT EXISTS seed_students (\n"
+                "    id INTEGER PRIMARY KEY,\n    name VARCHAR(100) NOT NULL,\n"
+                "    department VARCHAR(100) NOT NULL,\n    email VARCHAR(100) NOT NULL\n);\n\n")
+        for i in range(1, rows + 1):
+            f.write(f"INSERT INTO seed_students (id, name, department, email) "
+                    f"VALUES ({i}, 'Student {i}', 'Dept; {i % 5}', 'student{i}@example.com');\n")
+
+
+def fresh_engine(directory, name):
+    return create_engine(f"sqlite:///{os.path.join(directory, name)}")
+
+
+def naive_run(engine, path):
+    """The previous diagnostics page: split on ';' and commit after every statement."""
+    with open(path) as f:
+        script = f.read()
+    with engine.connect() as conn:
+        for statement in script.split(';'):
+            if statement.strip():
+                conn.exec_driver_sql(statement)
+                conn.commit()
+
+
+def row_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM seed_students")).scalar()
+
+
+def main(rows):
+    directory = tempfile.mkdtemp(prefix="cm_bench_")
+    path = os.path.join(directory, "seed.sql")
+    write_script(path, rows)
+    results = []
+
+    engine = fresh_engine(directory, "naive.db")
+    started = time.perf_counter()
+    try:
+        naive_run(engine, path)
+        naive_status = "ok"
+    except Exception as e:
+        # The ';' inside the department strings splits those statements in half
+        naive_status = type(e).__name__
+    results.append(["split on ';', commit each", f"{(time.perf_counter() - started) * 1000:.0f}",
+                    row_count(engine), naive_status])
+
+    # The same script without the quoted ';' so the naive run can finish
+    clean_path = os.path.join(directory, "seed_clean.sql")
+    with open(path) as f:
+        clean = f.read().replace("Dept; ", "Dept ")
+    with open(clean_path, "w") as f:
+        f.write(clean)
+    engine = fresh_engine(directory, "naive_clean.db")
+    started = time.perf_counter()
+    naive_run(engine, clean_path)
+    results.append(["split on ';', commit each (no ';' in strings)",
+                    f"{(time.perf_counter() - started) * 1000:.0f}", row_count(engine), "ok"])
+
+    engine = fresh_engine(directory, "runner.db")
+    with engine.connect() as conn:
+        for label in ("runner, first run", "runner, rerun"):
+            started = time.perf_counter()
+            _, statements = load_script(path)
+            report = run_script(conn, statements, "seed.sql")
+            status = f"{report['applied']} applied, {report['skipped']} skipped"
+            if report['error']:
+                status = report['error']
+            results.append([label, f"{(time.perf_counter() - started) * 1000:.0f}", row_count(engine), status])
+
+    print(f"{rows} seed rows")
+    print_table(["run", "ms", "rows", "result"], results)
+
+    def uncached():
+        with open(path) as f:
+            return parse_script(f.read())
+
+    parse_rows = []
+    for label, func in (("read + parse every render", uncached), ("load_script (cached)", lambda: load_script(path))):
+        started = time.perf_counter()
+        for _ in range(PARSE_REPEAT):
+            func()
+        parse_rows.append([label, f"{(time.perf_counter() - started) * 1000 / PARSE_REPEAT:.2f}"])
+    print_table(["parse", "ms per render"], parse_rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,45 @@
+"""Measure bulk student import throughput against one-row-at-a-time inserts.
+
+Usage: python -m benchmarks.bench_student_import [rows] [batch sizes...]   (default: 100000 100 1000 5000)
+"""
+import io
+import sys
+import time
+
+from benchmarks.common import use_sqlite, DEPARTMENTS, print_table
+from student_import import import_students
+from utils import add_student_to_db
+
+
+def make_csv(rows: int, invalid_every: int = 50) -> bytes:
+    lines = ["Name,Department,Year,Email,Phone"]
+    for i in range(rows):
+        email = "not-an-email" if i % invalid_every == 0 else f"student{i}@college.edu"
+        lines.append(f"Student {i},{DEPARTMENTS[i % len(DEPARTMENTS)]},{i % 4 + 1},{email},{7000000000 + i}")
+    return "\n".join(lines).encode()
+
+
+def main(rows, batch_sizes):
+    data = make_csv(rows)
+    results = []
+
+    use_sqlite()
+    sample = 500
+    started = time.perf_counter()
+    for i in range(sample):
+        add_student_to_db({'Name': f"Student {i}", 'Department': "Civil", 'Year': 1,
+                           'Email': f"s{i}@college.edu", 'Phone': "0123456789"})
+    single_rate = sample / (time.perf_counter() - started)
+    results.append(["add_student_to_db (per row)", sample, f"{single_rate:.0f}", 0])
+
+    for batch_size in batch_sizes:
+        use_sqlite()
+        report = import_students(io.BytesIO(data), "students.csv", batch_size=batch_size)
+        results.append([f"import_students batch={batch_size}", report['inserted'],
+                        report['rows_per_second'], report['failed']])
+    print_table(['path', 'rows_inserted', 'rows_per_s', 'rejected'], results)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 100000, args[1:] or [100, 1000, 5000])
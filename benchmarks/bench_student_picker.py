@@ -0,0 +1,57 @@
+"""Student picker: one option per student vs the typeahead lookup.
+
+The old Custom List multiselect loaded every student and sent one option
+label per student to the browser on each rerun. The typeahead sends at most
+``SUGGEST_LIMIT`` suggestions, looked up through the name prefix index.
+
+Usage: python -m benchmarks.bench_student_picker [students]   (default: 50000)
+"""
+import statistics
+import sys
+import time
+
+from benchmarks.common import use_sqlite, seed_students, print_table
+from database import SessionLocal, Student
+from migrations import run_migrations
+from search import suggest_students
+
+TERMS = ["St", "Stu", "Student 4", "Student 4999", "42", "Mechanical", "nomatch"]
+
+
+def all_options():
+    """The previous picker: every student as an "id: name" option."""
+    db = SessionLocal()
+    try:
+        return [f"{s.id}: {s.name}" for s in db.query(Student.id, Student.name).order_by(Student.id).all()]
+    finally:
+        db.close()
+
+
+def latency_ms(func, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(timings), max(timings)
+
+
+def main(students):
+    engine = use_sqlite()
+    run_migrations(engine)
+    seed_students(engine, students)
+
+    options, median, worst = latency_ms(all_options, repeat=5)
+    rows = [["all students (previous)", len(options), sum(len(o) for o in options), f"{median:.2f}", f"{worst:.2f}"]]
+    for term in TERMS:
+        suggestions, median, worst = latency_ms(lambda: suggest_students(term))
+        labels = [f"{name} ({student_id}, {department})" for student_id, name, department in suggestions]
+        rows.append([f"typeahead '{term}'", len(labels), sum(len(label) for label in labels),
+                     f"{median:.2f}", f"{worst:.2f}"])
+
+    print(f"{students} students")
+    print_table(["picker", "options", "label bytes", "p50 ms", "max ms"], rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,60 @@
+"""Generate timetables for synthetic colleges of increasing size.
+
+Usage: python -m benchmarks.bench_timetable [departments...]   (default: 2 5 10 20)
+Each department has 40 courses, 12 teachers and 8 rooms. In the "shared"
+layout teachers of any department can teach any subject, so the courses
+form one group and the process pool falls back to a single solve; in the
+"separate" layout every department teaches its own subjects.
+"""
+import random
+import sys
+
+from benchmarks.common import print_table
+from timetable_generator import DAYS, make_slots, generate_timetable
+
+SUBJECTS = ["Algebra", "Calculus", "Physics", "Chemistry", "Programming", "Databases",
+            "Networks", "Circuits", "Thermodynamics", "Mechanics", "Statistics", "Design"]
+
+
+def make_college(departments: int, shared: bool = True):
+    random.seed(departments)
+    courses, teachers, rooms = [], [], []
+    for d in range(departments):
+        department = f"Dept {d}"
+        for i in range(40):
+            subject = SUBJECTS[i % len(SUBJECTS)] + ("" if shared else f" D{d}")
+            courses.append({'id': len(courses) + 1, 'course_code': f"D{d}C{i}", 'title': f"{subject} {i // len(SUBJECTS) + 1}",
+                            'department': department, 'credit_hours': random.choice([2, 3, 3, 4])})
+        for i in range(12):
+            teachers.append({'id': len(teachers) + 1, 'name': f"T{d}-{i}", 'department': department,
+                             'subjects': ", ".join(s + ("" if shared else f" D{d}") for s in random.sample(SUBJECTS, 3))})
+        rooms += [f"{d}{r:02d}" for r in range(8)]
+    return courses, teachers, rooms
+
+
+def check(schedules):
+    teacher_slots, room_slots = set(), set()
+    for s in schedules:
+        key = (s['day_of_week'], s['start_time'])
+        assert (s['teacher_id'],) + key not in teacher_slots
+        assert (s['room_number'],) + key not in room_slots
+        teacher_slots.add((s['teacher_id'],) + key)
+        room_slots.add((s['room_number'],) + key)
+
+
+def main(sizes):
+    slots = make_slots(DAYS, 8, 17, 60)
+    rows = []
+    for departments in sizes:
+        for shared in (True, False):
+            courses, teachers, rooms = make_college(departments, shared)
+            for parallel in (False, True):
+                result = generate_timetable(courses, teachers, rooms, slots, "Fall 2025", parallel=parallel)
+                check(result['schedules'])
+                rows.append([departments, "shared" if shared else "separate", len(courses), len(result['schedules']),
+                             len(result['unscheduled']), "process pool" if parallel else "single", result['seconds']])
+    print_table(['departments', 'subjects', 'courses', 'classes', 'unscheduled', 'mode', 'seconds'], rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [2, 5, 10, 20])
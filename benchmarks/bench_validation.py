@@ -0,0 +1,60 @@
+"""Compare per-record validation with the vectorized frame validator.
+
+Usage: python -m benchmarks.bench_validation [sizes...]   (default: 10000 100000)
+"""
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.common import DEPARTMENTS, print_table
+from utils import validate_email, validate_phone
+from validation import validate_students_frame
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'ID': [str(i if i % 97 else i - 1) for i in range(rows)],
+        'Name': [f"Student {i}" for i in range(rows)],
+        'Department': [DEPARTMENTS[i % len(DEPARTMENTS)] for i in range(rows)],
+        'Year': [i % 5 for i in range(rows)],
+        'Email': ["bad" if i % 50 == 0 else f"student{i}@college.edu" for i in range(rows)],
+        'Phone': [str(7000000000 + i) for i in range(rows)]
+    })
+
+
+def per_record(frame: pd.DataFrame, existing: pd.DataFrame):
+    """The previous approach: one call per row and a linear scan for the ID check."""
+    errors = []
+    for row in frame.itertuples(index=False):
+        if not row.ID or not row.Name or not row.Department or not row.Year:
+            errors.append("All fields are required")
+        elif not validate_email(row.Email):
+            errors.append("Invalid email format")
+        elif not validate_phone(row.Phone):
+            errors.append("Phone number must be 10 or 11 digits")
+        elif row.ID in existing['ID'].values:
+            errors.append("Student ID already exists")
+        else:
+            errors.append("")
+    return errors
+
+
+def main(sizes):
+    rows = []
+    for size in sizes:
+        frame = make_frame(size)
+        existing = pd.DataFrame({'ID': [str(i) for i in range(size, size + size // 10)]})
+        started = time.perf_counter()
+        validate_students_frame(frame, existing_ids=set(existing['ID']))
+        vectorized_ms = (time.perf_counter() - started) * 1000
+        sample = frame.head(min(size, 5000))
+        started = time.perf_counter()
+        per_record(sample, existing)
+        per_record_ms = (time.perf_counter() - started) * 1000 * size / len(sample)
+        rows.append([size, f"{per_record_ms:.0f}", f"{vectorized_ms:.0f}", f"{per_record_ms / vectorized_ms:.0f}x"])
+    print_table(['rows', 'per_record_ms (extrapolated)', 'vectorized_ms', 'speedup'], rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
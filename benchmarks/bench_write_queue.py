@@ -0,0 +1,98 @@
+"""Compare synchronous per-submit inserts with the write-behind queue.
+
+Reports the sustained insert rate (rows/s until every row is in the
+database) and the form-submit latency (p50/p99 of the call the form makes)
+with several concurrent submitters.
+
+Usage: python -m benchmarks.bench_write_queue [rows] [threads]   (default: 5000 8)
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from benchmarks.common import use_sqlite, print_table, DEPARTMENTS
+from database import SessionLocal, Student
+from roster_cache import student_roster
+from utils import add_student_to_db
+from write_queue import WriteBehindQueue
+
+
+def form(i):
+    return {
+        'ID': str(1000000 + i), 'Name': f"Student {i}", 'Department': DEPARTMENTS[i % len(DEPARTMENTS)],
+        'Year': i % 4 + 1, 'Email': f"student{i}@college.edu", 'Phone': f"{7000000000 + i}"
+    }
+
+
+def record(i):
+    data = form(i)
+    return {'id': int(data['ID']), 'name': data['Name'], 'department': data['Department'],
+            'year': data['Year'], 'email': data['Email'], 'phone': data['Phone']}
+
+
+def run(submit, rows, threads):
+    """Call ``submit(i)`` for every row from ``threads`` threads; returns (elapsed seconds, latencies in ms)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(start):
+        local = []
+        for i in range(start, rows, threads):
+            started = time.perf_counter()
+            submit(i)
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - started, latencies
+
+
+def p99(latencies):
+    return statistics.quantiles(latencies, n=100)[98]
+
+
+def count_students():
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.count()).select_from(Student)).scalar()
+    finally:
+        db.close()
+
+
+def main(rows, threads):
+    use_sqlite()
+    student_roster.get()
+    results = []
+
+    sync_rows = min(rows, 2000)
+    elapsed, latencies = run(lambda i: add_student_to_db(form(i)), sync_rows, threads)
+    results.append(["synchronous add_student_to_db", sync_rows, f"{sync_rows / elapsed:.0f}",
+                    f"{statistics.median(latencies):.2f}", f"{p99(latencies):.2f}"])
+
+    queue = WriteBehindQueue(path=os.path.join(tempfile.mkdtemp(prefix="cm_queue_"), "queue.db"))
+    before = count_students()
+    started = time.perf_counter()
+    _, latencies = run(lambda i: queue.enqueue('students', record(i)), rows, threads)
+    assert queue.wait_until_flushed(timeout=300)
+    elapsed = time.perf_counter() - started
+    assert count_students() - before == rows, queue.stats()
+    results.append(["write-behind queue", rows, f"{rows / elapsed:.0f}",
+                    f"{statistics.median(latencies):.2f}", f"{p99(latencies):.2f}"])
+
+    print(f"{threads} concurrent submitters; batches flushed: {queue.stats()['batches']}")
+    print_table(["path", "rows", "rows/s (until in DB)", "submit p50 ms", "submit p99 ms"], results)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000, int(sys.argv[2]) if len(sys.argv) > 2 else 8)
@@ -0,0 +1,129 @@
+"""Check that the hot schedule, enrollment and roster queries use indexes.
+
+Runs the real query helpers against a migrated SQLite database, captures
+the SQL they send, and fails if ``EXPLAIN QUERY PLAN`` shows a full scan of
+a table the query filters on.
+
+Usage: python -m benchmarks.check_query_plans
+"""
+import sys
+from datetime import date, time as clock
+
+from sqlalchemy import event, insert, text
+
+from benchmarks.common import use_sqlite, seed_students, seed_teachers, print_table
+from clash_detection import build_student_timelines
+from components.class_schedule import (
+    get_student_schedule, get_teacher_schedule, get_class_schedules, get_student_id_for_user,
+    get_teacher_id_for_user, get_cohort_student_ids
+)
+from database import SessionLocal, User, Course, ClassSchedule, ClassEnrollment
+from migrations import run_migrations
+from recipients import audience_query, count_recipients, preview_recipients, iter_recipients
+from search import suggest_students
+
+
+def seed(engine):
+    seed_students(engine, 2000)
+    seed_teachers(engine, 100)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {'username': f"user{i}", 'password': "x", 'role': "student"} for i in range(1, 2001)
+        ])
+        conn.execute(text("UPDATE students SET user_id = id"))
+        conn.execute(insert(Course), [
+            {'course_code': f"C{i}", 'title': f"Course {i}", 'department': "Computer Science", 'credit_hours': 3}
+            for i in range(1, 101)
+        ])
+        conn.execute(insert(ClassSchedule), [
+            {'course_id': i % 100 + 1, 'teacher_id': i % 100 + 1, 'day_of_week': "Monday",
+             'start_time': clock(9), 'end_time': clock(10), 'room_number': f"R{i}", 'semester': "Fall 2025"}
+            for i in range(500)
+        ])
+        conn.execute(insert(ClassEnrollment), [
+            {'student_id': i % 2000 + 1, 'class_schedule_id': i // 2000 * 100 + i % 100 + 1,
+             'enrollment_date': date.today()}
+            for i in range(10000)
+        ])
+        conn.execute(text("ANALYZE"))
+
+
+def notification_queries(db):
+    """The count, preview and streaming queries components/notifications.py issues per audience.
+
+    The 'all' audience reads every student by definition and is not checked.
+    """
+    for kind, value in [('class', 1), ('department', "Mechanical"), ('year', 2), ('custom', [1, 2, 3])]:
+        query = audience_query(kind, value)
+        count_recipients(query, db)
+        preview_recipients(query, db=db)
+        for _ in iter_recipients(query):
+            pass
+
+
+# (label, function(db)); every table these queries touch must be reached through an index
+CHECKS = [
+    ("get_student_schedule", lambda db: get_student_schedule(1, db)),
+    ("get_teacher_schedule", lambda db: get_teacher_schedule(1, db)),
+    ("get_class_schedules(course)", lambda db: get_class_schedules(1, db)),
+    ("get_student_id_for_user", lambda db: get_student_id_for_user("user1", db)),
+    ("get_teacher_id_for_user", lambda db: get_teacher_id_for_user("user1", db)),
+    ("get_cohort_student_ids", lambda db: get_cohort_student_ids("Mechanical", 2, db)),
+    ("build_student_timelines", lambda db: build_student_timelines(db, [1, 2, 3])),
+    ("notification recipients", notification_queries),
+    # Enough name-prefix matches that no full-text fill is needed
+    ("suggest_students", lambda db: suggest_students("Student 1")),
+]
+
+
+def capture(engine, func):
+    """Run ``func`` with a fresh session and return the (statement, parameters) it executed."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    db = SessionLocal()
+    try:
+        func(db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def full_scans(conn, statement, parameters) -> list:
+    """Tables read by a full scan according to SQLite's query plan."""
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        # "SCAN t USING COVERING INDEX" still reads the whole index; temp b-trees are sorts, not tables
+        if detail.startswith("SCAN ") and "TEMP B-TREE" not in detail:
+            scans.append(detail.split()[1])
+    return scans
+
+
+def main():
+    engine = use_sqlite()
+    run_migrations(engine)
+    seed(engine)
+
+    rows, failures = [], 0
+    with engine.connect() as conn:
+        for label, func in CHECKS:
+            for statement, parameters in capture(engine, func):
+                scans = full_scans(conn, statement, parameters)
+                failures += bool(scans)
+                rows.append((label, "FULL SCAN: " + ", ".join(scans) if scans else "ok",
+                             " ".join(statement.split())[:70]))
+    print_table(["Query", "Plan", "Statement"], rows)
+    if failures:
+        print(f"\n{failures} statement(s) scan a whole table")
+        sys.exit(1)
+    print("\nAll statements use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Measure how long a fresh process takes to import the app's modules.
+
+This is the work every Streamlit worker does before the first render of
+``main.py``. Point MYSQL_HOST at an unreachable address to see the effect
+of a slow or down database, e.g.
+``MYSQL_HOST=10.255.255.1 python -m benchmarks.cold_start``.
+
+Usage: python -m benchmarks.cold_start [runs]   (default: 3)
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = "import database, auth, utils, components.class_schedule, components.dashboard"
+
+
+def main(runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", MODULES], check=True, capture_output=True,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        samples.append(time.perf_counter() - started)
+    print(f"MYSQL_HOST={os.environ.get('MYSQL_HOST', 'localhost')}")
+    print(f"cold start over {runs} runs: median {statistics.median(samples):.2f}s, max {max(samples):.2f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,74 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database so they need no MySQL
+server. Run them from the project root, e.g. ``python -m benchmarks.bench_bulk_read``.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import insert
+
+import database
+from database import Base, Student, Teacher, create_app_engine
+
+DEPARTMENTS = ["Computer Science", "Electronics", "Mechanical", "Civil", "Chemical"]
+
+
+def use_sqlite(path=None):
+    """Point the app's session factory at a fresh SQLite file and create all tables."""
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="cm_bench_"), "bench.db")
+    engine = create_app_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    database.set_engine(engine)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def seed_students(engine, count, batch_size=50000):
+    """Insert ``count`` synthetic students with multi-row inserts."""
+    with engine.begin() as conn:
+        for start in range(0, count, batch_size):
+            conn.execute(insert(Student), [
+                {
+                    'name': f"Student {i}",
+                    'department': DEPARTMENTS[i % len(DEPARTMENTS)],
+                    'year': i % 4 + 1,
+                    'email': f"student{i}@college.edu",
+                    'phone': f"{7000000000 + i}"
+                }
+                for i in range(start, min(start + batch_size, count))
+            ])
+
+
+def seed_teachers(engine, count, batch_size=50000):
+    """Insert ``count`` synthetic teachers with multi-row inserts."""
+    with engine.begin() as conn:
+        for start in range(0, count, batch_size):
+            conn.execute(insert(Teacher), [
+                {
+                    'name': f"Teacher {i}",
+                    'department': DEPARTMENTS[i % len(DEPARTMENTS)],
+                    'subjects': "Mathematics, Physics",
+                    'email': f"teacher{i}@college.edu",
+                    'phone': f"{8000000000 + i}"
+                }
+                for i in range(start, min(start + batch_size, count))
+            ])
+
+
+@contextmanager
+def timed(results, label):
+    """Record the wall time of the enclosed block in ``results[label]`` (milliseconds)."""
+    started = time.perf_counter()
+    yield
+    results[label] = (time.perf_counter() - started) * 1000
+
+
+def print_table(headers, rows):
+    """Print a fixed-width results table."""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
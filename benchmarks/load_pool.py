@@ -0,0 +1,70 @@
+"""Simulate many concurrent Streamlit sessions against the connection pool.
+
+Each simulated session runs several page renders; every render holds one
+pooled connection (as ``session_scope`` does) for a few queries plus some
+think time. The run fails if any checkout times out.
+
+Usage: python -m benchmarks.load_pool [sessions] [renders_per_session]   (default: 200 5)
+"""
+import random
+import sys
+import threading
+import time
+
+from sqlalchemy import select, func
+
+import database
+from benchmarks.common import use_sqlite, seed_students, print_table
+from database import Student, session_scope, get_pool_stats
+
+
+def simulate_session(renders, barrier, errors, peak):
+    barrier.wait()
+    for _ in range(renders):
+        try:
+            with session_scope() as db:
+                db.execute(select(func.count(Student.id))).scalar()
+                db.execute(select(Student.department, func.count()).group_by(Student.department)).all()
+                peak[0] = max(peak[0], database.get_engine().pool.checkedout())
+                time.sleep(random.uniform(0.002, 0.01))
+        except Exception as e:
+            errors.append(e)
+        time.sleep(random.uniform(0.0, 0.02))
+
+
+def main(sessions, renders):
+    engine = use_sqlite()
+    seed_students(engine, 1000)
+    barrier = threading.Barrier(sessions)
+    errors, peak = [], [0]
+    threads = [threading.Thread(target=simulate_session, args=(renders, barrier, errors, peak)) for _ in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stats = get_pool_stats()
+    print_table(['metric', 'value'], [
+        ['sessions', sessions],
+        ['renders', sessions * renders],
+        ['elapsed_s', f"{elapsed:.2f}"],
+        ['pool_size + max_overflow', f"{stats['pool_size']} + {stats['max_overflow']}"],
+        ['peak_checked_out', peak[0]],
+        ['checkouts', stats['checkouts']],
+        ['timeouts', stats['timeouts']],
+        ['avg_wait_ms', stats['avg_wait_ms']],
+        ['max_wait_ms', stats['max_wait_ms']],
+        ['errors', len(errors)]
+    ])
+    print("wait histogram:", stats['wait_histogram'])
+    if errors or stats['timeouts']:
+        print(f"FAIL: pool starvation ({len(errors)} errors, first: {errors[0] if errors else None})")
+        sys.exit(1)
+    print("OK: no pool starvation")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 200, args[1] if len(args) > 1 else 5)
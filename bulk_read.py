@@ -0,0 +1,83 @@
+from typing import Iterator, Optional
+
+import pandas as pd
+from sqlalchemy import select
+
+from database import SessionLocal, Student, Teacher
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; fall back to plain pandas construction
+    pa = None
+
+# Rows fetched from the server per round trip when streaming
+DEFAULT_CHUNK_SIZE = 10000
+
+STUDENT_COLUMNS = {
+    'ID': Student.id,
+    'Name': Student.name,
+    'Department': Student.department,
+    'Year': Student.year,
+    'Email': Student.email,
+    'Phone': Student.phone
+}
+
+TEACHER_COLUMNS = {
+    'ID': Teacher.id,
+    'Name': Teacher.name,
+    'Department': Teacher.department,
+    'Subjects': Teacher.subjects,
+    'Email': Teacher.email,
+    'Phone': Teacher.phone
+}
+
+
+def rows_to_frame(rows, names: list, use_arrow: bool = True) -> pd.DataFrame:
+    """Build a DataFrame from row tuples by transposing them into column arrays."""
+    if not rows:
+        return pd.DataFrame(columns=names)
+    arrays = list(zip(*rows))
+    if use_arrow and pa is not None:
+        frame = pa.table({name: list(values) for name, values in zip(names, arrays)}).to_pandas()
+    else:
+        frame = pd.DataFrame({name: list(values) for name, values in zip(names, arrays)}, columns=names)
+    # IDs are exposed as strings throughout the UI
+    frame['ID'] = frame['ID'].astype(str)
+    return frame
+
+
+def iter_frames(columns: dict, where=None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                use_arrow: bool = True) -> Iterator[pd.DataFrame]:
+    """Stream a table as DataFrame chunks of at most ``chunk_size`` rows using a server-side cursor."""
+    query = select(*columns.values()).order_by(columns['ID'])
+    if where is not None:
+        query = query.where(where)
+    names = list(columns)
+    db = SessionLocal()
+    try:
+        result = db.execute(query, execution_options={'stream_results': True, 'yield_per': chunk_size})
+        for rows in result.partitions():
+            yield rows_to_frame(rows, names, use_arrow)
+    finally:
+        db.close()
+
+
+def fetch_frame(columns: dict, where=None, chunk_size: Optional[int] = None,
+                use_arrow: bool = True) -> pd.DataFrame:
+    """Fetch a table as one DataFrame with a single Core select of just ``columns``."""
+    names = list(columns)
+    if chunk_size:
+        chunks = list(iter_frames(columns, where, chunk_size, use_arrow))
+        if chunks:
+            return pd.concat(chunks, ignore_index=True)
+        return rows_to_frame([], names, use_arrow)
+
+    query = select(*columns.values()).order_by(columns['ID'])
+    if where is not None:
+        query = query.where(where)
+    db = SessionLocal()
+    try:
+        rows = db.execute(query).all()
+    finally:
+        db.close()
+    return rows_to_frame(rows, names, use_arrow)
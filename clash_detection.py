@@ -0,0 +1,209 @@
+import bisect
+import os
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from database import ClassSchedule, ClassEnrollment
+
+# Seconds the process-wide index is trusted before a full rebuild, to pick up changes made by other processes
+CLASH_INDEX_MAX_AGE = float(os.environ.get("CLASH_INDEX_MAX_AGE", "60"))
+
+
+def to_minutes(value) -> int:
+    """Minutes since midnight for a ``datetime.time``."""
+    return value.hour * 60 + value.minute
+
+
+class IntervalList:
+    """Intervals on one timeline, sorted by start, with a max-end tree over them.
+
+    ``overlapping`` walks the tree from the root and skips every subtree
+    whose latest end is not after the new interval's start, so a query costs
+    O(log n) per overlap found (O(log n) when there is none), however long
+    the stored intervals are. It also works if the stored intervals overlap
+    each other, as legacy data may. Adding is a sorted insert; the tree is
+    rebuilt in O(n) by the next query.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+        self._tree = None
+        self._size = 0
+
+    def add(self, start: int, end: int, item_id):
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, item_id)
+        self._tree = None
+
+    def _build(self):
+        """Segment tree over positions in start order: each node holds the latest end below it."""
+        size = 1
+        while size < len(self.ends):
+            size *= 2
+        tree = [-1] * (2 * size)
+        tree[size:size + len(self.ends)] = self.ends
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._tree, self._size = tree, size
+
+    def overlapping(self, start: int, end: int) -> List:
+        """IDs of stored intervals that overlap [start, end); touching endpoints do not clash."""
+        # Only intervals starting before ``end`` can overlap
+        k = bisect.bisect_left(self.starts, end)
+        if not k:
+            return []
+        if self._tree is None:
+            self._build()
+        tree = self._tree
+        found = []
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= k or tree[node] <= start:
+                continue
+            if high - low == 1:
+                found.append(self.ids[low])
+                continue
+            middle = (low + high) // 2
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+        return found
+
+
+class ClashIndex:
+    """Room and teacher bookings per (semester, day), for clash checks in O(log n) per clash."""
+
+    def __init__(self):
+        self.timelines = {}
+        self.high_water_mark = 0
+
+    def add(self, schedule_id: int, semester: str, day: str, start, end, room: str, teacher_id: int):
+        start, end = to_minutes(start), to_minutes(end)
+        for resource in (('room', room), ('teacher', teacher_id)):
+            key = (semester, day) + resource
+            self.timelines.setdefault(key, IntervalList()).add(start, end, schedule_id)
+        self.high_water_mark = max(self.high_water_mark, schedule_id)
+
+    def conflicts(self, semester: str, day: str, start, end, room: Optional[str] = None,
+                  teacher_id: Optional[int] = None) -> dict:
+        """Schedule IDs clashing with a proposed slot, by resource: {'room': [...], 'teacher': [...]}."""
+        start, end = to_minutes(start), to_minutes(end)
+        found = {}
+        for resource, value in (('room', room), ('teacher', teacher_id)):
+            timeline = self.timelines.get((semester, day, resource, value))
+            if value is not None and timeline is not None:
+                ids = timeline.overlapping(start, end)
+                if ids:
+                    found[resource] = ids
+        return found
+
+    def load(self, db):
+        """Add every schedule created since the last load (by ID high-water mark).
+
+        Updates, deletes and rows committed below the mark are not seen; the
+        shared index is rebuilt for those (see ``invalidate_schedule_index``).
+        """
+        rows = db.execute(
+            select(
+                ClassSchedule.id, ClassSchedule.semester, ClassSchedule.day_of_week, ClassSchedule.start_time,
+                ClassSchedule.end_time, ClassSchedule.room_number, ClassSchedule.teacher_id
+            )
+            .where(ClassSchedule.id > self.high_water_mark)
+            .order_by(ClassSchedule.id)
+        ).all()
+        for row in rows:
+            self.add(*row)
+        return len(rows)
+
+
+# Process-wide index shared by all sessions; topped up from the database before each check,
+# and rebuilt after schedules change in this process or once it is CLASH_INDEX_MAX_AGE old
+_schedule_index = None
+_schedule_index_built_at = 0.0
+_schedule_index_lock = threading.Lock()
+
+
+def invalidate_schedule_index():
+    """Rebuild the shared index on the next check; call after writing class schedules with Core statements."""
+    global _schedule_index
+    with _schedule_index_lock:
+        _schedule_index = None
+
+
+def find_schedule_conflicts(db, semester: str, day: str, start, end, room: str, teacher_id: int) -> dict:
+    """Check a proposed class slot against every existing room and teacher booking."""
+    global _schedule_index, _schedule_index_built_at
+    with _schedule_index_lock:
+        now = time.monotonic()
+        if _schedule_index is None or now - _schedule_index_built_at >= CLASH_INDEX_MAX_AGE:
+            _schedule_index, _schedule_index_built_at = ClashIndex(), now
+        _schedule_index.load(db)
+        return _schedule_index.conflicts(semester, day, start, end, room, teacher_id)
+
+
+def _note_schedule_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['class_schedules_changed'] = True
+
+
+def _after_commit(session):
+    # Only once committed, so a rebuild cannot read the database before the change is visible
+    if session.info.pop('class_schedules_changed', False):
+        invalidate_schedule_index()
+
+
+def _after_rollback(session):
+    session.info.pop('class_schedules_changed', None)
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(ClassSchedule, _event, _note_schedule_change)
+event.listen(Session, 'after_commit', _after_commit)
+event.listen(Session, 'after_rollback', _after_rollback)
+
+
+def build_student_timelines(db, student_ids) -> dict:
+    """Per-student timelines of enrolled classes, keyed by (student_id, semester, day)."""
+    rows = db.execute(
+        select(
+            ClassEnrollment.student_id, ClassSchedule.id, ClassSchedule.semester, ClassSchedule.day_of_week,
+            ClassSchedule.start_time, ClassSchedule.end_time
+        )
+        .join(ClassSchedule, ClassSchedule.id == ClassEnrollment.class_schedule_id)
+        .where(ClassEnrollment.student_id.in_(list(student_ids)))
+    ).all()
+    timelines = {}
+    for student_id, schedule_id, semester, day, start, end in rows:
+        timelines.setdefault((student_id, semester, day), IntervalList()).add(
+            to_minutes(start), to_minutes(end), schedule_id
+        )
+    return timelines
+
+
+def get_slots(db, class_schedule_ids) -> dict:
+    """(semester, day, start, end) of each class schedule."""
+    rows = db.execute(
+        select(ClassSchedule.id, ClassSchedule.semester, ClassSchedule.day_of_week,
+               ClassSchedule.start_time, ClassSchedule.end_time)
+        .where(ClassSchedule.id.in_(list(class_schedule_ids)))
+    ).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def find_student_conflicts(db, student_id: int, class_schedule_id: int) -> List[int]:
+    """IDs of the student's enrolled classes that overlap the given class."""
+    slot = get_slots(db, [class_schedule_id]).get(class_schedule_id)
+    if slot is None:
+        return []
+    semester, day, start, end = slot
+    timeline = build_student_timelines(db, [student_id]).get((student_id, semester, day))
+    return timeline.overlapping(to_minutes(start), to_minutes(end)) if timeline else []
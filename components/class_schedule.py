@@ -1,22 +1,27 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, time
+from sqlalchemy import insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from database import SessionLocal, ClassSchedule, Course, Teacher, Student, ClassEnrollment, User
-
-def get_db():
-    db = SessionLocal()
-    try:
-        return db
-    finally:
-        db.close()
+from database import session_scope, ClassSchedule, Course, Teacher, Student, ClassEnrollment, User
+from request_scope import request_scope, memoize_per_request, invalidate_request_cache
+from components.query_debug import show_query_debug_panel
+from components.student_picker import student_picker
+from timetable_generator import DAYS, make_slots, load_generator_inputs, generate_timetable, save_timetable
+from clash_detection import (
+    find_schedule_conflicts, find_student_conflicts, build_student_timelines, get_slots, to_minutes, IntervalList
+)
 
+@memoize_per_request
 def get_student_schedule(student_id: int, db: Session = None) -> List[dict]:
     """Get the class schedule for a specific student."""
     if db is None:
-        db = get_db()
+        with session_scope() as db:
+            return get_student_schedule(student_id, db)
     
     enrollments = (
         db.query(
@@ -50,10 +55,12 @@ def get_student_schedule(student_id: int, db: Session = None) -> List[dict]:
         for enrollment in enrollments
     ]
 
+@memoize_per_request
 def get_teacher_schedule(teacher_id: int, db: Session = None) -> List[dict]:
     """Get the class schedule for a specific teacher."""
     if db is None:
-        db = get_db()
+        with session_scope() as db:
+            return get_teacher_schedule(teacher_id, db)
     
     classes = (
         db.query(
@@ -83,10 +90,12 @@ def get_teacher_schedule(teacher_id: int, db: Session = None) -> List[dict]:
         for class_item in classes
     ]
 
+@memoize_per_request
 def get_available_courses(db: Session = None) -> List[dict]:
     """Get all available courses."""
     if db is None:
-        db = get_db()
+        with session_scope() as db:
+            return get_available_courses(db)
     
     courses = db.query(Course).all()
     return [
@@ -101,10 +110,39 @@ def get_available_courses(db: Session = None) -> List[dict]:
         for course in courses
     ]
 
+@memoize_per_request
+def get_student_id_for_user(username: str, db: Session = None) -> Optional[int]:
+    """Get the student ID linked to a login."""
+    if db is None:
+        with session_scope() as db:
+            return get_student_id_for_user(username, db)
+    
+    return db.query(Student.id).join(User).filter(User.username == username).scalar()
+
+@memoize_per_request
+def get_teacher_id_for_user(username: str, db: Session = None) -> Optional[int]:
+    """Get the teacher ID linked to a login."""
+    if db is None:
+        with session_scope() as db:
+            return get_teacher_id_for_user(username, db)
+    
+    return db.query(Teacher.id).join(User).filter(User.username == username).scalar()
+
+@memoize_per_request
+def get_teacher_options(db: Session = None) -> dict:
+    """Get teacher names mapped to IDs for selection lists."""
+    if db is None:
+        with session_scope() as db:
+            return get_teacher_options(db)
+    
+    return {name: teacher_id for teacher_id, name in db.query(Teacher.id, Teacher.name).all()}
+
+@memoize_per_request
 def get_class_schedules(course_id: Optional[int] = None, db: Session = None) -> List[dict]:
     """Get class schedules, optionally filtered by course."""
     if db is None:
-        db = get_db()
+        with session_scope() as db:
+            return get_class_schedules(course_id, db)
     
     query = (
         db.query(
@@ -145,7 +183,8 @@ def get_class_schedules(course_id: Optional[int] = None, db: Session = None) ->
 def enroll_student(student_id: int, class_schedule_id: int, db: Session = None):
     """Enroll a student in a class."""
     if db is None:
-        db = get_db()
+        with session_scope() as db:
+            return enroll_student(student_id, class_schedule_id, db)
     
     # Check if already enrolled
     existing_enrollment = (
@@ -160,6 +199,11 @@ def enroll_student(student_id: int, class_schedule_id: int, db: Session = None):
     if existing_enrollment:
         return False, "Student is already enrolled in this class"
     
+    # Check for a timetable clash with the student's other classes
+    clashes = find_student_conflicts(db, student_id, class_schedule_id)
+    if clashes:
+        return False, f"This class clashes with another class you are enrolled in (schedule #{clashes[0]})"
+    
     # Create new enrollment
     new_enrollment = ClassEnrollment(
         student_id=student_id,
@@ -169,12 +213,99 @@ def enroll_student(student_id: int, class_schedule_id: int, db: Session = None):
     
     db.add(new_enrollment)
     db.commit()
+    invalidate_request_cache()
     return True, "Enrollment successful"
 
+def get_cohort_student_ids(department: str, year: int, db: Session = None) -> List[int]:
+    """Get the IDs of all students in a department and year."""
+    if db is None:
+        with session_scope() as db:
+            return get_cohort_student_ids(department, year, db)
+    
+    return [
+        student_id for (student_id,) in
+        db.query(Student.id).filter(Student.department == department, Student.year == year).all()
+    ]
+
+def bulk_enroll_students(student_ids: List[int], class_schedule_ids: List[int],
+                         batch_size: int = 1000, db: Session = None) -> dict:
+    """Enroll every student in every class, skipping pairs that are already enrolled."""
+    if db is None:
+        with session_scope() as db:
+            return bulk_enroll_students(student_ids, class_schedule_ids, batch_size, db)
+    
+    student_ids = set(student_ids)
+    class_schedule_ids = set(class_schedule_ids)
+    requested = {(s, c) for s in student_ids for c in class_schedule_ids}
+    if not requested:
+        return {"requested": 0, "already_enrolled": 0, "conflicts": 0, "enrolled": 0}
+    
+    # One set-based query finds every existing pair
+    existing = set(
+        db.query(ClassEnrollment.student_id, ClassEnrollment.class_schedule_id)
+        .filter(
+            ClassEnrollment.class_schedule_id.in_(class_schedule_ids),
+            ClassEnrollment.student_id.in_(student_ids)
+        )
+        .all()
+    )
+    new_pairs = sorted(requested - existing)
+    
+    # Skip pairs that would clash with the student's timetable, including the other selected classes
+    slots = get_slots(db, class_schedule_ids)
+    timelines = build_student_timelines(db, student_ids)
+    clash_free = []
+    for student_id, class_schedule_id in new_pairs:
+        if class_schedule_id not in slots:
+            continue
+        semester, day, start, end = slots[class_schedule_id]
+        key = (student_id, semester, day)
+        start, end = to_minutes(start), to_minutes(end)
+        if key in timelines and timelines[key].overlapping(start, end):
+            continue
+        timelines.setdefault(key, IntervalList()).add(start, end, class_schedule_id)
+        clash_free.append((student_id, class_schedule_id))
+    conflicts = len(new_pairs) - len(clash_free)
+    new_pairs = clash_free
+    
+    # The unique index makes concurrent enrollments of the same pair harmless. Only that
+    # conflict is skipped (not IGNORE, which would also swallow FK and truncation errors);
+    # with MySQL's found-rows count a pair enrolled concurrently still counts as enrolled.
+    dialect = db.get_bind().dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(ClassEnrollment)
+        statement = statement.on_duplicate_key_update(id=ClassEnrollment.id)
+    elif dialect == 'sqlite':
+        statement = sqlite_insert(ClassEnrollment).on_conflict_do_nothing(
+            index_elements=[ClassEnrollment.student_id, ClassEnrollment.class_schedule_id]
+        )
+    else:
+        statement = insert(ClassEnrollment)
+    
+    enrolled = 0
+    today = date.today()
+    for start in range(0, len(new_pairs), batch_size):
+        batch = new_pairs[start:start + batch_size]
+        result = db.connection().execute(statement, [
+            {"student_id": s, "class_schedule_id": c, "enrollment_date": today}
+            for s, c in batch
+        ])
+        enrolled += result.rowcount if result.rowcount >= 0 else len(batch)
+    db.commit()
+    invalidate_request_cache()
+    
+    return {
+        "requested": len(requested),
+        "already_enrolled": len(existing),
+        "conflicts": conflicts,
+        "enrolled": enrolled
+    }
+
 def add_course(course_data: dict, db: Session = None):
     """Add a new course."""
     if db is None:
-        db = get_db()
+        with session_scope() as db:
+            return add_course(course_data, db)
     
     # Check if course code already exists
     existing_course = db.query(Course).filter(Course.course_code == course_data['course_code']).first()
@@ -191,12 +322,32 @@ def add_course(course_data: dict, db: Session = None):
     
     db.add(new_course)
     db.commit()
+    invalidate_request_cache()
     return True, "Course added successfully"
 
 def add_class_schedule(schedule_data: dict, db: Session = None):
     """Add a new class schedule."""
     if db is None:
-        db = get_db()
+        with session_scope() as db:
+            return add_class_schedule(schedule_data, db)
+    
+    if schedule_data['start_time'] >= schedule_data['end_time']:
+        return False, "End time must be after start time"
+    
+    # Neither the teacher nor the room may be double-booked
+    conflicts = find_schedule_conflicts(
+        db,
+        schedule_data['semester'],
+        schedule_data['day_of_week'],
+        schedule_data['start_time'],
+        schedule_data['end_time'],
+        schedule_data['room_number'],
+        schedule_data['teacher_id']
+    )
+    if 'teacher' in conflicts:
+        return False, f"Teacher is already teaching at this time (schedule #{conflicts['teacher'][0]})"
+    if 'room' in conflicts:
+        return False, f"Room {schedule_data['room_number']} is already booked at this time (schedule #{conflicts['room'][0]})"
     
     new_schedule = ClassSchedule(
         course_id=schedule_data['course_id'],
@@ -210,15 +361,21 @@ def add_class_schedule(schedule_data: dict, db: Session = None):
     
     db.add(new_schedule)
     db.commit()
+    invalidate_request_cache()
     return True, "Class schedule added successfully"
 
 def show_schedule_management():
     st.header("Class Schedule Management")
     
-    # Initialize the database session
-    db = get_db()
+    # Each distinct query runs at most once per render
+    with request_scope() as scope, session_scope() as db:
+        show_schedule_tabs(db)
     
-    tabs = st.tabs(["View Schedule", "Courses", "Add Schedule"])
+    if st.session_state.user_role == 'admin':
+        show_query_debug_panel(scope)
+
+def show_schedule_tabs(db: Session):
+    tabs = st.tabs(["View Schedule", "Courses", "Add Schedule", "Bulk Enrollment", "Generate Timetable"])
     
     with tabs[0]:
         st.subheader("Your Class Schedule")
@@ -229,10 +386,10 @@ def show_schedule_management():
             
             if user_role == 'student':
                 # Get student ID from the database based on username
-                student = db.query(Student).join(User).filter(User.username == username).first()
+                student_id = get_student_id_for_user(username, db)
                 
-                if student:
-                    schedule = get_student_schedule(student.id, db)
+                if student_id:
+                    schedule = get_student_schedule(student_id, db)
                     if schedule:
                         # Convert to DataFrame for display
                         df = pd.DataFrame(schedule)
@@ -254,10 +411,10 @@ def show_schedule_management():
             
             elif user_role == 'teacher':
                 # Get teacher ID from the database based on username
-                teacher = db.query(Teacher).join(User).filter(User.username == username).first()
+                teacher_id = get_teacher_id_for_user(username, db)
                 
-                if teacher:
-                    schedule = get_teacher_schedule(teacher.id, db)
+                if teacher_id:
+                    schedule = get_teacher_schedule(teacher_id, db)
                     if schedule:
                         # Convert to DataFrame for display
                         df = pd.DataFrame(schedule)
@@ -280,7 +437,7 @@ def show_schedule_management():
             elif user_role == 'admin':
                 # Admin can see all schedules or filter by department/course
                 st.subheader("Filter Options")
-                filter_option = st.radio("Filter by:", ["All Schedules", "Course", "Department", "Teacher"])
+                filter_option = st.radio("Filter by:", ["All Schedules", "Course", "Department", "Teacher", "Student"])
                 
                 if filter_option == "All Schedules":
                     schedules = get_class_schedules(db=db)
@@ -306,6 +463,15 @@ def show_schedule_management():
                             st.info("No schedules found for this course.")
                     else:
                         st.warning("No courses available. Add courses first.")
+                
+                elif filter_option == "Student":
+                    student_id = student_picker("schedule_student", "Student", multiple=False)
+                    if student_id is not None:
+                        schedule = get_student_schedule(student_id, db)
+                        if schedule:
+                            st.dataframe(pd.DataFrame(schedule), use_container_width=True)
+                        else:
+                            st.info("This student is not enrolled in any classes.")
         else:
             st.warning("Please log in to view your schedule.")
     
@@ -366,8 +532,7 @@ def show_schedule_management():
                 course_options = {f"{c['course_code']} - {c['title']}": c['id'] for c in courses}
                 
                 # Get teachers for selection
-                teachers = db.query(Teacher).all()
-                teacher_options = {t.name: t.id for t in teachers}
+                teacher_options = get_teacher_options(db=db)
                 
                 if not course_options:
                     st.warning("No courses available. Add courses first.")
@@ -423,11 +588,11 @@ def show_schedule_management():
                     submit = st.form_submit_button("Enroll")
                     if submit:
                         # Get student ID
-                        student = db.query(Student).join(User).filter(User.username == st.session_state.username).first()
+                        student_id = get_student_id_for_user(st.session_state.username, db)
                         
-                        if student:
+                        if student_id:
                             success, message = enroll_student(
-                                student_id=student.id,
+                                student_id=student_id,
                                 class_schedule_id=schedule_options[selected_class],
                                 db=db
                             )
@@ -439,4 +604,114 @@ def show_schedule_management():
                         else:
                             st.error("Student record not found. Please contact an administrator.")
             else:
-                st.info("No classes available for enrollment.")
\ No newline at end of file
+                st.info("No classes available for enrollment.")
+    
+    with tabs[3]:
+        if st.session_state.user_role == 'admin':
+            st.subheader("Enroll a Cohort")
+            
+            schedules = get_class_schedules(db=db)
+            if not schedules:
+                st.info("No classes available for enrollment.")
+            else:
+                with st.form("bulk_enroll_form"):
+                    department = st.selectbox(
+                        "Department",
+                        ["Computer Science", "Electronics", "Mechanical", "Civil", "Chemical"]
+                    )
+                    year = st.selectbox("Year", [1, 2, 3, 4])
+                    schedule_options = {f"{s['course_code']} - {s['course_title']} ({s['day']} {s['start_time']}-{s['end_time']})": s['id'] for s in schedules}
+                    selected_classes = st.multiselect("Classes:", list(schedule_options.keys()))
+                    
+                    submit = st.form_submit_button("Enroll Cohort")
+                    if submit:
+                        if not selected_classes:
+                            st.error("Select at least one class")
+                        else:
+                            student_ids = get_cohort_student_ids(department, year, db)
+                            if not student_ids:
+                                st.warning("No students found in this department and year.")
+                            else:
+                                result = bulk_enroll_students(
+                                    student_ids,
+                                    [schedule_options[c] for c in selected_classes],
+                                    db=db
+                                )
+                                st.success(
+                                    f"Enrolled {result['enrolled']} new student-class pairs "
+                                    f"({result['already_enrolled']} already enrolled, {result['conflicts']} skipped for timetable clashes, "
+                                    f"{result['requested']} requested)"
+                                )
+            
+            st.subheader("Enroll Selected Students")
+            
+            if schedules:
+                student_ids = student_picker("enroll_students", "Students")
+                with st.form("enroll_students_form"):
+                    schedule_options = {f"{s['course_code']} - {s['course_title']} ({s['day']} {s['start_time']}-{s['end_time']})": s['id'] for s in schedules}
+                    selected_classes = st.multiselect("Classes:", list(schedule_options.keys()), key="enroll_students_classes")
+                    
+                    submit = st.form_submit_button("Enroll Students")
+                    if submit:
+                        if not student_ids or not selected_classes:
+                            st.error("Select at least one student and one class")
+                        else:
+                            result = bulk_enroll_students(
+                                student_ids,
+                                [schedule_options[c] for c in selected_classes],
+                                db=db
+                            )
+                            st.success(
+                                f"Enrolled {result['enrolled']} new student-class pairs "
+                                f"({result['already_enrolled']} already enrolled, {result['conflicts']} skipped for timetable clashes, "
+                                f"{result['requested']} requested)"
+                            )
+        else:
+            st.info("Bulk enrollment is available to administrators.")
+    
+    with tabs[4]:
+        if st.session_state.user_role == 'admin':
+            st.subheader("Generate Semester Timetable")
+            st.caption("Schedules every course that has no classes in the semester yet, without double-booking teachers or rooms.")
+            
+            with st.form("generate_timetable_form"):
+                semester = st.text_input("Semester (e.g., Fall 2025):")
+                rooms_text = st.text_input("Rooms (comma separated):", "101, 102, 103, 201, 202")
+                days = st.multiselect("Teaching days:", DAYS + ["Saturday"], default=DAYS)
+                first_hour, last_hour = st.slider("Teaching hours:", 7, 21, (8, 17))
+                slot_minutes = st.selectbox("Class length (minutes):", [60, 90, 120])
+                parallel = st.checkbox(
+                    "Solve independent course groups in parallel",
+                    help="Courses that share no eligible teacher are solved in separate worker processes. "
+                         "Only worth it for large timetables on a multi-core server."
+                )
+                
+                submit = st.form_submit_button("Generate")
+                if submit:
+                    rooms = [r.strip() for r in rooms_text.split(",") if r.strip()]
+                    if not semester or not rooms or not days:
+                        st.error("Semester, rooms and days are required")
+                    else:
+                        slots = make_slots(days, first_hour, last_hour, slot_minutes)
+                        inputs = load_generator_inputs(db, semester, rooms, slots)
+                        with st.spinner("Generating timetable..."):
+                            st.session_state.generated_timetable = generate_timetable(
+                                inputs['courses'], inputs['teachers'], rooms, slots, semester,
+                                inputs['busy_teachers'], inputs['busy_rooms'], parallel=parallel
+                            )
+            
+            generated = st.session_state.get('generated_timetable')
+            if generated:
+                st.success(f"Generated {len(generated['schedules'])} classes in {generated['seconds']}s")
+                if generated['unscheduled']:
+                    st.warning(f"{len(generated['unscheduled'])} courses could not be scheduled (no free teacher, room or slot)")
+                if generated['schedules']:
+                    df = pd.DataFrame(generated['schedules'])
+                    st.dataframe(df, use_container_width=True, hide_index=True)
+                    if st.button("Save Timetable"):
+                        saved = save_timetable(db, generated['schedules'])
+                        invalidate_request_cache()
+                        st.session_state.generated_timetable = None
+                        st.success(f"Saved {saved} class schedules")
+        else:
+            st.info("Timetable generation is available to administrators.")
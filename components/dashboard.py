@@ -1,48 +1,40 @@
 import streamlit as st
-import plotly.express as px
+
+from stats import get_dashboard_stats
+from figure_cache import cached_figure
 
 def show_dashboard():
     st.header("Dashboard")
 
+    # Counts come from the materialized stats table, not the full roster
+    stats = get_dashboard_stats()
+    students = stats['students']
+    teachers = stats['teachers']
+
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Student Statistics")
-        if not st.session_state.students.empty:
+        if students['total']:
             # Department-wise distribution
-            dept_counts = st.session_state.students['Department'].value_counts()
-            fig1 = px.pie(
-                values=dept_counts.values,
-                names=dept_counts.index,
-                title="Students by Department"
-            )
+            fig1 = cached_figure('pie', students['department'], "Students by Department")
             st.plotly_chart(fig1)
 
             # Year-wise distribution
-            year_counts = st.session_state.students['Year'].value_counts()
-            fig2 = px.bar(
-                x=year_counts.index,
-                y=year_counts.values,
-                title="Students by Year"
-            )
+            fig2 = cached_figure('bar', students['year'], "Students by Year")
             st.plotly_chart(fig2)
         else:
             st.info("No student data available")
 
     with col2:
         st.subheader("Teacher Statistics")
-        if not st.session_state.teachers.empty:
+        if teachers['total']:
             # Department-wise distribution
-            dept_counts = st.session_state.teachers['Department'].value_counts()
-            fig3 = px.pie(
-                values=dept_counts.values,
-                names=dept_counts.index,
-                title="Teachers by Department"
-            )
+            fig3 = cached_figure('pie', teachers['department'], "Teachers by Department")
             st.plotly_chart(fig3)
 
             # Total numbers
-            st.metric("Total Students", len(st.session_state.students))
-            st.metric("Total Teachers", len(st.session_state.teachers))
+            st.metric("Total Students", students['total'])
+            st.metric("Total Teachers", teachers['total'])
         else:
-            st.info("No teacher data available")
\ No newline at end of file
+            st.info("No teacher data available")
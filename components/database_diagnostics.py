@@ -39,6 +39,36 @@ def show_database_diagnostics():
                     test_sqlalchemy_connection(mysql_host, mysql_user, mysql_password, mysql_database, mysql_port)
                 elif connection_method == "Environment Check":
                     check_environment_variables()
+
+        with st.expander("Roster Cache"):
+            from roster_cache import get_roster_stats
+            st.dataframe(pd.DataFrame(get_roster_stats()).T, use_container_width=True)
+
+        with st.expander("Write Queue"):
+            from write_queue import get_write_queue
+            queue = get_write_queue()
+            st.json(queue.stats())
+            failed = queue.failed_rows()
+            if failed:
+                st.warning(f"{len(failed)} submitted records could not be saved")
+                st.dataframe(pd.DataFrame(
+                    [(target, record.get('id'), record.get('name'), error, datetime.fromtimestamp(failed_at))
+                     for target, record, error, failed_at in failed],
+                    columns=['Table', 'ID', 'Name', 'Error', 'Failed At']
+                ), hide_index=True)
+
+        with st.expander("Dashboard Statistics"):
+            from stats import check_stats, refresh_stats
+            if st.button("Check and Rebuild Statistics"):
+                mismatches = check_stats()
+                if mismatches:
+                    st.warning(f"{len(mismatches)} counters were out of date")
+                    st.dataframe(pd.DataFrame(
+                        [('/'.join(key), stored, actual) for key, stored, actual in mismatches],
+                        columns=['Counter', 'Stored', 'Actual']
+                    ), use_container_width=True)
+                refresh_stats()
+                st.success("Dashboard statistics rebuilt from the base tables")
     
     # Database Setup Tab
     with tab2:
@@ -389,13 +419,14 @@ def test_database_tables(host, user, password, database, port):
 
 def show_sql_script_setup():
     """Show SQL script setup options."""
+    from sql_script import load_script, run_script_file, SCRIPT_BATCH_SIZE
+
     st.write("This will execute the SQL script to create the database structure.")
     
-    # Display the SQL script
-    with open("setup_database.sql", "r") as f:
-        sql_script = f.read()
+    # Read and parse the script only when the file changes
+    sql_script, statements = load_script("setup_database.sql")
     
-    with st.expander("View SQL Script"):
+    with st.expander(f"View SQL Script ({len(statements)} statements)"):
         st.code(sql_script, language="sql")
     
     # Options for running the script
@@ -405,39 +436,25 @@ def show_sql_script_setup():
     )
     
     if run_method == "Using PyMySQL":
+        st.caption(
+            f"Data statements run in transactions of up to {SCRIPT_BATCH_SIZE} statements. "
+            "Applied statements are recorded in sql_script_log, so running the script again skips them."
+        )
         if st.button("Run SQL Script"):
             with st.spinner("Setting up database..."):
                 try:
-                    # Get database config
-                    host = os.environ.get("MYSQL_HOST", "localhost")
-                    user = os.environ.get("MYSQL_USER", "root")
-                    password = os.environ.get("MYSQL_PASSWORD", "")
-                    port = int(os.environ.get("MYSQL_PORT", "3306"))
+                    # Connects to the server without a database; the script creates and selects it
+                    report = run_script_file("setup_database.sql")
                     
-                    # First connect without database to create it if needed
-                    connection = pymysql.connect(
-                        host=host,
-                        user=user,
-                        password=password,
-                        port=port,
-                        connect_timeout=10
-                    )
-                    
-                    # Execute script in parts
-                    with connection.cursor() as cursor:
-                        # Split script into statements
-                        statements = sql_script.split(';')
-                        
-                        # Execute each statement
-                        for statement in statements:
-                            if statement.strip():
-                                cursor.execute(statement)
-                                connection.commit()
-                    
-                    # Close connection
-                    connection.close()
+                    summary = (f"{report['applied']} applied, {report['skipped']} already applied, "
+                               f"{report['failed']} failed in {report['seconds']:.2f}s")
+                    if report['error']:
+                        st.error(f"❌ Error setting up database: {report['error']}")
+                        st.caption(summary)
+                    else:
+                        st.success(f"✅ Database setup completed successfully ({summary})")
                     
-                    st.success("✅ Database setup completed successfully")
+                    st.dataframe(pd.DataFrame(report['statements']), use_container_width=True, hide_index=True)
                     
                 except Exception as e:
                     st.error(f"❌ Error setting up database: {str(e)}")
@@ -453,6 +470,9 @@ def show_sql_script_setup():
         st.write("Or for a specific user:")
         command_user = f"mysql -u [username] -p < setup_database.sql"
         st.code(command_user, language="bash")
+        
+        st.write("Or with the transactional runner, which skips statements that were already applied:")
+        st.code("python sql_script.py setup_database.sql", language="bash")
 
 
 def show_orm_setup():
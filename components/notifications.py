@@ -1,16 +1,81 @@
 import streamlit as st
 import pandas as pd
+import uuid
 from datetime import datetime
 
-from database import get_db, Student, Teacher, ClassSchedule, Course, ClassEnrollment
+from database import get_db, Student, Teacher, ClassSchedule, Course
+from outbox import enqueue_notifications, messages_for, get_delivery_engine, failed_messages
+from recipients import audience_query, count_recipients, preview_recipients, iter_recipients, PREVIEW_LIMIT
+from components.student_picker import student_picker
+
+CHANNEL_OPTIONS = {"Email": 'email', "SMS": 'sms'}
+
+def _select_channels(key):
+    """Channel picker; returns the selected outbox channels."""
+    selected = st.multiselect("Send via", options=list(CHANNEL_OPTIONS), default=["Email"], key=key)
+    return [CHANNEL_OPTIONS[label] for label in selected]
+
+def _send_scope(key):
+    """Idempotency scope of the send behind ``key``; it stays the same until that send has been queued."""
+    scope_key = f"{key}_send_scope"
+    if scope_key not in st.session_state:
+        st.session_state[scope_key] = uuid.uuid4().hex
+    return st.session_state[scope_key]
+
+def _queue_message(recipients, channels, message, target, key):
+    """Queue ``message`` for ``recipients`` on ``channels`` and report what was queued.
+
+    A rerun interrupted by a second click re-submits with the same scope and is
+    deduplicated; once queued, the next send of ``key`` gets a new scope, so a
+    deliberate resend of the same message is delivered again.
+    """
+    total = 0
+
+    def counted():
+        nonlocal total
+        for outbox_message in messages_for(recipients, channels, message):
+            total += 1
+            yield outbox_message
+
+    queued = enqueue_notifications(counted(), scope=_send_scope(key))
+    st.session_state[f"{key}_send_scope"] = uuid.uuid4().hex
+    if not total:
+        st.warning("None of the recipients has an address for the selected channels")
+        return
+    if queued:
+        st.success(f"Queued {queued} message(s) to {target} for delivery")
+    if total > queued:
+        st.info(f"{total - queued} identical message(s) were already queued by this send and were skipped")
+    st.code(message)
+
+def _show_preview(query, recipient_count, db):
+    """The first PREVIEW_LIMIT recipients of ``query``."""
+    if recipient_count > PREVIEW_LIMIT:
+        st.caption(f"Showing the first {PREVIEW_LIMIT} of {recipient_count} recipients")
+    st.dataframe(preview_recipients(query, db=db), hide_index=True)
+
+def _show_delivery_status():
+    """Outbox counts, delivery throughput and recent failures."""
+    with st.expander("Delivery Status"):
+        stats = get_delivery_engine().stats()
+        totals = {}
+        for counts in stats['outbox'].values():
+            for status, count in counts.items():
+                totals[status] = totals.get(status, 0) + count
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Pending", totals.get('pending', 0) + totals.get('sending', 0))
+        col2.metric("Sent", totals.get('sent', 0))
+        col3.metric("Failed", totals.get('failed', 0))
+        col4.metric("Messages/sec", stats['messages_per_sec'])
+        st.json(stats)
+        failed = failed_messages()
+        if failed:
+            st.dataframe(pd.DataFrame(failed))
 
 def show_notifications():
     """Display the notifications management component."""
     st.header("📧 Notifications")
     
-    # Message about using email or other notification methods
-    st.info("This is a simplified notification dashboard. In a production environment, you would connect to an email service or other notification system.")
-    
     # Tabs for different notification types
     tab1, tab2, tab3 = st.tabs(["Individual Notifications", "Class Notifications", "Bulk Notifications"])
     
@@ -20,36 +85,31 @@ def show_notifications():
     with tab1:
         st.subheader("Send to Individual Student")
         
-        # Get all students
-        students = db.query(Student).all()
-        student_options = {f"{s.id}: {s.name}": s.id for s in students}
+        # Only the top matches for the search term are loaded
+        student_id = student_picker("individual_student", "Student", multiple=False)
         
-        if not student_options:
-            st.info("No students found in the database. Please add students first.")
+        if student_id is None:
+            st.info("Search for a student by name or ID.")
         else:
             with st.form("individual_notification_form"):
-                student_selection = st.selectbox(
-                    "Select Student", 
-                    options=list(student_options.keys()),
-                    index=0 if student_options else None
-                )
+                channels = _select_channels("individual_channels")
                 
                 message = st.text_area(
                     "Message", 
                     placeholder="Enter your message here",
-                    help="This would be sent as an email or notification to the student."
+                    help="Delivered to the student by the selected channels."
                 )
                 
                 submitted = st.form_submit_button("Send Notification")
                 
                 if submitted:
-                    if message:
-                        student_id = student_options[student_selection]
+                    if not channels:
+                        st.error("Please select at least one channel")
+                    elif message:
                         student = db.query(Student).filter(Student.id == student_id).first()
                         
                         if student:
-                            st.success(f"Message would be sent to {student.name} ({student.email})")
-                            st.code(message)
+                            _queue_message([student], channels, message, student.name, "individual")
                         else:
                             st.error("Student not found")
                     else:
@@ -82,40 +142,32 @@ def show_notifications():
                     index=0 if class_options else None
                 )
                 
+                channels = _select_channels("class_channels")
+                
                 message = st.text_area(
                     "Message", 
                     placeholder="Enter your message here",
-                    help="This would be sent as an email or notification to all students enrolled in the selected class."
+                    help="Delivered to all students enrolled in the selected class by the selected channels."
                 )
                 
                 submitted = st.form_submit_button("Send to All Enrolled Students")
                 
                 if submitted:
-                    if message:
+                    if not channels:
+                        st.error("Please select at least one channel")
+                    elif message:
                         class_id = class_options[class_selection]
                         
-                        # Get enrollments for this class
-                        enrollments = db.query(ClassEnrollment).filter(ClassEnrollment.class_schedule_id == class_id).all()
-                        student_ids = [e.student_id for e in enrollments]
-                        students = db.query(Student).filter(Student.id.in_(student_ids)).all()
+                        # One join of enrollments and students, streamed to the outbox
+                        query = audience_query('class', class_id)
+                        recipient_count = count_recipients(query, db)
                         
-                        if students:
-                            st.success(f"Message would be sent to {len(students)} students enrolled in {class_selection}")
+                        if recipient_count:
+                            _queue_message(iter_recipients(query), channels, message, f"{recipient_count} students enrolled in {class_selection}", "class")
                             
                             # Show recipients in an expander
                             with st.expander("Recipients"):
-                                recipients_df = pd.DataFrame([
-                                    {
-                                        "ID": s.id,
-                                        "Name": s.name,
-                                        "Email": s.email,
-                                        "Phone": s.phone
-                                    }
-                                    for s in students
-                                ])
-                                st.dataframe(recipients_df)
-                            
-                            st.code(message)
+                                _show_preview(query, recipient_count, db)
                         else:
                             st.warning("No students enrolled in this class")
                     else:
@@ -131,14 +183,12 @@ def show_notifications():
             options=["All Students", "By Department", "By Year", "Custom List"]
         )
         
-        recipients = []
+        query, recipient_count = None, 0
         
         if recipient_type == "All Students":
-            # Get count of all students
-            student_count = db.query(Student).count()
-            st.info(f"This will send to all {student_count} students in the database.")
-            
-            recipients = db.query(Student).all()
+            query = audience_query('all')
+            recipient_count = count_recipients(query, db)
+            st.info(f"This will send to all {recipient_count} students in the database.")
             
         elif recipient_type == "By Department":
             # Get all unique departments
@@ -148,9 +198,10 @@ def show_notifications():
             if department_list:
                 selected_dept = st.selectbox("Select Department", department_list)
                 
-                # Get students in the selected department
-                recipients = db.query(Student).filter(Student.department == selected_dept).all()
-                st.info(f"This will send to {len(recipients)} students in the {selected_dept} department.")
+                # Count students in the selected department
+                query = audience_query('department', selected_dept)
+                recipient_count = count_recipients(query, db)
+                st.info(f"This will send to {recipient_count} students in the {selected_dept} department.")
             else:
                 st.warning("No departments found")
             
@@ -162,57 +213,35 @@ def show_notifications():
             if year_list:
                 selected_year = st.selectbox("Select Year", year_list)
                 
-                # Get students in the selected year
-                recipients = db.query(Student).filter(Student.year == selected_year).all()
-                st.info(f"This will send to {len(recipients)} students in Year {selected_year}.")
+                # Count students in the selected year
+                query = audience_query('year', selected_year)
+                recipient_count = count_recipients(query, db)
+                st.info(f"This will send to {recipient_count} students in Year {selected_year}.")
             else:
                 st.warning("No year data found")
             
         elif recipient_type == "Custom List":
-            # Get all students
-            all_students = db.query(Student).all()
+            selected_ids = student_picker("bulk_students", "Select Students")
             
-            if all_students:
-                # Create multiselect with student names
-                selected_students = st.multiselect(
-                    "Select Students",
-                    options=[f"{s.id}: {s.name}" for s in all_students],
-                    default=[]
-                )
-                
-                # Extract IDs from selections
-                if selected_students:
-                    selected_ids = [int(s.split(":")[0]) for s in selected_students]
-                    
-                    # Get selected students
-                    recipients = db.query(Student).filter(Student.id.in_(selected_ids)).all()
-                    st.info(f"This will send to {len(recipients)} selected students.")
-            else:
-                st.warning("No students in database")
+            if selected_ids:
+                # Count selected students
+                query = audience_query('custom', selected_ids)
+                recipient_count = count_recipients(query, db)
+                st.info(f"This will send to {recipient_count} selected students.")
+        
+        channels = _select_channels("bulk_channels")
         
         # Message input
         message = st.text_area(
             "Message", 
             placeholder="Enter your message here",
-            help="This would be sent as an email or notification to all selected recipients."
+            help="Delivered to all selected recipients by the selected channels."
         )
         
         # Preview recipients in an expander
         with st.expander("Preview Recipients"):
-            if recipients:
-                # Create DataFrame for recipients
-                recipients_df = pd.DataFrame([
-                    {
-                        "ID": r.id,
-                        "Name": r.name,
-                        "Department": r.department,
-                        "Year": r.year,
-                        "Email": r.email,
-                        "Phone": r.phone
-                    }
-                    for r in recipients
-                ])
-                st.dataframe(recipients_df)
+            if recipient_count:
+                _show_preview(query, recipient_count, db)
             else:
                 st.info("No recipients selected")
         
@@ -220,11 +249,14 @@ def show_notifications():
         if st.button("Send Bulk Notification"):
             if not message:
                 st.error("Please enter a message")
-            elif not recipients:
+            elif not recipient_count:
                 st.error("No recipients selected")
+            elif not channels:
+                st.error("Please select at least one channel")
             else:
-                st.success(f"Message would be sent to {len(recipients)} recipients")
-                st.code(message)
+                _queue_message(iter_recipients(query), channels, message, f"{recipient_count} recipients", "bulk")
+    
+    _show_delivery_status()
     
     # Close the database session
     db.close()
\ No newline at end of file
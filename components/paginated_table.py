@@ -0,0 +1,44 @@
+import streamlit as st
+
+from pagination import fetch_page, count_rows, DEFAULT_PAGE_SIZE, PAGE_SIZE_OPTIONS
+
+
+def show_paginated_table(columns: dict, key: str, sort_options: list, empty_message: str):
+    """Show one page of a table at a time, fetched from the database with keyset pagination."""
+    total = count_rows(columns)
+    if not total:
+        st.info(empty_message)
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        sort_by = st.selectbox("Sort by", sort_options, key=f"{key}_sort")
+    with col2:
+        page_size = st.selectbox("Rows per page", PAGE_SIZE_OPTIONS,
+                                 index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size")
+
+    # Changing the ordering invalidates the cursor, so start again from the first page
+    view = (sort_by, page_size)
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[f"{key}_cursor"] = {}
+        st.session_state[f"{key}_page_number"] = 1
+
+    page = fetch_page(columns, sort_by=sort_by, page_size=page_size, **st.session_state[f"{key}_cursor"])
+    st.dataframe(page['rows'], use_container_width=True, hide_index=True)
+
+    page_number = st.session_state[f"{key}_page_number"]
+    page_count = (total + page_size - 1) // page_size
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("◀ Previous", key=f"{key}_previous", disabled=not page['has_previous']):
+            st.session_state[f"{key}_cursor"] = {'before': page['first_key']}
+            st.session_state[f"{key}_page_number"] = max(page_number - 1, 1)
+            st.rerun()
+    with info_col:
+        st.caption(f"Page {page_number} of {page_count} · {total} records")
+    with next_col:
+        if st.button("Next ▶", key=f"{key}_next", disabled=not page['has_next']):
+            st.session_state[f"{key}_cursor"] = {'after': page['last_key']}
+            st.session_state[f"{key}_page_number"] = page_number + 1
+            st.rerun()
@@ -0,0 +1,21 @@
+import streamlit as st
+import pandas as pd
+
+from database import get_pool_stats
+
+
+def show_query_debug_panel(scope: dict):
+    """Show how many queries a page render issued and how long they took."""
+    with st.expander(f"🔧 Query debug: {scope['queries']} queries, {scope['db_ms']:.1f} ms"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Queries", scope['queries'])
+        col2.metric("DB time (ms)", f"{scope['db_ms']:.1f}")
+        col3.metric("Memoized hits", scope['cache_hits'])
+        st.caption("Connection pool")
+        st.json(get_pool_stats())
+        if scope['statements']:
+            st.dataframe(
+                pd.DataFrame(scope['statements'], columns=['Statement', 'ms']),
+                use_container_width=True,
+                hide_index=True
+            )
@@ -1,14 +1,14 @@
 import streamlit as st
-import pandas as pd
-from utils import validate_student_data
+from utils import validate_student_data, queue_student
+from bulk_read import STUDENT_COLUMNS
+from components.paginated_table import show_paginated_table
+from search import search_students
+from student_import import import_students, DEFAULT_BATCH_SIZE
 
 def show_student_management():
     st.header("Student Management")
 
-    if "students" not in st.session_state:
-        st.session_state.students = pd.DataFrame(columns=['ID', 'Name', 'Department', 'Year', 'Email', 'Phone'])
-
-    tab1, tab2, tab3 = st.tabs(["Add Student", "View/Edit Students", "Search Students"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Add Student", "View/Edit Students", "Search Students", "Bulk Import"])
 
     with tab1:
         with st.form("add_student_form"):
@@ -27,35 +27,49 @@ def show_student_management():
             if submitted:
                 valid, message = validate_student_data(id, name, department, year, email, phone)
                 if valid:
-                    new_student = pd.DataFrame([{
+                    _, message = queue_student({
                         'ID': id,
                         'Name': name,
                         'Department': department,
                         'Year': year,
                         'Email': email,
                         'Phone': phone
-                    }])
-                    st.session_state.students = pd.concat([st.session_state.students, new_student], ignore_index=True)
-                    st.success("Student added successfully!")
+                    })
+                    st.success(message)
                 else:
                     st.error(message)
 
     with tab2:
-        if not st.session_state.students.empty:
-            st.subheader("All Students")
-            st.dataframe(st.session_state.students, use_container_width=True)
-        else:
-            st.info("No students registered yet")
+        st.subheader("All Students")
+        show_paginated_table(STUDENT_COLUMNS, "students_table", ['ID', 'Name', 'Department', 'Year'], "No students registered yet")
 
     with tab3:
         st.subheader("Search Students")
-        search_term = st.text_input("Search by Name or ID")
+        search_term = st.text_input("Search by ID, name, email or department")
         if search_term:
-            result = st.session_state.students[
-                st.session_state.students['Name'].str.contains(search_term, case=False) |
-                st.session_state.students['ID'].str.contains(search_term, case=False)
-            ]
+            result = search_students(search_term)
             if not result.empty:
-                st.dataframe(result)
+                st.dataframe(result, hide_index=True)
+            else:
+                st.warning("No matching records found")
+
+    with tab4:
+        st.subheader("Bulk Import Students")
+        st.caption("Upload a CSV or Excel file with the columns Name, Department, Year, Email and Phone.")
+        uploaded = st.file_uploader("Student file", type=["csv", "xlsx"])
+        batch_size = st.number_input("Rows per batch", min_value=100, max_value=50000,
+                                     value=DEFAULT_BATCH_SIZE, step=100)
+        if uploaded and st.button("Import Students"):
+            try:
+                with st.spinner("Importing students..."):
+                    report = import_students(uploaded, uploaded.name, batch_size=int(batch_size))
+            except (ValueError, ImportError) as e:
+                st.error(str(e))
             else:
-                st.warning("No matching records found")
\ No newline at end of file
+                st.success(f"Imported {report['inserted']} of {report['rows_read']} rows "
+                           f"in {report['seconds']}s ({report['rows_per_second']} rows/s)")
+                if report['failed']:
+                    st.warning(f"{report['failed']} rows were not imported")
+                    st.dataframe(report['errors'], use_container_width=True, hide_index=True)
+                    st.download_button("Download error report", report['errors'].to_csv(index=False),
+                                       file_name="import_errors.csv", mime="text/csv")
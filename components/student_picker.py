@@ -0,0 +1,51 @@
+import streamlit as st
+
+from search import suggest_students, SUGGEST_LIMIT, SUGGEST_MIN_CHARS
+
+
+def _label(student) -> str:
+    student_id, name, department = student
+    return f"{name} ({student_id}, {department})"
+
+
+def _suggestions(key: str, term: str) -> dict:
+    """Suggestions for ``term`` as {id: label}; looked up only when the term changes, not on every rerun."""
+    cached = st.session_state.get(f"{key}_suggestions")
+    if cached is None or cached[0] != term:
+        cached = (term, {student[0]: _label(student) for student in suggest_students(term, SUGGEST_LIMIT)})
+        st.session_state[f"{key}_suggestions"] = cached
+    return cached[1]
+
+
+def student_picker(key: str, label: str = "Students", multiple: bool = True):
+    """Typeahead student picker: only the top matches for the typed name or ID reach the browser.
+
+    Returns the selected student IDs (a list), or with ``multiple=False`` the
+    selected ID or None. Widgets inside ``st.form`` only update on submit, so
+    place the picker above the form that uses it.
+    """
+    term = st.text_input(
+        f"Search {label.lower()}", key=f"{key}_term", placeholder="Type a name or ID",
+        help=f"Shows up to {SUGGEST_LIMIT} matches; names need at least {SUGGEST_MIN_CHARS} characters."
+    )
+    suggestions = _suggestions(key, term)
+
+    if not multiple:
+        if not suggestions:
+            if term.strip():
+                st.caption("No matching students")
+            return None
+        options = list(suggestions)
+        return st.selectbox(label, options, format_func=suggestions.get, key=f"{key}_choice")
+
+    # Earlier picks stay selectable while the suggestions change with the search term
+    selected = st.session_state.setdefault(f"{key}_selected", {})
+    options = {**selected, **suggestions}
+    # A new option list is a new widget, which starts from the remembered picks
+    options_key = hash(tuple(options))
+    chosen = st.multiselect(label, list(options), default=list(selected), format_func=options.get,
+                            key=f"{key}_choice_{options_key}")
+    st.session_state[f"{key}_selected"] = {student_id: options[student_id] for student_id in chosen}
+    if term.strip() and not suggestions:
+        st.caption("No matching students")
+    return chosen
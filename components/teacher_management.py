@@ -1,15 +1,14 @@
 import streamlit as st
-import pandas as pd
-from utils import validate_teacher_data
+from utils import validate_teacher_data, queue_teacher
+from bulk_read import TEACHER_COLUMNS
+from components.paginated_table import show_paginated_table
+from search import search_teachers
 
 def show_teacher_management():
     st.header("Teacher Management")
 
     tab1, tab2, tab3 = st.tabs(["Add Teacher", "View/Edit Teachers", "Search Teachers"])
 
-    if "teachers" not in st.session_state:
-        st.session_state.teachers = pd.DataFrame(columns=['ID', 'Name', 'Department', 'Subjects', 'Email', 'Phone'])
-
     with tab1:
         with st.form("add_teacher_form"):
             st.subheader("Add New Teacher")
@@ -27,35 +26,28 @@ def show_teacher_management():
             if submitted:
                 valid, message = validate_teacher_data(id, name, department, subjects, email, phone)
                 if valid:
-                    new_teacher = pd.DataFrame([{
+                    _, message = queue_teacher({
                         'ID': id,
                         'Name': name,
                         'Department': department,
                         'Subjects': subjects,
                         'Email': email,
                         'Phone': phone
-                    }])
-                    st.session_state.teachers = pd.concat([st.session_state.teachers, new_teacher], ignore_index=True)
-                    st.success("Teacher added successfully!")
+                    })
+                    st.success(message)
                 else:
                     st.error(message)
 
     with tab2:
-        if not st.session_state.teachers.empty:
-            st.subheader("All Teachers")
-            st.dataframe(st.session_state.teachers, use_container_width=True)
-        else:
-            st.info("No teachers registered yet")
+        st.subheader("All Teachers")
+        show_paginated_table(TEACHER_COLUMNS, "teachers_table", ['ID', 'Name', 'Department'], "No teachers registered yet")
 
     with tab3:
         st.subheader("Search Teachers")
-        search_term = st.text_input("Search by Name or ID")
+        search_term = st.text_input("Search by ID, name, email, department or subjects")
         if search_term:
-            result = st.session_state.teachers[
-                st.session_state.teachers['Name'].str.contains(search_term, case=False) |
-                st.session_state.teachers['ID'].str.contains(search_term, case=False)
-            ]
+            result = search_teachers(search_term)
             if not result.empty:
-                st.dataframe(result)
+                st.dataframe(result, hide_index=True)
             else:
                 st.warning("No matching records found")
\ No newline at end of file
@@ -1,7 +1,12 @@
+import bisect
 import os
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Time, Date
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import create_engine, exc, text, Index, Column, Integer, String, ForeignKey, Time, Date, DateTime, Text
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session, relationship
+from sqlalchemy.orm import Session, sessionmaker, scoped_session, relationship
 from dotenv import load_dotenv
 
 # Load environment variables from .env file if it exists
@@ -18,92 +23,126 @@ MYSQL_PORT = int(os.environ.get("MYSQL_PORT", "3306"))
 DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"  # Initialize this variable to be used throughout the module
 SQLALCHEMY_DATABASE_URL = "mysql+pymysql://root:@localhost:3306/college_management"
 
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Connection pool and engine tuning - override through environment variables
+POOL_SETTINGS = {
+    'pool_size': int(os.environ.get("DB_POOL_SIZE", "10")),
+    'max_overflow': int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+    'pool_timeout': float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+    'pool_recycle': int(os.environ.get("DB_POOL_RECYCLE", "3600")),
+    'pool_pre_ping': os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+}
+DB_ECHO = os.environ.get("DB_ECHO", "false").lower() in ("1", "true", "yes")
 
-try:
-    # Try to use MySQL if available
-    try:
-        import pymysql
-        print("Attempting to connect to MySQL database...")
-        # Create initial MySQL connection URL - may be updated later if host changes
-        DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
-        
-        # Test if connection works - first try the configured host
+# Upper bounds (ms) of the checkout latency histogram buckets
+CHECKOUT_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.histogram = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def _do_get(self):
+        started = time.perf_counter()
         try:
-            conn = pymysql.connect(
-                host=MYSQL_HOST,
-                user=MYSQL_USER,
-                password=MYSQL_PASSWORD,
-                port=MYSQL_PORT,
-                connect_timeout=5
-            )
-            conn.close()
-            print("MySQL connection successful")
-        except pymysql.err.OperationalError as e:
-            # Check for specific "Cannot assign requested address" error
-            if "Cannot assign requested address" in str(e):
-                if MYSQL_HOST.lower() == 'localhost':
-                    # Try with 127.0.0.1 instead
-                    print("Cannot connect to 'localhost', trying with '127.0.0.1' instead...")
-                    alt_host = '127.0.0.1'
-                    conn = pymysql.connect(
-                        host=alt_host,
-                        user=MYSQL_USER,
-                        password=MYSQL_PASSWORD,
-                        port=MYSQL_PORT,
-                        connect_timeout=5
-                    )
-                    conn.close()
-                    print("MySQL connection successful using 127.0.0.1")
-                    # Update the host for the connection string
-                    # MYSQL_HOST = alt_host
-                    # Update the database URL with the new host
-                    # DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            wait_ms = (time.perf_counter() - started) * 1000
+            with self.stats_lock:
+                self.checkouts += 1
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+                self.histogram[bisect.bisect_left(CHECKOUT_BUCKETS_MS, wait_ms)] += 1
+
+def create_app_engine(url: str = DATABASE_URL, **overrides):
+    """Create the application engine with the configured pool settings."""
+    settings = {**POOL_SETTINGS, **overrides}
+    return create_engine(url, poolclass=TimedQueuePool, echo=DB_ECHO, **settings)
+
+# Seconds between background connectivity checks; 0 disables the health-check thread
+DB_HEALTH_CHECK_INTERVAL = float(os.environ.get("DB_HEALTH_CHECK_INTERVAL", "0"))
+
+# The engine is built on first use so importing this module never touches the network
+_engine = None
+_engine_lock = threading.Lock()
+_health = {'ok': None, 'checked_at': None, 'latency_ms': None, 'error': None}
+
+def _check_health(engine):
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        ok, error = True, None
     except Exception as e:
-        raise RuntimeError(f"❌ MySQL connection failed: {e}")
-                # else:
-                    # Re-raise if we're not using 'localhost'
-                    # raise
-            # else:
-                # Re-raise for other operational errors
-                # raise
-    # except Exception as e:
-        # print(f"MySQL connection failed: {str(e)}")
-        # print("Falling back to SQLite database")
-        # DATABASE_URL = "sqlite:///college_management.db"
-# except Exception as e:
-    # print(f"Error setting up database connection: {str(e)}")
-    # print("Falling back to SQLite database")
-    # DATABASE_URL = "sqlite:///college_management.db"
-
-# Log database connection information for debugging (sanitized)
-# print(f"Using database: {'MySQL' if 'mysql' in DATABASE_URL.lower() else 'SQLite'}")
-
-# Configure SQLAlchemy engine
-# engine = create_engine(
-#     DATABASE_URL,
-#     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-#     pool_pre_ping=True,
-#     pool_recycle=3600,
-# )
-except Exception as e:
-    print(f"Unexpected error while setting up MySQL: {e}")
-
-# Create SQLAlchemy engine with MySQL only
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
-
-# Print which DB is being used
-print(f"Using database: {engine.url}")
+        ok, error = False, str(e)
+    if ok != _health['ok']:
+        print("Database connection healthy" if ok else f"Database connection failed: {error}")
+    _health.update({
+        'ok': ok,
+        'checked_at': time.time(),
+        'latency_ms': round((time.perf_counter() - started) * 1000, 2),
+        'error': error
+    })
+
+def _health_check_loop(engine, interval):
+    while True:
+        _check_health(engine)
+        time.sleep(interval)
+
+def start_health_check(engine, interval: float = DB_HEALTH_CHECK_INTERVAL):
+    """Check connectivity every ``interval`` seconds on a daemon thread."""
+    thread = threading.Thread(target=_health_check_loop, args=(engine, interval), name="db-health-check", daemon=True)
+    thread.start()
+    return thread
+
+def get_db_health():
+    """Result of the most recent background health check (``ok`` is None if none has run)."""
+    return dict(_health)
+
+def get_engine():
+    """Return the application engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_app_engine()
+                print(f"Using database: {_engine.url}")
+                if DB_HEALTH_CHECK_INTERVAL > 0:
+                    start_health_check(_engine)
+    return _engine
+
+def set_engine(new_engine):
+    """Replace the application engine, e.g. to point tools and benchmarks at another database."""
+    global _engine
+    with _engine_lock:
+        _engine = new_engine
+    SessionLocal.remove()
+
+def __getattr__(name):
+    # Keep ``database.engine`` working for existing callers without building it at import
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class AppSession(Session):
+    """Session that binds to the lazily created application engine."""
 
+    def __init__(self, bind=None, **kwargs):
+        super().__init__(bind=bind if bind is not None else get_engine(), **kwargs)
 
 
 # Create session factory
-SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+SessionLocal = scoped_session(sessionmaker(class_=AppSession, autocommit=False, autoflush=False))
 Base = declarative_base()
 
 # Define User model
@@ -133,6 +172,12 @@ class Student(Base):
     user = relationship("User", back_populates="student")
     enrollments = relationship("ClassEnrollment", back_populates="student")
 
+    __table_args__ = (
+        Index("ix_students_department_year", "department", "year"),
+        Index("ix_students_year", "year"),
+        Index("ix_students_user_id", "user_id"),
+    )
+
 # Define Teacher model
 class Teacher(Base):
     __tablename__ = "teachers"
@@ -148,6 +193,11 @@ class Teacher(Base):
     user = relationship("User", back_populates="teacher")
     classes = relationship("ClassSchedule", back_populates="teacher")
 
+    __table_args__ = (
+        Index("ix_teachers_department", "department"),
+        Index("ix_teachers_user_id", "user_id"),
+    )
+
 # Define Course model
 class Course(Base):
     __tablename__ = "courses"
@@ -178,6 +228,12 @@ class ClassSchedule(Base):
     teacher = relationship("Teacher", back_populates="classes")
     enrollments = relationship("ClassEnrollment", back_populates="class_schedule")
 
+    __table_args__ = (
+        Index("ix_class_schedules_teacher_semester", "teacher_id", "semester"),
+        Index("ix_class_schedules_course_id", "course_id"),
+        Index("ix_class_schedules_semester_day", "semester", "day_of_week"),
+    )
+
 # Define ClassEnrollment model (for many-to-many relationship between students and classes)
 class ClassEnrollment(Base):
     __tablename__ = "class_enrollments"
@@ -190,9 +246,62 @@ class ClassEnrollment(Base):
     student = relationship("Student", back_populates="enrollments")
     class_schedule = relationship("ClassSchedule", back_populates="enrollments")
 
+    # A student can be enrolled in a class only once; the unique index also serves student_id lookups
+    __table_args__ = (
+        Index("uq_enrollment_student_class", "student_id", "class_schedule_id", unique=True),
+        Index("ix_class_enrollments_class_schedule_id", "class_schedule_id"),
+    )
+
+# Define StatCount model (materialized counts read by the dashboard, maintained by stats.py)
+class StatCount(Base):
+    __tablename__ = "stats_counts"
+    entity = Column(String(20), primary_key=True)  # students, teachers
+    dimension = Column(String(20), primary_key=True)  # department, year, total
+    value = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+# Define OutboxMessage model (notifications waiting for, or done with, delivery by outbox.py)
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String(64), nullable=False)
+    channel = Column(String(10), nullable=False)  # email, sms
+    recipient = Column(String(100), nullable=False)
+    subject = Column(String(200), nullable=True)
+    body = Column(Text, nullable=False)
+    status = Column(String(10), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(String(500), nullable=True)
+    claimed_by = Column(String(32), nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    # Enqueueing the same key twice is a no-op; workers poll by (channel, status, next_attempt_at)
+    __table_args__ = (
+        Index("uq_outbox_idempotency_key", "idempotency_key", unique=True),
+        Index("ix_outbox_channel_status_next", "channel", "status", "next_attempt_at"),
+    )
+
 def init_db():
-    """Initialize the database and create tables."""
-    Base.metadata.create_all(bind=engine)
+    """Initialize the database: create tables and apply pending schema migrations."""
+    from migrations import run_migrations
+    run_migrations(get_engine())
+
+# Set once the first render in this process has run init_db()
+_bootstrapped = False
+_bootstrap_lock = threading.Lock()
+
+def bootstrap_db():
+    """Run init_db() once per process; later calls return without touching the database."""
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    with _bootstrap_lock:
+        if not _bootstrapped:
+            init_db()
+            _bootstrapped = True
 
 def get_db():
     """Database session generator."""
@@ -201,3 +310,38 @@ def get_db():
         yield db
     finally:
         db.close()
+
+@contextmanager
+def session_scope():
+    """Unit of work: one pooled connection for the block, rolled back on error and always released."""
+    # A plain (not thread-scoped) session so nested helpers cannot close it underneath us
+    db = SessionLocal.session_factory()
+    try:
+        db.connection()
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def get_pool_stats():
+    """Connection pool usage and checkout latency for the application engine."""
+    pool = get_engine().pool
+    stats = {
+        'pool_size': pool.size() if hasattr(pool, 'size') else None,
+        'max_overflow': POOL_SETTINGS['max_overflow'],
+        'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+        'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+    }
+    if isinstance(pool, TimedQueuePool):
+        with pool.stats_lock:
+            labels = [f"<={bound}ms" for bound in CHECKOUT_BUCKETS_MS] + [f">{CHECKOUT_BUCKETS_MS[-1]}ms"]
+            stats.update({
+                'checkouts': pool.checkouts,
+                'timeouts': pool.timeouts,
+                'avg_wait_ms': round(pool.total_wait_ms / pool.checkouts, 2) if pool.checkouts else 0.0,
+                'max_wait_ms': round(pool.max_wait_ms, 2),
+                'wait_histogram': dict(zip(labels, pool.histogram))
+            })
+    return stats
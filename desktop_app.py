@@ -6,7 +6,6 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import re
-import hashlib
 import os
 from datetime import datetime, date, time
 from dotenv import load_dotenv
@@ -18,6 +17,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session, relationship
 from typing import List, Optional, Tuple
 
+from passwords import hash_password, verify_password
+
 # Page configuration
 st.set_page_config(
     page_title="College Management System",
@@ -211,7 +212,7 @@ def init_db():
             # Create default admin user
             admin_user = User(
                 username='admin',
-                password=hashlib.sha256('admin123'.encode()).hexdigest(),
+                password=hash_password('admin123'),
                 role='admin'
             )
             db.add(admin_user)
@@ -232,10 +233,6 @@ def get_db():
 
 #-------------------- UTILITY FUNCTIONS --------------------#
 
-def hash_password(password: str) -> str:
-    """Hash a password for storing."""
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def initialize_session_state():
     """Initialize session state variables."""
     if 'authenticated' not in st.session_state:
@@ -404,7 +401,7 @@ def login(username: str, password: str) -> bool:
     db = get_db()
     try:
         user = db.query(User).filter(User.username == username).first()
-        if user and user.password == hash_password(password):
+        if user and verify_password(password, user.password)[0]:
             st.session_state.authenticated = True
             st.session_state.user_role = user.role
             st.session_state.username = username
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.express as px
+import plotly.io as pio
+
+# Maximum number of serialized figures kept in memory (shared by all sessions)
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", "64"))
+
+CHART_BUILDERS = {
+    'pie': lambda data, title: px.pie(values=list(data.values()), names=list(data.keys()), title=title),
+    'bar': lambda data, title: px.bar(x=list(data.keys()), y=list(data.values()), title=title)
+}
+
+
+class FigureCache:
+    """Size-bounded LRU of Plotly figure JSON keyed on a hash of the chart's input data."""
+
+    def __init__(self, max_entries: int = FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(kind: str, data: dict, title: str) -> str:
+        payload = json.dumps([kind, title, [[str(k), v] for k, v in data.items()]])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_json(self, kind: str, data: dict, title: str) -> str:
+        """Return the serialized figure, building it only when this data has not been charted before."""
+        key = self.make_key(kind, data, title)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        figure_json = CHART_BUILDERS[kind](data, title).to_json()
+        with self._lock:
+            self._entries[key] = figure_json
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return figure_json
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(kind: str, data: dict, title: str):
+    """Return a Plotly figure for ``data`` ('pie' or 'bar'), reusing cached JSON across sessions."""
+    return pio.from_json(figure_cache.get_json(kind, data, title), skip_invalid=True)
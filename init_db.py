@@ -3,6 +3,7 @@ from db_config import Base, engine
 from database import User, Student, Teacher, Course, ClassSchedule, ClassEnrollment
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from migrations import run_migrations
 
 SQLALCHEMY_DATABASE_URL = "mysql+pymysql://root:@localhost:3306/college_management"
 
@@ -10,24 +11,9 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 def init_db():
-    """Initialize database tables and default data"""
-    Base.metadata.create_all(bind=engine)
-    
-    # Add default admin user
-    from auth import hash_password
-    db = SessionLocal()
-    try:
-        if not db.query(User).filter(User.username == 'admin').first():
-            admin = User(
-                username='admin',
-                password=hash_password('admin123'),
-                role='admin'
-            )
-            db.add(admin)
-            db.commit()
-            print("✅ Default admin user created")
-    finally:
-        db.close()
+    """Initialize database tables and default data (the admin account is seeded by a migration)"""
+    run_migrations(engine)
+
 
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
@@ -1,7 +1,8 @@
 import streamlit as st
-from components import dashboard, student_management, teacher_management, class_schedule, database_diagnostics
+from components import dashboard, student_management, teacher_management, class_schedule, database_diagnostics, notifications
 from utils import initialize_session_state
 from auth import init_auth, show_login_form, logout
+from permissions import PAGE_CAPABILITIES, can, pages_for
 from database import init_db 
 # from database import SessionLocal
 # from services.registration import register_user
@@ -170,27 +171,13 @@ def main():
     if st.session_state.authenticated:
         with header_left:
             # Show navigation based on role
-            if st.session_state.user_role == 'admin':
-                page = st.radio(
-                    "Navigation",
-                    ["Dashboard", "Student Management", "Teacher Management", "Class Schedule", "Notifications", "User Management", "Database Diagnostics"],
-                    horizontal=True,
-                    key="nav_admin"
-                )
-            elif st.session_state.user_role == 'teacher':
-                page = st.radio(
-                    "Navigation",
-                    ["Dashboard", "Student Management", "Class Schedule", "Notifications"],
-                    horizontal=True,
-                    key="nav_teacher"
-                )
-            else:  # student role
-                page = st.radio(
-                    "Navigation",
-                    ["Dashboard", "Class Schedule"],
-                    horizontal=True,
-                    key="nav_student"
-                )
+            role = st.session_state.user_role
+            page = st.radio(
+                "Navigation",
+                list(pages_for(role)),
+                horizontal=True,
+                key=f"nav_{role}"
+            )
     else:
         show_login_form()
         st.stop()
@@ -198,22 +185,24 @@ def main():
     st.divider()
 
     # Page routing with role-based access
-    if page == "Dashboard":
+    if not can(role, PAGE_CAPABILITIES.get(page)):
+        st.error("You don't have permission to access this page")
+    elif page == "Dashboard":
         dashboard.show_dashboard()
-    elif page == "Student Management" and st.session_state.user_role in ['admin', 'teacher']:
+    elif page == "Student Management":
         student_management.show_student_management()
-    elif page == "Teacher Management" and st.session_state.user_role == 'admin':
+    elif page == "Teacher Management":
         teacher_management.show_teacher_management()
     elif page == "Class Schedule":
         # All roles have access to class schedule, but with different permissions
         class_schedule.show_schedule_management()
-    elif page == "User Management" and st.session_state.user_role == 'admin':
+    elif page == "User Management":
         from auth import show_register_form
         st.header("User Management")
         show_register_form()
-    # elif page == "Notifications" and st.session_state.user_role in ['admin', 'teacher']:
-        # notifications.show_notifications()
-    elif page == "Database Diagnostics" and st.session_state.user_role == 'admin':
+    elif page == "Notifications":
+        notifications.show_notifications()
+    elif page == "Database Diagnostics":
         database_diagnostics.show_database_diagnostics()
     else:
         st.error("You don't have permission to access this page")
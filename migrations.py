@@ -0,0 +1,148 @@
+"""Versioned schema migrations.
+
+Each entry in ``MIGRATIONS`` is ``(version, description, upgrade)``, where
+``upgrade(conn)`` runs inside one transaction. Applied versions are recorded
+in the ``schema_migrations`` table, so ``run_migrations`` only runs what a
+database has not seen yet. Upgrades must be idempotent (``checkfirst`` etc.):
+MySQL commits DDL implicitly, so a failed migration may be retried on a
+partially upgraded schema.
+
+Add new migrations at the end with the next version number; never edit or
+reorder one that has shipped.
+
+Usage: python migrations.py [--status]
+"""
+import sys
+import threading
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select, insert, text, exc
+
+from database import Base, User, OutboxMessage, get_engine
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+_migrate_lock = threading.Lock()
+
+# Seeded on first run; change the password after logging in
+DEFAULT_ADMIN_USERNAME = "admin"
+DEFAULT_ADMIN_PASSWORD = "admin123"
+
+
+def _create_indexes(conn, *names):
+    """Create the named model indexes (declared in ``database.py``) unless they already exist."""
+    indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        indexes[name].create(bind=conn, checkfirst=True)
+
+
+def _initial_schema(conn):
+    Base.metadata.create_all(bind=conn)
+
+
+def _unique_enrollments(conn):
+    # Keep the earliest enrollment of any duplicated (student, class) pair so the unique index can be built
+    conn.execute(text(
+        "DELETE FROM class_enrollments WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MIN(id) AS id FROM class_enrollments "
+        "GROUP BY student_id, class_schedule_id) AS keep)"
+    ))
+    _create_indexes(conn, "uq_enrollment_student_class")
+
+
+def _search_indexes(conn):
+    from search import create_search_indexes
+    create_search_indexes(conn)
+
+
+def _hot_path_indexes(conn):
+    _create_indexes(
+        conn,
+        "ix_class_enrollments_class_schedule_id",
+        "ix_class_schedules_teacher_semester",
+        "ix_class_schedules_course_id",
+        "ix_class_schedules_semester_day",
+        "ix_students_department_year",
+        "ix_students_year",
+        "ix_students_user_id",
+        "ix_teachers_department",
+        "ix_teachers_user_id"
+    )
+
+
+def _default_admin(conn):
+    from passwords import hash_password
+    if conn.execute(select(User.id).where(User.username == DEFAULT_ADMIN_USERNAME)).first() is None:
+        conn.execute(insert(User).values(
+            username=DEFAULT_ADMIN_USERNAME, password=hash_password(DEFAULT_ADMIN_PASSWORD), role='admin'
+        ))
+        print("Default admin user created")
+
+
+def _notification_outbox(conn):
+    OutboxMessage.__table__.create(bind=conn, checkfirst=True)
+
+
+def _name_prefix_index(conn):
+    from search import create_prefix_indexes
+    create_prefix_indexes(conn)
+
+
+MIGRATIONS = [
+    (1, "Initial schema", _initial_schema),
+    (2, "Unique (student, class) enrollments", _unique_enrollments),
+    (3, "Full-text search indexes", _search_indexes),
+    (4, "Indexes for schedule, enrollment and roster lookups", _hot_path_indexes),
+    (5, "Default admin account", _default_admin),
+    (6, "Notification outbox", _notification_outbox),
+    (7, "Student name prefix index", _name_prefix_index),
+]
+
+
+def applied_versions(engine=None) -> set:
+    """Versions already recorded in ``schema_migrations``."""
+    engine = engine or get_engine()
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine=None) -> list:
+    """Apply pending migrations in version order; returns the versions applied."""
+    engine = engine or get_engine()
+    applied = []
+    with _migrate_lock:
+        done = applied_versions(engine)
+        for version, description, upgrade in MIGRATIONS:
+            if version in done:
+                continue
+            try:
+                with engine.begin() as conn:
+                    upgrade(conn)
+                    conn.execute(insert(schema_migrations).values(
+                        version=version, description=description, applied_at=datetime.now()
+                    ))
+            except exc.IntegrityError:
+                # Another process recorded this version first
+                if version in applied_versions(engine):
+                    continue
+                raise
+            print(f"Applied migration {version}: {description}")
+            applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        done = applied_versions()
+        for version, description, _ in MIGRATIONS:
+            print(f"{version:>4}  {'applied' if version in done else 'pending':8} {description}")
+    else:
+        applied = run_migrations()
+        print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
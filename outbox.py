@@ -0,0 +1,652 @@
+"""Notification outbox and delivery workers.
+
+Sending a notification only inserts rows into the ``outbox`` table (one per
+recipient and channel) and returns. A pool of worker threads drains the
+table: each channel (email, SMS) gets its own workers, so the number of
+workers caps how many batches are in flight against that provider at once.
+A worker claims a batch of due rows, hands it to the channel's transport
+(the SMTP transport sends a whole batch over one connection) and records
+the outcome. Failed messages are retried with exponential backoff until
+``NOTIFY_MAX_ATTEMPTS``; permanent failures (rejected address, 4xx from
+Twilio) are not retried.
+
+Every row has an idempotency key, unique in the table, so enqueueing the
+same message to the same recipient twice within one send (a double-clicked
+send button, a retried request) delivers it once, while a deliberate resend
+is a new send and is delivered again. Delivery is at-least-once: a worker
+that dies after the provider accepted a message but before marking it sent
+leaves a claim that is released and retried after ``CLAIM_TIMEOUT``.
+
+Transports are pluggable. Without SMTP/Twilio settings the in-memory
+``FakeSMTPServer`` / ``FakeTwilioClient`` stand-ins are used, which accept
+messages (optionally with latency and random failures) and keep them for
+inspection.
+
+Usage: python outbox.py [--status]   (runs standalone delivery workers)
+"""
+import hashlib
+import os
+import random
+import smtplib
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import session_scope, OutboxMessage
+
+SMTP_HOST = os.environ.get("SMTP_HOST", "")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
+SMTP_USERNAME = os.environ.get("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
+SMTP_SENDER = os.environ.get("SMTP_SENDER", "noreply@college.edu")
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "1") == "1"
+TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID", "")
+TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN", "")
+TWILIO_PHONE_NUMBER = os.environ.get("TWILIO_PHONE_NUMBER", "")
+
+# smtp | fake and twilio | fake; the real transport is used when its settings are present
+NOTIFY_EMAIL_TRANSPORT = os.environ.get("NOTIFY_EMAIL_TRANSPORT", "smtp" if SMTP_HOST else "fake")
+NOTIFY_SMS_TRANSPORT = os.environ.get("NOTIFY_SMS_TRANSPORT", "twilio" if TWILIO_ACCOUNT_SID else "fake")
+
+# Worker threads per channel, i.e. the most batches in flight against each provider
+NOTIFY_CONCURRENCY = {
+    'email': int(os.environ.get("NOTIFY_EMAIL_CONCURRENCY", "4")),
+    'sms': int(os.environ.get("NOTIFY_SMS_CONCURRENCY", "2"))
+}
+NOTIFY_BATCH_SIZE = int(os.environ.get("NOTIFY_BATCH_SIZE", "50"))
+NOTIFY_MAX_ATTEMPTS = int(os.environ.get("NOTIFY_MAX_ATTEMPTS", "5"))
+# Retry n waits about NOTIFY_RETRY_BASE * 2**(n-1) seconds, capped at NOTIFY_RETRY_MAX
+NOTIFY_RETRY_BASE = float(os.environ.get("NOTIFY_RETRY_BASE", "2"))
+NOTIFY_RETRY_MAX = float(os.environ.get("NOTIFY_RETRY_MAX", "300"))
+NOTIFY_POLL_INTERVAL = float(os.environ.get("NOTIFY_POLL_INTERVAL", "0.5"))
+# Rows per INSERT when enqueueing
+ENQUEUE_CHUNK = 1000
+# Claims older than this belong to a worker that died mid-batch and are released
+CLAIM_TIMEOUT = 300.0
+# Pause before retrying after the database could not be reached
+RETRY_DELAY = 5.0
+
+DEFAULT_SUBJECT = "College Management notification"
+CHANNELS = ('email', 'sms')
+
+
+class PermanentDeliveryError(Exception):
+    """The provider rejected the message for good (bad address, invalid number); it is not retried."""
+
+
+class Transport(ABC):
+    """Delivers messages for one channel; messages are dicts with id, idempotency_key, recipient, subject and body."""
+
+    channel = None
+
+    @abstractmethod
+    def send(self, message: dict):
+        """Deliver one message, raising on failure."""
+
+    def send_batch(self, messages: list) -> dict:
+        """Deliver ``messages``; returns {message id: None if delivered, else the exception}."""
+        results = {}
+        for message in messages:
+            try:
+                self.send(message)
+                results[message['id']] = None
+            except Exception as e:
+                results[message['id']] = e
+        return results
+
+
+class SMTPTransport(Transport):
+    """Email over SMTP, one connection (and login) per batch."""
+
+    channel = 'email'
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, username: str = SMTP_USERNAME,
+                 password: str = SMTP_PASSWORD, sender: str = SMTP_SENDER, starttls: bool = SMTP_STARTTLS,
+                 connect=smtplib.SMTP):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.starttls = starttls
+        self.connect = connect
+
+    def _build(self, message: dict) -> EmailMessage:
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = message['recipient']
+        email['Subject'] = message['subject'] or DEFAULT_SUBJECT
+        # Lets receiving servers and clients drop a redelivered copy
+        email['Message-ID'] = f"<{message['idempotency_key']}@college-management>"
+        email.set_content(message['body'])
+        return email
+
+    def send(self, message: dict):
+        error = self.send_batch([message])[message['id']]
+        if error is not None:
+            raise error
+
+    def send_batch(self, messages: list) -> dict:
+        results = {}
+        smtp = self.connect(self.host, self.port, timeout=30)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                try:
+                    smtp.send_message(self._build(message))
+                    results[message['id']] = None
+                except smtplib.SMTPRecipientsRefused as e:
+                    results[message['id']] = PermanentDeliveryError(f"Recipient refused: {e.recipients}")
+                except smtplib.SMTPResponseException as e:
+                    permanent = 500 <= e.smtp_code < 600
+                    results[message['id']] = PermanentDeliveryError(str(e)) if permanent else e
+                except Exception as e:
+                    results[message['id']] = e
+        finally:
+            try:
+                smtp.quit()
+            except Exception:
+                pass
+        return results
+
+
+class TwilioTransport(Transport):
+    """SMS through Twilio (or any client with the ``client.messages.create`` API)."""
+
+    channel = 'sms'
+
+    def __init__(self, client=None, from_number: str = TWILIO_PHONE_NUMBER,
+                 account_sid: str = TWILIO_ACCOUNT_SID, auth_token: str = TWILIO_AUTH_TOKEN):
+        if client is None:
+            try:
+                from twilio.rest import Client
+            except ImportError:
+                raise ImportError("The twilio SMS transport requires twilio (pip install twilio)")
+            client = Client(account_sid, auth_token)
+        self.client = client
+        self.from_number = from_number
+
+    def send(self, message: dict):
+        try:
+            self.client.messages.create(to=message['recipient'], from_=self.from_number, body=message['body'])
+        except Exception as e:
+            status = getattr(e, 'status', None)
+            # 4xx means the request itself is wrong (bad number etc.), except rate limiting
+            if isinstance(status, int) and 400 <= status < 500 and status != 429:
+                raise PermanentDeliveryError(str(e)) from e
+            raise
+
+
+class FakeSMTPServer:
+    """In-memory stand-in for an SMTP server; pass it as ``SMTPTransport(connect=...)``.
+
+    Accepted messages are kept in ``sent``. ``latency`` is added per message,
+    ``failure_rate`` of them fail with a transient 451 and addresses in
+    ``rejected`` are refused.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, rejected=()):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rejected = set(rejected)
+        self.sent = []
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, host, port, timeout=None):
+        with self._lock:
+            self.connections += 1
+        return _FakeSMTPConnection(self)
+
+
+class _FakeSMTPConnection:
+    def __init__(self, server: FakeSMTPServer):
+        self.server = server
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def send_message(self, message):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if message['To'] in self.server.rejected:
+            raise smtplib.SMTPRecipientsRefused({message['To']: (550, b"No such user")})
+        if random.random() < self.server.failure_rate:
+            raise smtplib.SMTPResponseException(451, b"Temporary failure, try again later")
+        with self.server._lock:
+            self.server.sent.append(message)
+
+    def quit(self):
+        pass
+
+
+class FakeTwilioError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class FakeTwilioClient:
+    """In-memory stand-in for ``twilio.rest.Client``; pass it as ``TwilioTransport(client=...)``.
+
+    Accepted messages are kept in ``sent`` as (to, from, body). ``latency`` is
+    added per message, ``failure_rate`` of them fail with a transient 503 and
+    numbers with anything but digits (and a leading +) are rejected with a 400.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sent = []
+        self.messages = self
+        self._lock = threading.Lock()
+
+    def create(self, to: str, from_: str, body: str):
+        if self.latency:
+            time.sleep(self.latency)
+        if not to.lstrip("+").isdigit():
+            raise FakeTwilioError(400, f"The 'To' number {to} is not a valid phone number")
+        if random.random() < self.failure_rate:
+            raise FakeTwilioError(503, "Service unavailable")
+        with self._lock:
+            self.sent.append((to, from_, body))
+
+
+def default_transports() -> dict:
+    """Transports selected by NOTIFY_EMAIL_TRANSPORT / NOTIFY_SMS_TRANSPORT."""
+    return {
+        'email': SMTPTransport() if NOTIFY_EMAIL_TRANSPORT == 'smtp' else SMTPTransport(connect=FakeSMTPServer()),
+        'sms': TwilioTransport() if NOTIFY_SMS_TRANSPORT == 'twilio' else TwilioTransport(client=FakeTwilioClient())
+    }
+
+
+class DeliveryMetrics:
+    """Delivery counters per channel plus messages/s over a sliding window."""
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self.started = time.monotonic()
+        self.counts = {channel: {'sent': 0, 'retried': 0, 'failed': 0, 'batches': 0, 'last_batch_ms': 0.0}
+                       for channel in CHANNELS}
+        self._recent = deque()  # (monotonic time, channel, messages delivered)
+        self._lock = threading.Lock()
+
+    def record(self, channel: str, sent: int, retried: int, failed: int, elapsed_ms: float):
+        now = time.monotonic()
+        with self._lock:
+            counts = self.counts[channel]
+            counts['sent'] += sent
+            counts['retried'] += retried
+            counts['failed'] += failed
+            counts['batches'] += 1
+            counts['last_batch_ms'] = round(elapsed_ms, 2)
+            if sent:
+                self._recent.append((now, channel, sent))
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self._recent and self._recent[0][0] < now - self.window:
+            self._recent.popleft()
+
+    def rate(self, channel: str = None) -> float:
+        """Messages delivered per second over the last ``window`` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            delivered = sum(count for _, c, count in self._recent if channel is None or c == channel)
+        return delivered / max(min(self.window, now - self.started), 1e-3)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = {channel: dict(values) for channel, values in self.counts.items()}
+        for channel in counts:
+            counts[channel]['messages_per_sec'] = round(self.rate(channel), 2)
+        return counts
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before attempt ``attempts + 1``, with jitter so failed batches do not retry in lockstep."""
+    return min(NOTIFY_RETRY_MAX, NOTIFY_RETRY_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+class DeliveryEngine:
+    """Worker threads that drain the outbox, ``concurrency[channel]`` of them per channel."""
+
+    def __init__(self, transports: dict = None, concurrency: dict = None, batch_size: int = NOTIFY_BATCH_SIZE,
+                 poll_interval: float = NOTIFY_POLL_INTERVAL, max_attempts: int = NOTIFY_MAX_ATTEMPTS):
+        self.transports = transports if transports is not None else default_transports()
+        self.concurrency = {**NOTIFY_CONCURRENCY, **(concurrency or {})}
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.metrics = DeliveryMetrics()
+        self._workers = {channel: [] for channel in self.transports}
+        self._workers_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._last_release = 0.0
+
+    def start(self):
+        """Start (or top up) the worker threads of every channel."""
+        self._stop.clear()
+        with self._workers_lock:
+            for channel, workers in self._workers.items():
+                workers[:] = [worker for worker in workers if worker.is_alive()]
+                while len(workers) < self.concurrency.get(channel, 1):
+                    worker = threading.Thread(
+                        target=self._run, args=(channel,), name=f"outbox-{channel}-{len(workers)}", daemon=True
+                    )
+                    worker.start()
+                    workers.append(worker)
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self.notify()
+        with self._workers_lock:
+            for workers in self._workers.values():
+                for worker in workers:
+                    worker.join(timeout)
+                workers.clear()
+
+    def notify(self):
+        """Wake idle workers, e.g. right after enqueueing."""
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _release_stale_claims(self):
+        now = datetime.now()
+        with session_scope() as db:
+            db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.status == 'sending', OutboxMessage.claimed_at < now - timedelta(seconds=CLAIM_TIMEOUT))
+                .values(status='pending', claimed_by=None, claimed_at=None)
+            )
+            db.commit()
+
+    def _claim(self, channel: str, token: str) -> list:
+        """Mark up to ``batch_size`` due messages of ``channel`` as sending by this worker and return them."""
+        if time.monotonic() - self._last_release > CLAIM_TIMEOUT / 2:
+            self._last_release = time.monotonic()
+            self._release_stale_claims()
+        now = datetime.now()
+        with session_scope() as db:
+            ids = db.execute(
+                select(OutboxMessage.id)
+                .where(OutboxMessage.channel == channel, OutboxMessage.status == 'pending',
+                       OutboxMessage.next_attempt_at <= now)
+                .order_by(OutboxMessage.next_attempt_at)
+                .limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                return []
+            # Only rows still pending are taken, so concurrent workers (in any process) never share a row
+            db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(ids), OutboxMessage.status == 'pending')
+                .values(status='sending', claimed_by=token, claimed_at=now)
+            )
+            db.commit()
+            rows = db.execute(
+                select(OutboxMessage.id, OutboxMessage.idempotency_key, OutboxMessage.recipient,
+                       OutboxMessage.subject, OutboxMessage.body, OutboxMessage.attempts)
+                .where(OutboxMessage.id.in_(ids), OutboxMessage.claimed_by == token,
+                       OutboxMessage.status == 'sending')
+            ).mappings().all()
+        return [dict(row) for row in rows]
+
+    def _deliver(self, channel: str, messages: list, token: str):
+        started = time.perf_counter()
+        try:
+            results = self.transports[channel].send_batch(messages)
+        except Exception as e:
+            # Provider unreachable: the whole batch is retried later
+            results = {message['id']: e for message in messages}
+        self._record(channel, messages, results, (time.perf_counter() - started) * 1000, token)
+
+    def _record(self, channel: str, messages: list, results: dict, elapsed_ms: float, token: str):
+        """Store the outcome of a batch claimed with ``token``.
+
+        Every update is fenced on the claim: a row whose claim timed out and
+        was released (and possibly claimed by another worker) is left alone,
+        so a slow worker cannot overwrite the newer state.
+        """
+        now = datetime.now()
+        sent = [message['id'] for message in messages if results.get(message['id']) is None]
+        delivered = retried = failed = 0
+        claimed = (OutboxMessage.claimed_by == token, OutboxMessage.status == 'sending')
+        with session_scope() as db:
+            if sent:
+                delivered = db.execute(
+                    update(OutboxMessage).where(OutboxMessage.id.in_(sent), *claimed)
+                    .values(status='sent', attempts=OutboxMessage.attempts + 1, sent_at=now,
+                            last_error=None, claimed_by=None, claimed_at=None)
+                ).rowcount
+            for message in messages:
+                error = results.get(message['id'])
+                if error is None:
+                    continue
+                attempts = message['attempts'] + 1
+                values = {'attempts': attempts, 'last_error': str(error)[:500], 'claimed_by': None, 'claimed_at': None}
+                gave_up = isinstance(error, PermanentDeliveryError) or attempts >= self.max_attempts
+                if gave_up:
+                    values['status'] = 'failed'
+                else:
+                    values.update(status='pending', next_attempt_at=now + timedelta(seconds=retry_delay(attempts)))
+                updated = db.execute(
+                    update(OutboxMessage).where(OutboxMessage.id == message['id'], *claimed).values(**values)
+                ).rowcount
+                if gave_up:
+                    failed += updated
+                else:
+                    retried += updated
+            db.commit()
+        self.metrics.record(channel, delivered, retried, failed, elapsed_ms)
+
+    def _run(self, channel: str):
+        token = uuid.uuid4().hex
+        while not self._stop.is_set():
+            try:
+                messages = self._claim(channel, token)
+                if messages:
+                    self._deliver(channel, messages, token)
+                    if len(messages) == self.batch_size:
+                        continue
+            except Exception as e:
+                # Database unreachable: claimed rows are released after CLAIM_TIMEOUT
+                print(f"Notification delivery ({channel}) failed, retrying: {e}")
+                self._stop.wait(RETRY_DELAY)
+                continue
+            with self._wakeup:
+                self._wakeup.wait(self.poll_interval)
+
+    def wait_until_delivered(self, timeout: float = 30.0) -> bool:
+        """Block until no message is pending or sending (or ``timeout`` passes); returns True if none is."""
+        deadline = time.monotonic() + timeout
+        while True:
+            counts = outbox_counts()
+            if not counts.get('pending', 0) + counts.get('sending', 0):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            self.notify()
+            time.sleep(0.05)
+
+    def stats(self) -> dict:
+        return {
+            'outbox': outbox_counts(by_channel=True),
+            'delivery': self.metrics.snapshot(),
+            'messages_per_sec': round(self.metrics.rate(), 2),
+            'workers': {channel: sum(worker.is_alive() for worker in workers)
+                        for channel, workers in self._workers.items()}
+        }
+
+
+def idempotency_key(channel: str, recipient: str, subject: str, body: str, scope: str) -> str:
+    return hashlib.sha256("\x1f".join([scope, channel, recipient, subject or "", body]).encode()).hexdigest()
+
+
+def messages_for(recipients, channels, body: str, subject: str = DEFAULT_SUBJECT):
+    """Outbox messages for people with ``email``/``phone`` attributes (ORM rows or result rows), lazily.
+
+    Recipients without an address for a channel are skipped for that channel.
+    """
+    for recipient in recipients:
+        for channel in channels:
+            address = recipient.email if channel == 'email' else recipient.phone
+            if address:
+                yield {'channel': channel, 'recipient': address, 'subject': subject, 'body': body}
+
+
+def enqueue_notifications(messages, scope: str = None, db=None) -> int:
+    """Add ``messages`` (dicts with channel, recipient, body and optionally subject / idempotency_key) to the outbox.
+
+    Without an explicit ``idempotency_key`` a message is keyed by its channel,
+    recipient, subject, body and ``scope``, so the same message reaches a
+    recipient at most once per scope. Pass the same scope when re-submitting
+    one send (e.g. an ID kept per form submission) to drop double-submits;
+    without one every call is a new send. Duplicates are skipped;
+    returns how many messages were newly queued. ``messages`` may be a
+    generator; it is consumed in chunks. With an explicit ``db`` the caller
+    commits and the workers find the rows on their next poll.
+    """
+    if db is None:
+        with session_scope() as db:
+            queued = enqueue_notifications(messages, scope, db)
+            db.commit()
+        if queued:
+            get_delivery_engine().notify()
+        return queued
+
+    scope = scope or uuid.uuid4().hex
+    now = datetime.now()
+    dialect = db.get_bind().dialect.name
+    # Only an idempotency key conflict is skipped (not IGNORE, which would also
+    # truncate over-long values and swallow other errors)
+    if dialect == 'mysql':
+        statement = mysql_insert(OutboxMessage).on_duplicate_key_update(id=OutboxMessage.id)
+    elif dialect == 'sqlite':
+        statement = sqlite_insert(OutboxMessage).on_conflict_do_nothing(index_elements=[OutboxMessage.idempotency_key])
+    else:
+        statement = insert(OutboxMessage)
+
+    queued = 0
+    chunk = []
+
+    def flush():
+        rows = chunk
+        if dialect == 'mysql':
+            # MySQL's found-rows count includes duplicate keys, so they are filtered out first
+            # to count what is new; a key queued concurrently meanwhile still counts as queued
+            keys = [row['idempotency_key'] for row in rows]
+            seen = set(db.connection().execute(
+                select(OutboxMessage.idempotency_key).where(OutboxMessage.idempotency_key.in_(keys))
+            ).scalars())
+            rows = []
+            for row in chunk:
+                if row['idempotency_key'] not in seen:
+                    seen.add(row['idempotency_key'])
+                    rows.append(row)
+            if not rows:
+                return 0
+            db.connection().execute(statement, rows)
+            return len(rows)
+        result = db.connection().execute(statement, rows)
+        return result.rowcount if result.rowcount >= 0 else len(rows)
+
+    for message in messages:
+        subject = message.get('subject')
+        chunk.append({
+            'idempotency_key': message.get('idempotency_key') or idempotency_key(
+                message['channel'], message['recipient'], subject, message['body'], scope
+            ),
+            'channel': message['channel'],
+            'recipient': message['recipient'],
+            'subject': subject,
+            'body': message['body'],
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': now,
+            'created_at': now
+        })
+        if len(chunk) == ENQUEUE_CHUNK:
+            queued += flush()
+            chunk = []
+    if chunk:
+        queued += flush()
+    return queued
+
+
+def outbox_counts(by_channel: bool = False) -> dict:
+    """Outbox rows per status, or per channel and status."""
+    with session_scope() as db:
+        rows = db.execute(
+            select(OutboxMessage.channel, OutboxMessage.status, func.count())
+            .group_by(OutboxMessage.channel, OutboxMessage.status)
+        ).all()
+    counts = {}
+    for channel, status, count in rows:
+        if by_channel:
+            counts.setdefault(channel, {})[status] = count
+        else:
+            counts[status] = counts.get(status, 0) + count
+    return counts
+
+
+def failed_messages(limit: int = 100) -> list:
+    """Most recent messages that gave up, as dicts."""
+    with session_scope() as db:
+        rows = db.execute(
+            select(OutboxMessage.channel, OutboxMessage.recipient, OutboxMessage.subject,
+                   OutboxMessage.attempts, OutboxMessage.last_error, OutboxMessage.created_at)
+            .where(OutboxMessage.status == 'failed')
+            .order_by(OutboxMessage.id.desc())
+            .limit(limit)
+        ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_delivery_engine() -> DeliveryEngine:
+    """The process-wide delivery engine; its workers start with it and pick up anything already queued."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = DeliveryEngine()
+                _engine.start()
+    return _engine
+
+
+if __name__ == "__main__":
+    from database import bootstrap_db
+    bootstrap_db()
+    if "--status" in sys.argv:
+        for channel, counts in sorted(outbox_counts(by_channel=True).items()):
+            print(f"{channel:6} " + "  ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+    else:
+        engine = get_delivery_engine()
+        print(f"Delivering notifications (email: {NOTIFY_EMAIL_TRANSPORT}, sms: {NOTIFY_SMS_TRANSPORT}); Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(10)
+                print(engine.stats())
+        except KeyboardInterrupt:
+            engine.stop()
@@ -0,0 +1,80 @@
+from typing import Optional
+
+from sqlalchemy import select, func, and_, or_
+
+from bulk_read import rows_to_frame
+from database import SessionLocal
+
+DEFAULT_PAGE_SIZE = 50
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250]
+
+
+def _keys_after(keys, values):
+    """Row-value ``(k1, k2, ...) > (v1, v2, ...)`` written out for engines without tuple comparison."""
+    clauses = []
+    for i, key in enumerate(keys):
+        equal = [keys[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, key > values[i]))
+    return or_(*clauses)
+
+
+def _keys_before(keys, values):
+    clauses = []
+    for i, key in enumerate(keys):
+        equal = [keys[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, key < values[i]))
+    return or_(*clauses)
+
+
+def count_rows(columns: dict, where=None) -> int:
+    """Count the rows a paginated view covers."""
+    query = select(func.count(columns['ID']))
+    if where is not None:
+        query = query.where(where)
+    db = SessionLocal()
+    try:
+        return db.execute(query).scalar()
+    finally:
+        db.close()
+
+
+def fetch_page(columns: dict, sort_by: str = 'ID', page_size: int = DEFAULT_PAGE_SIZE,
+               after: Optional[tuple] = None, before: Optional[tuple] = None, where=None) -> dict:
+    """Fetch one page of rows with keyset pagination ordered by ``sort_by`` then ``id``.
+
+    ``after``/``before`` are the ``last_key``/``first_key`` of a previously fetched
+    page, so each page is a single indexed range scan regardless of its position.
+    """
+    names = list(columns)
+    sort_positions = [names.index(sort_by), names.index('ID')] if sort_by != 'ID' else [names.index('ID')]
+    keys = [columns[names[i]] for i in sort_positions]
+
+    query = select(*columns.values())
+    if where is not None:
+        query = query.where(where)
+    if before is not None:
+        query = query.where(_keys_before(keys, before)).order_by(*[key.desc() for key in keys])
+    else:
+        if after is not None:
+            query = query.where(_keys_after(keys, after))
+        query = query.order_by(*keys)
+    query = query.limit(page_size + 1)
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(query).all()
+    finally:
+        db.close()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before is not None:
+        rows.reverse()
+
+    return {
+        'rows': rows_to_frame(rows, names),
+        'first_key': tuple(rows[0][i] for i in sort_positions) if rows else None,
+        'last_key': tuple(rows[-1][i] for i in sort_positions) if rows else None,
+        'has_next': has_more if before is None else True,
+        'has_previous': has_more if before is not None else after is not None
+    }
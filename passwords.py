@@ -0,0 +1,214 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Tuple
+
+# Active hashing scheme and its cost; stored hashes carry their own parameters, so these can change at any time
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "scrypt")
+SCRYPT_N = int(os.environ.get("PASSWORD_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("PASSWORD_SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", "600000"))
+
+# Recent successful verifications kept in memory so repeated logins skip the KDF
+VERIFY_CACHE_SIZE = int(os.environ.get("PASSWORD_CACHE_SIZE", "256"))
+VERIFY_CACHE_TTL = float(os.environ.get("PASSWORD_CACHE_TTL", "60"))
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(value: str) -> bytes:
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+
+class PasswordHasher(ABC):
+    """One password hashing scheme; encoded hashes start with ``algorithm$``."""
+
+    algorithm = None
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, encoded: str) -> bool:
+        ...
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """True if ``encoded`` was made by another scheme or with different cost settings."""
+        return True
+
+    def handles(self, encoded: str) -> bool:
+        return encoded.startswith(f"{self.algorithm}$")
+
+
+class ScryptHasher(PasswordHasher):
+    """scrypt, encoded as ``scrypt$n$r$p$salt$hash``."""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P):
+        self.n, self.r, self.p = n, r, p
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2 ** 20, dklen=32)
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(16)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, n, r, p, salt, digest = encoded.split("$")
+        return hmac.compare_digest(self._derive(password, _unb64(salt), int(n), int(r), int(p)), _unb64(digest))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return not self.handles(encoded) or encoded.split("$")[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+
+class PBKDF2Hasher(PasswordHasher):
+    """PBKDF2-HMAC-SHA256, encoded as ``pbkdf2_sha256$iterations$salt$hash``."""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int = PBKDF2_ITERATIONS):
+        self.iterations = iterations
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(16)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, iterations, salt, digest = encoded.split("$")
+        derived = hashlib.pbkdf2_hmac("sha256", password.encode(), _unb64(salt), int(iterations))
+        return hmac.compare_digest(derived, _unb64(digest))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return not self.handles(encoded) or encoded.split("$")[1] != str(self.iterations)
+
+
+class LegacySHA256Hasher(PasswordHasher):
+    """The original unsalted SHA-256 hex digests; verify-only, always upgraded on login."""
+
+    algorithm = "sha256"
+
+    def hash(self, password: str) -> str:
+        raise ValueError("Unsalted SHA-256 is only supported for verifying legacy hashes")
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+
+    def handles(self, encoded: str) -> bool:
+        return len(encoded) == 64 and "$" not in encoded
+
+
+HASHERS = {
+    'scrypt': ScryptHasher,
+    'pbkdf2_sha256': PBKDF2Hasher
+}
+
+_hasher = HASHERS[PASSWORD_HASHER]()
+_verifiers = [ScryptHasher(), PBKDF2Hasher(), LegacySHA256Hasher()]
+
+
+def get_hasher() -> PasswordHasher:
+    """The scheme used for new hashes."""
+    return _hasher
+
+
+def set_hasher(hasher: PasswordHasher):
+    """Switch the scheme (or cost) used for new hashes; existing hashes are upgraded as users log in."""
+    global _hasher
+    _hasher = hasher
+    verification_cache.clear()
+
+
+class VerificationCache:
+    """Bounded, short-lived record of recent successful (password, stored hash) checks.
+
+    Entries are keyed on an HMAC with a per-process random key, so the cache
+    never holds passwords or fast unsalted hashes of them. Keys include the
+    stored hash, so changing a password invalidates its entries.
+    """
+
+    def __init__(self, max_entries: int = VERIFY_CACHE_SIZE, ttl: float = VERIFY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._secret = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, password: str, encoded: str) -> bytes:
+        return hmac.new(self._secret, f"{encoded}\0{password}".encode(), hashlib.sha256).digest()
+
+    def contains(self, password: str, encoded: str) -> bool:
+        key = self._key(password, encoded)
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is not None and expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True
+            self._entries.pop(key, None)
+            self.misses += 1
+            return False
+
+    def add(self, password: str, encoded: str):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        key = self._key(password, encoded)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+verification_cache = VerificationCache()
+
+
+def hash_password(password: str) -> str:
+    """Hash a password for storing, with the configured scheme."""
+    return _hasher.hash(password)
+
+
+def verify_password(password: str, encoded: str) -> Tuple[bool, bool]:
+    """Check ``password`` against a stored hash; returns (matches, needs_rehash)."""
+    if not encoded:
+        return False, False
+    if verification_cache.contains(password, encoded):
+        return True, _hasher.needs_rehash(encoded)
+    verifier = next((v for v in _verifiers if v.handles(encoded)), None)
+    try:
+        matches = verifier is not None and verifier.verify(password, encoded)
+    except ValueError:
+        # Malformed hash
+        matches = False
+    if matches:
+        verification_cache.add(password, encoded)
+    return matches, matches and _hasher.needs_rehash(encoded)
@@ -0,0 +1,95 @@
+"""Role-based permissions.
+
+Roles grant capabilities and may inherit other roles. The definitions are
+flattened once into an immutable lookup table, so every check is a dict
+lookup plus a frozenset membership test. ``reload_permissions`` swaps in a
+new table atomically when the definitions change; when a user's role
+changes, their sessions are revoked instead (see ``auth.change_user_role``).
+"""
+import threading
+from types import MappingProxyType
+from typing import Optional
+
+# role -> (capabilities, inherited roles)
+ROLE_DEFINITIONS = {
+    'student': ({'view_dashboard', 'view_schedule'}, ()),
+    'teacher': ({'view_dashboard', 'view_schedule', 'manage_students', 'send_notifications'}, ()),
+    'admin': ({'manage_teachers', 'manage_users', 'view_diagnostics'}, ('teacher', 'student')),
+}
+
+# Navigation pages in display order, with the capability needed to open each
+PAGE_CAPABILITIES = {
+    "Dashboard": 'view_dashboard',
+    "Student Management": 'manage_students',
+    "Teacher Management": 'manage_teachers',
+    "Class Schedule": 'view_schedule',
+    "Notifications": 'send_notifications',
+    "User Management": 'manage_users',
+    "Database Diagnostics": 'view_diagnostics',
+}
+
+
+class PermissionTable:
+    """Immutable, precomputed role -> capabilities / roles / pages lookups."""
+
+    __slots__ = ('capabilities', 'roles', 'pages', 'version')
+
+    def __init__(self, definitions: dict, page_capabilities: dict, version: int = 1):
+        def expand(role, seen):
+            if role in seen:
+                return set(), set()
+            seen.add(role)
+            capabilities, inherited = definitions[role]
+            caps, roles = set(capabilities), {role}
+            for parent in inherited:
+                parent_caps, parent_roles = expand(parent, seen)
+                caps |= parent_caps
+                roles |= parent_roles
+            return caps, roles
+
+        capabilities, roles, pages = {}, {}, {}
+        for role in definitions:
+            caps, acts_as = expand(role, set())
+            capabilities[role] = frozenset(caps)
+            roles[role] = frozenset(acts_as)
+            pages[role] = tuple(page for page, capability in page_capabilities.items() if capability in caps)
+        self.capabilities = MappingProxyType(capabilities)
+        self.roles = MappingProxyType(roles)
+        self.pages = MappingProxyType(pages)
+        self.version = version
+
+
+_EMPTY = frozenset()
+_table = PermissionTable(ROLE_DEFINITIONS, PAGE_CAPABILITIES)
+_reload_lock = threading.Lock()
+
+
+def reload_permissions(definitions: dict = None, page_capabilities: dict = None) -> PermissionTable:
+    """Rebuild the lookup table; readers keep using the old one until the swap."""
+    global _table
+    with _reload_lock:
+        _table = PermissionTable(
+            definitions if definitions is not None else ROLE_DEFINITIONS,
+            page_capabilities if page_capabilities is not None else PAGE_CAPABILITIES,
+            _table.version + 1
+        )
+    return _table
+
+
+def get_permissions() -> PermissionTable:
+    return _table
+
+
+def can(role: Optional[str], capability: Optional[str]) -> bool:
+    """True if ``role`` (directly or through an inherited role) has ``capability``."""
+    return capability in _table.capabilities.get(role, _EMPTY)
+
+
+def acts_as(role: Optional[str], required_role: str) -> bool:
+    """True if ``role`` is ``required_role`` or inherits it (admins act as every role)."""
+    return required_role in _table.roles.get(role, _EMPTY)
+
+
+def pages_for(role: Optional[str]) -> tuple:
+    """Navigation pages ``role`` may open, in display order."""
+    return _table.pages.get(role, ())
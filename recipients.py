@@ -0,0 +1,77 @@
+"""Notification audiences as single SQL queries.
+
+An audience (all students, a department, a year, the students enrolled in
+a class, or a custom list of IDs) is one ``SELECT`` of the student columns
+the notifications page needs. The page counts it with ``COUNT(*)``,
+previews it with ``LIMIT`` and hands ``iter_recipients`` to the delivery
+engine, which streams the rows through a server-side cursor in chunks, so
+sending to the whole campus never holds the student table in memory.
+"""
+from typing import Iterator
+
+import pandas as pd
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from bulk_read import rows_to_frame, STUDENT_COLUMNS
+from database import SessionLocal, session_scope, Student, ClassEnrollment
+
+AUDIENCES = ('all', 'department', 'year', 'class', 'custom')
+# Rows shown in a recipient preview
+PREVIEW_LIMIT = 100
+# Rows fetched per round trip while streaming recipients
+STREAM_CHUNK_SIZE = 1000
+
+
+def audience_query(kind: str, value=None):
+    """The recipients of one audience: ``value`` is the department, year, class schedule ID or list of student IDs."""
+    query = select(*STUDENT_COLUMNS.values())
+    if kind == 'all':
+        return query
+    if kind == 'department':
+        return query.where(Student.department == value)
+    if kind == 'year':
+        return query.where(Student.year == value)
+    if kind == 'class':
+        # The enrollment unique index makes each student appear once
+        return query.join(ClassEnrollment, ClassEnrollment.student_id == Student.id).where(
+            ClassEnrollment.class_schedule_id == value
+        )
+    if kind == 'custom':
+        return query.where(Student.id.in_([int(student_id) for student_id in value or []]))
+    raise ValueError(f"Unknown audience: {kind}")
+
+
+def count_recipients(query, db: Session = None) -> int:
+    """Number of recipients, counted by the database."""
+    if db is None:
+        with session_scope() as db:
+            return count_recipients(query, db)
+    return db.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar()
+
+
+def preview_recipients(query, limit: int = PREVIEW_LIMIT, db: Session = None) -> pd.DataFrame:
+    """Up to ``limit`` recipients, as a DataFrame with the roster column names.
+
+    Rows come in the order of the index the audience is read through; ordering
+    by ID instead would walk the primary key past every non-matching student.
+    """
+    if db is None:
+        with session_scope() as db:
+            return preview_recipients(query, limit, db)
+    rows = db.execute(query.limit(limit)).all()
+    return rows_to_frame(rows, list(STUDENT_COLUMNS))
+
+
+def iter_recipients(query, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator:
+    """Stream every recipient (rows with id, name, department, year, email and phone) in constant memory.
+
+    Uses its own session, released as soon as the iteration finishes or is abandoned.
+    """
+    db = SessionLocal.session_factory()
+    try:
+        result = db.execute(query, execution_options={'stream_results': True, 'yield_per': chunk_size})
+        for rows in result.partitions():
+            yield from rows
+    finally:
+        db.close()
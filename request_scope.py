@@ -0,0 +1,92 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Streamlit runs each session's script on its own thread, so the active scope is thread-local
+_state = threading.local()
+
+
+def _new_scope() -> dict:
+    return {'cache': {}, 'queries': 0, 'db_ms': 0.0, 'statements': [], 'cache_hits': 0}
+
+
+def current_scope():
+    """Return the request scope active on this thread, or None outside a page render."""
+    return getattr(_state, 'scope', None)
+
+
+@contextmanager
+def request_scope():
+    """Collect query statistics and memoize loaders for the duration of one page render."""
+    previous = current_scope()
+    scope = _new_scope()
+    _state.scope = scope
+    try:
+        yield scope
+    finally:
+        _state.scope = previous
+
+
+def invalidate_request_cache():
+    """Drop memoized results after a write so later reads in the same render see it."""
+    scope = current_scope()
+    if scope is not None:
+        scope['cache'].clear()
+
+
+def memoize_per_request(func):
+    """Run ``func`` at most once per distinct arguments within the active request scope.
+
+    Session arguments are ignored when building the key, so callers passing
+    different sessions still share the result.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        scope = current_scope()
+        if scope is None:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__qualname__,) + tuple(
+            (name, value) for name, value in bound.arguments.items()
+            if name != 'db' and not isinstance(value, Session)
+        )
+        if key in scope['cache']:
+            scope['cache_hits'] += 1
+            return scope['cache'][key]
+        result = func(*args, **kwargs)
+        scope['cache'][key] = result
+        return result
+    return wrapper
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    scope = current_scope()
+    if scope is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    scope['queries'] += 1
+    scope['db_ms'] += elapsed_ms
+    scope['statements'].append((" ".join(statement.split())[:200], round(elapsed_ms, 2)))
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import or_
+
+from bulk_read import fetch_frame, STUDENT_COLUMNS, TEACHER_COLUMNS
+
+# How long a cached roster is served before checking the database for new rows
+ROSTER_REFRESH_SECONDS = float(os.environ.get("ROSTER_REFRESH_SECONDS", "30"))
+
+
+def _read_only(frame: pd.DataFrame) -> pd.DataFrame:
+    """A copy of ``frame`` whose column arrays cannot be written to, safe to share between sessions."""
+    arrays = {}
+    for column in frame.columns:
+        values = frame[column].to_numpy(copy=True)
+        values.flags.writeable = False
+        arrays[column] = values
+    return pd.DataFrame(arrays, columns=frame.columns, copy=False)
+
+
+class RosterCache:
+    """Process-wide roster DataFrame that loads once and then fetches only new rows.
+
+    New rows are found with an ``id`` high-water mark, which only ever follows
+    rows read from the database. Rows still in the write-behind queue are
+    handed over with ``append()`` and their IDs kept in a small pending set
+    until a refresh reads them back (or ``discard()`` drops a row that failed
+    to insert), so a submit never copies the roster. Other writes call ``invalidate()`` so the next read picks them
+    up immediately. A full reload can be forced for updates and deletes, which
+    the high-water mark cannot see.
+    """
+
+    def __init__(self, columns: dict, refresh_seconds: float = ROSTER_REFRESH_SECONDS):
+        self.columns = columns
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._frame = None
+        self._high_water_mark = 0
+        self._checked_at = 0.0
+        self._stale = False
+        self._full_reload = False
+        # IDs of rows appended but not read back from the database yet
+        self._pending = set()
+        self._ids = set()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+        self.last_refresh_ms = 0.0
+        self.total_refresh_ms = 0.0
+
+    def _fetch(self, min_id: int, below: list) -> pd.DataFrame:
+        """Rows above ``min_id``, plus the appended rows ``below`` it (their IDs are user-chosen) if written by now."""
+        where = self.columns['ID'] > min_id
+        if below:
+            where = or_(where, self.columns['ID'].in_(below))
+        return fetch_frame(self.columns, where=where)
+
+    def _read_back(self, frame: pd.DataFrame):
+        """Account for rows just read from the database (called with the lock held)."""
+        if frame.empty:
+            return
+        # Ordered by ID, so the last row is the highest one read
+        self._high_water_mark = max(self._high_water_mark, int(frame['ID'].iloc[-1]))
+        self._ids.update(frame['ID'])
+        if self._pending:
+            self._pending.difference_update(frame['ID'])
+
+    def _is_fresh(self, now: float) -> bool:
+        due = self._stale or now - self._checked_at >= self.refresh_seconds
+        return self._frame is not None and not self._full_reload and not due
+
+    def get(self) -> pd.DataFrame:
+        """Return the cached roster, loading or topping it up from the database as needed.
+
+        The frame is shared by every session, so callers get a shallow copy
+        whose data is read-only: adding or dropping columns only changes the
+        copy, and writing into a value raises instead of changing the roster
+        for everyone.
+        """
+        with self._lock:
+            if self._is_fresh(time.monotonic()):
+                self.hits += 1
+                return self._frame.copy(deep=False)
+
+        # One refresh at a time; sessions arriving meanwhile wait for it instead of repeating the query
+        with self._refresh_lock:
+            with self._lock:
+                now = time.monotonic()
+                if self._is_fresh(now):
+                    self.hits += 1
+                    return self._frame.copy(deep=False)
+                full = self._frame is None or self._full_reload
+                min_id = 0 if full else self._high_water_mark
+                below = [] if full else [int(row_id) for row_id in self._pending if int(row_id) <= min_id]
+                invalidations = self.invalidations
+
+            # The database round trip runs without the lock, so cache hits are never held up by it
+            started = time.perf_counter()
+            delta = self._fetch(min_id, below)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            if full:
+                frame = _read_only(delta)
+            elif not delta.empty:
+                frame = _read_only(pd.concat([self._frame, delta], ignore_index=True))
+            else:
+                frame = self._frame
+
+            with self._lock:
+                if full:
+                    self.misses += 1
+                    self._high_water_mark = 0
+                    self._ids = set()
+                    # Pending rows stay pending unless the reload read them back; a row still in
+                    # the write queue may have an ID below the new mark and is fetched by ID later
+                else:
+                    self.refreshes += 1
+                self._frame = frame
+                self._read_back(delta)
+                self.last_refresh_ms = elapsed_ms
+                self.total_refresh_ms += elapsed_ms
+                self._checked_at = now
+                # An invalidate() that arrived during the fetch still applies to the next read
+                if self.invalidations == invalidations:
+                    self._stale = False
+                    self._full_reload = False
+                return self._frame.copy(deep=False)
+
+    def append(self, records: list):
+        """Add rows the app has queued for writing (dicts keyed by model column name, including ``id``).
+
+        Their IDs are visible to ``has_id`` immediately. The rows join the roster once a refresh reads them
+        from the database; the high-water mark does not move for them, so rows
+        committed meanwhile with lower IDs are still found.
+        """
+        with self._lock:
+            if self._frame is None:
+                # Not loaded yet; the first read fetches everything anyway
+                return
+            self._pending.update(str(record['id']) for record in records if str(record['id']) not in self._ids)
+
+    def discard(self, records: list):
+        """Forget appended rows that will never reach the database (e.g. rejected by it)."""
+        with self._lock:
+            self._pending.difference_update(str(record['id']) for record in records)
+
+    def has_id(self, value) -> bool:
+        """True if the roster (including rows appended but not read back yet) has this ID."""
+        self.get()
+        with self._lock:
+            return str(value) in self._ids or str(value) in self._pending
+
+    def invalidate(self, full: bool = False):
+        """Mark the roster stale; ``full`` discards it so the next read reloads every row."""
+        with self._lock:
+            self.invalidations += 1
+            self._stale = True
+            self._full_reload = self._full_reload or full
+
+    def stats(self) -> dict:
+        """Return hit/miss/refresh counters and refresh latency."""
+        with self._lock:
+            return {
+                'rows': (0 if self._frame is None else len(self._frame)) + len(self._pending),
+                'pending': len(self._pending),
+                'high_water_mark': self._high_water_mark,
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'invalidations': self.invalidations,
+                'last_refresh_ms': round(self.last_refresh_ms, 2),
+                'total_refresh_ms': round(self.total_refresh_ms, 2)
+            }
+
+
+student_roster = RosterCache(STUDENT_COLUMNS)
+teacher_roster = RosterCache(TEACHER_COLUMNS)
+
+
+def get_roster_stats() -> dict:
+    """Return cache counters for both rosters."""
+    return {
+        'students': student_roster.stats(),
+        'teachers': teacher_roster.stats()
+    }
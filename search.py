@@ -0,0 +1,203 @@
+import re
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import select, text
+
+from bulk_read import rows_to_frame, STUDENT_COLUMNS, TEACHER_COLUMNS
+from database import session_scope, Student
+
+DEFAULT_RESULT_LIMIT = 20
+# Most suggestions a typeahead lookup returns, and the shortest name prefix it looks up
+SUGGEST_LIMIT = 10
+SUGGEST_MIN_CHARS = 2
+
+# Columns covered by the full-text index of each table
+SEARCH_FIELDS = {
+    'students': ['name', 'email', 'department'],
+    'teachers': ['name', 'email', 'department', 'subjects']
+}
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+LIKE_ESCAPE = "\\"
+# Longest input treated as an ID (keeps the value within a signed 64-bit integer)
+MAX_ID_DIGITS = 18
+
+
+def _like_prefix(term: str) -> str:
+    """A LIKE pattern matching values that start with ``term`` literally (use with ``escape=LIKE_ESCAPE``)."""
+    escaped = term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+    return f"{escaped}%"
+
+
+def _as_id(term: str) -> Optional[int]:
+    """``term`` as a student/teacher ID, or None if it is not a plain ASCII number (``'²'.isdigit()`` is True)."""
+    term = term.strip()
+    if term.isascii() and term.isdigit() and len(term) <= MAX_ID_DIGITS:
+        return int(term)
+    return None
+
+
+def _ensure_mysql_index(conn, table: str, fields: list):
+    index_name = f"ft_{table}_search"
+    exists = conn.execute(text(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = :table AND index_name = :index_name"
+    ), {'table': table, 'index_name': index_name}).scalar()
+    if not exists:
+        conn.execute(text(f"ALTER TABLE {table} ADD FULLTEXT INDEX {index_name} ({', '.join(fields)})"))
+
+
+def _ensure_sqlite_index(conn, table: str, fields: list):
+    fts = f"{table}_fts"
+    exists = conn.execute(text(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {'name': fts}).scalar()
+    if exists:
+        return
+    field_list = ", ".join(fields)
+    new_values = ", ".join(f"new.{f}" for f in fields)
+    old_values = ", ".join(f"old.{f}" for f in fields)
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({field_list}, content='{table}', content_rowid='id')"
+    ))
+    # External-content FTS tables are kept in sync with triggers
+    conn.execute(text(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {field_list}) VALUES (new.id, {new_values}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {field_list}) VALUES ('delete', old.id, {old_values}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {field_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {field_list}) VALUES (new.id, {new_values}); END"
+    ))
+    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def create_search_indexes(conn):
+    """Create the full-text indexes for student/teacher search on ``conn`` if they do not exist yet.
+
+    MySQL gets a FULLTEXT index on each table; SQLite (the fallback engine in
+    ``db_config``) gets an FTS5 table kept in sync by triggers. Other backends
+    fall back to LIKE matching and need no index.
+    """
+    dialect = conn.dialect.name
+    for table, fields in SEARCH_FIELDS.items():
+        if dialect == 'mysql':
+            _ensure_mysql_index(conn, table, fields)
+        elif dialect == 'sqlite':
+            _ensure_sqlite_index(conn, table, fields)
+
+
+def create_prefix_indexes(conn):
+    """Create the case-insensitive index on ``students.name`` that serves typeahead prefix lookups.
+
+    MySQL's default collations are case-insensitive, so a plain index serves
+    ``name LIKE 'ab%'``; SQLite only uses an index for LIKE when it is built
+    with ``COLLATE NOCASE``.
+    """
+    dialect = conn.dialect.name
+    if dialect == 'mysql':
+        exists = conn.execute(text(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'students' AND index_name = 'ix_students_name'"
+        )).scalar()
+        if not exists:
+            conn.execute(text("CREATE INDEX ix_students_name ON students (name)"))
+    elif dialect == 'sqlite':
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_students_name_nocase ON students (name COLLATE NOCASE)"))
+
+
+def ensure_search_index(engine):
+    """Create the search indexes in their own transaction; see ``create_search_indexes``."""
+    with engine.begin() as conn:
+        create_search_indexes(conn)
+
+
+def _search(table: str, columns: dict, term: str, limit: int) -> pd.DataFrame:
+    names = list(columns)
+    tokens = TOKEN_PATTERN.findall(term)
+    if not tokens:
+        return rows_to_frame([], names)
+
+    fields = SEARCH_FIELDS[table]
+    column_list = ", ".join(f"t.{column.name}" for column in columns.values())
+    # Its own session: the thread-scoped one belongs to the calling page
+    with session_scope() as db:
+        rows = []
+        # An exact ID match always ranks first
+        term_id = _as_id(term)
+        if term_id is not None:
+            rows += db.execute(select(*columns.values()).where(columns['ID'] == term_id)).all()
+
+        dialect = db.get_bind().dialect.name
+        if dialect == 'sqlite':
+            # Every token must match as a prefix so partial input finds results
+            query = " ".join(f'"{token}"*' for token in tokens)
+            rows += db.execute(text(
+                f"SELECT {column_list} FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid "
+                f"WHERE {table}_fts MATCH :query ORDER BY bm25({table}_fts) LIMIT :limit"
+            ), {'query': query, 'limit': limit}).all()
+        elif dialect == 'mysql':
+            query = " ".join(f"+{token}*" for token in tokens)
+            match = f"MATCH({', '.join(f't.{f}' for f in fields)}) AGAINST(:query IN BOOLEAN MODE)"
+            rows += db.execute(text(
+                f"SELECT {column_list} FROM {table} t WHERE {match} ORDER BY {match} DESC LIMIT :limit"
+            ), {'query': query, 'limit': limit}).all()
+        else:
+            pattern = f"%{term.strip()}%"
+            filters = " OR ".join(f"t.{f} LIKE :pattern" for f in fields)
+            rows += db.execute(text(
+                f"SELECT {column_list} FROM {table} t WHERE {filters} ORDER BY t.id LIMIT :limit"
+            ), {'pattern': pattern, 'limit': limit}).all()
+
+    frame = rows_to_frame(rows, names)
+    return frame.drop_duplicates('ID').head(limit).reset_index(drop=True)
+
+
+def search_students(term: str, limit: int = DEFAULT_RESULT_LIMIT) -> pd.DataFrame:
+    """Return the top ``limit`` students matching ``term`` by ID, name, email or department."""
+    return _search('students', STUDENT_COLUMNS, term, limit)
+
+
+def search_teachers(term: str, limit: int = DEFAULT_RESULT_LIMIT) -> pd.DataFrame:
+    """Return the top ``limit`` teachers matching ``term`` by ID, name, email, department or subjects."""
+    return _search('teachers', TEACHER_COLUMNS, term, limit)
+
+
+def suggest_students(term: str, limit: int = SUGGEST_LIMIT) -> list:
+    """Up to ``limit`` (id, name, department) suggestions for what a user has typed so far.
+
+    An exact ID comes first, then names starting with ``term`` (an index range
+    scan, so the cost depends on ``limit``, not on how many names match), then,
+    if there is room, students with any word of their name, email or department
+    starting with it. Terms shorter than ``SUGGEST_MIN_CHARS`` only match IDs.
+    """
+    term = term.strip()
+    if not term:
+        return []
+    columns = (Student.id, Student.name, Student.department)
+    suggestions = {}
+    # Its own session: the thread-scoped one belongs to the calling page
+    with session_scope() as db:
+        term_id = _as_id(term)
+        if term_id is not None:
+            for row in db.execute(select(*columns).where(Student.id == term_id)).all():
+                suggestions[row[0]] = tuple(row)
+        if len(term) >= SUGGEST_MIN_CHARS:
+            # Escaped wildcards still allow the index range scan on MySQL and SQLite
+            order = Student.name.collate("NOCASE") if db.get_bind().dialect.name == 'sqlite' else Student.name
+            rows = db.execute(
+                select(*columns).where(Student.name.like(_like_prefix(term), escape=LIKE_ESCAPE))
+                .order_by(order).limit(limit)
+            ).all()
+            for row in rows:
+                suggestions.setdefault(row[0], tuple(row))
+    if len(term) >= SUGGEST_MIN_CHARS and len(suggestions) < limit:
+        for row in search_students(term, limit).itertuples(index=False):
+            suggestions.setdefault(int(row.ID), (int(row.ID), row.Name, row.Department))
+    return list(suggestions.values())[:limit]
@@ -0,0 +1,271 @@
+"""Server-side login sessions.
+
+A login creates a session record (username, role, expiry) in a pluggable
+store and hands the browser a signed token ``<session id>.<HMAC>``. The
+token is kept in a cookie, so a browser refresh restores the session from
+the store instead of asking the user to log in again. Revoking a
+session, or every session of a user, deletes it from the store and takes
+effect on the next rerun.
+
+Stores: ``memory`` (per-process LRU, the default), ``sqlite`` (a local
+file shared by all workers on the host) and ``redis`` (any client with the
+redis-py API, e.g. a local Redis or a fakeredis stand-in).
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+SESSION_STORE = os.environ.get("SESSION_STORE", "memory")
+SESSION_TTL = int(os.environ.get("SESSION_TTL", str(8 * 3600)))
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", "10000"))
+SESSION_SQLITE_PATH = os.environ.get("SESSION_SQLITE_PATH", "sessions.db")
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+# Seconds between sweeps of expired sessions, run from create_session
+SESSION_PURGE_INTERVAL = int(os.environ.get("SESSION_PURGE_INTERVAL", "600"))
+
+# Set SESSION_SECRET so tokens stay valid across restarts and between workers
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "").encode() or secrets.token_bytes(32)
+
+
+class SessionStore(ABC):
+    """Where session records live; records are dicts with username, role and expires_at (epoch seconds)."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, record: dict):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def delete_user(self, username: str) -> int:
+        """Delete every session of ``username``; returns how many were removed."""
+
+    def purge_expired(self) -> int:
+        """Delete expired sessions; returns how many were removed. Stores that expire entries themselves keep this."""
+        return 0
+
+
+class MemorySessionStore(SessionStore):
+    """Size-bounded LRU of sessions in this process."""
+
+    def __init__(self, max_entries: int = SESSION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            record = self._entries.get(session_id)
+            if record is None:
+                return None
+            if record['expires_at'] <= time.time():
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return record
+
+    def put(self, session_id: str, record: dict):
+        with self._lock:
+            self._entries[session_id] = record
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def delete_user(self, username: str) -> int:
+        with self._lock:
+            ids = [sid for sid, record in self._entries.items() if record['username'] == username]
+            for sid in ids:
+                del self._entries[sid]
+            return len(ids)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            ids = [sid for sid, record in self._entries.items() if record['expires_at'] <= now]
+            for sid in ids:
+                del self._entries[sid]
+            return len(ids)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path: str = SESSION_SQLITE_PATH):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, username TEXT NOT NULL, role TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_username ON sessions (username)")
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT username, role, expires_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= time.time():
+                self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                return None
+        return {'username': row[0], 'role': row[1], 'expires_at': row[2]}
+
+    def put(self, session_id: str, record: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, username, role, expires_at) VALUES (?, ?, ?, ?)",
+                (session_id, record['username'], record['role'], record['expires_at'])
+            )
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def delete_user(self, username: str) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE username = ?", (username,)).rowcount
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions in Redis (or anything speaking the redis-py API); Redis expires them itself."""
+
+    def __init__(self, client=None, url: str = REDIS_URL):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("The redis session store requires redis (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, session_id: str) -> Optional[dict]:
+        value = self.client.get(f"session:{session_id}")
+        return json.loads(value) if value else None
+
+    def put(self, session_id: str, record: dict):
+        ttl = max(1, int(record['expires_at'] - time.time()))
+        self.client.setex(f"session:{session_id}", ttl, json.dumps(record))
+        # Per-user index used for revoking all of a user's sessions
+        self.client.sadd(f"user_sessions:{record['username']}", session_id)
+        self.client.expire(f"user_sessions:{record['username']}", ttl)
+
+    def delete(self, session_id: str):
+        self.client.delete(f"session:{session_id}")
+
+    def delete_user(self, username: str) -> int:
+        ids = [sid.decode() if isinstance(sid, bytes) else sid
+               for sid in self.client.smembers(f"user_sessions:{username}")]
+        removed = self.client.delete(*[f"session:{sid}" for sid in ids]) if ids else 0
+        self.client.delete(f"user_sessions:{username}")
+        return removed
+
+
+STORES = {
+    'memory': MemorySessionStore,
+    'sqlite': SQLiteSessionStore,
+    'redis': RedisSessionStore
+}
+
+_store = None
+_store_lock = threading.Lock()
+_last_purge = 0.0
+
+
+def get_store() -> SessionStore:
+    """The configured session store, created on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = STORES[SESSION_STORE]()
+    return _store
+
+
+def set_store(store: SessionStore):
+    global _store
+    _store = store
+
+
+def _signature(session_id: str) -> str:
+    digest = hmac.new(SESSION_SECRET, session_id.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def _session_id(token: str) -> Optional[str]:
+    """The session ID of a correctly signed token, else None (also for malformed input)."""
+    # Tokens are ASCII by construction; anything else comes from a tampered cookie
+    if not token or not token.isascii():
+        return None
+    session_id, _, signature = token.partition(".")
+    if session_id and hmac.compare_digest(signature.encode(), _signature(session_id).encode()):
+        return session_id
+    return None
+
+
+def _purge_expired():
+    """Sweep expired sessions out of the store at most every ``SESSION_PURGE_INTERVAL`` seconds."""
+    global _last_purge
+    now = time.time()
+    if now - _last_purge < SESSION_PURGE_INTERVAL:
+        return
+    _last_purge = now
+    try:
+        get_store().purge_expired()
+    except Exception as e:
+        print(f"Session purge error: {str(e)}")
+
+
+def create_session(username: str, role: str, ttl: int = SESSION_TTL) -> str:
+    """Store a new session and return its signed token."""
+    _purge_expired()
+    session_id = secrets.token_urlsafe(24)
+    get_store().put(session_id, {'username': username, 'role': role, 'expires_at': time.time() + ttl})
+    return f"{session_id}.{_signature(session_id)}"
+
+
+def resolve_session(token: str) -> Optional[dict]:
+    """The session record for ``token``, or None if it is forged, expired or revoked."""
+    session_id = _session_id(token)
+    if session_id is None:
+        return None
+    record = get_store().get(session_id)
+    if record is None or record['expires_at'] <= time.time():
+        return None
+    return record
+
+
+def revoke_session(token: str):
+    session_id = _session_id(token)
+    if session_id is not None:
+        get_store().delete(session_id)
+
+
+def revoke_user_sessions(username: str) -> int:
+    """Log ``username`` out everywhere, e.g. after a role or password change."""
+    return get_store().delete_user(username)
@@ -80,30 +80,37 @@ SELECT 'admin', '240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a
 WHERE NOT EXISTS (SELECT 1 FROM users WHERE username = 'admin');
 
 -- Insert sample data for testing
--- Sample departments
+-- One multi-row insert per table; rows that already exist are left alone
 INSERT INTO students (name, department, year, email, phone)
-SELECT 'John Smith', 'Computer Science', 2, 'john.smith@example.com', '1234567890'
-WHERE NOT EXISTS (SELECT 1 FROM students WHERE email = 'john.smith@example.com');
-
-INSERT INTO students (name, department, year, email, phone)
-SELECT 'Maria Garcia', 'Mathematics', 3, 'maria.garcia@example.com', '2345678901'
-WHERE NOT EXISTS (SELECT 1 FROM students WHERE email = 'maria.garcia@example.com');
-
-INSERT INTO teachers (name, department, subjects, email, phone)
-SELECT 'Dr. James Wilson', 'Computer Science', 'Programming, Algorithms', 'james.wilson@example.com', '3456789012'
-WHERE NOT EXISTS (SELECT 1 FROM teachers WHERE email = 'james.wilson@example.com');
+SELECT seed.name, seed.department, seed.year, seed.email, seed.phone
+FROM (
+    SELECT 'John Smith' AS name, 'Computer Science' AS department, 2 AS year,
+           'john.smith@example.com' AS email, '1234567890' AS phone
+    UNION ALL
+    SELECT 'Maria Garcia', 'Mathematics', 3, 'maria.garcia@example.com', '2345678901'
+) AS seed
+WHERE NOT EXISTS (SELECT 1 FROM students s WHERE s.email = seed.email);
 
 INSERT INTO teachers (name, department, subjects, email, phone)
-SELECT 'Dr. Emily Chen', 'Mathematics', 'Calculus, Linear Algebra', 'emily.chen@example.com', '4567890123'
-WHERE NOT EXISTS (SELECT 1 FROM teachers WHERE email = 'emily.chen@example.com');
-
-INSERT INTO courses (course_code, title, description, department, credit_hours)
-SELECT 'CS101', 'Introduction to Programming', 'Basic programming concepts using Python', 'Computer Science', 3
-WHERE NOT EXISTS (SELECT 1 FROM courses WHERE course_code = 'CS101');
+SELECT seed.name, seed.department, seed.subjects, seed.email, seed.phone
+FROM (
+    SELECT 'Dr. James Wilson' AS name, 'Computer Science' AS department, 'Programming, Algorithms' AS subjects,
+           'james.wilson@example.com' AS email, '3456789012' AS phone
+    UNION ALL
+    SELECT 'Dr. Emily Chen', 'Mathematics', 'Calculus, Linear Algebra', 'emily.chen@example.com', '4567890123'
+) AS seed
+WHERE NOT EXISTS (SELECT 1 FROM teachers t WHERE t.email = seed.email);
 
 INSERT INTO courses (course_code, title, description, department, credit_hours)
-SELECT 'MATH201', 'Calculus I', 'Introduction to differential and integral calculus', 'Mathematics', 4
-WHERE NOT EXISTS (SELECT 1 FROM courses WHERE course_code = 'MATH201');
+SELECT seed.course_code, seed.title, seed.description, seed.department, seed.credit_hours
+FROM (
+    SELECT 'CS101' AS course_code, 'Introduction to Programming' AS title,
+           'Basic programming concepts using Python' AS description, 'Computer Science' AS department,
+           3 AS credit_hours
+    UNION ALL
+    SELECT 'MATH201', 'Calculus I', 'Introduction to differential and integral calculus', 'Mathematics', 4
+) AS seed
+WHERE NOT EXISTS (SELECT 1 FROM courses c WHERE c.course_code = seed.course_code);
 
 -- Note: For class_schedules and class_enrollments, you may want to add these after confirming 
 -- the IDs of the inserted teachers, courses, and students in your database.
\ No newline at end of file
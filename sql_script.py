@@ -0,0 +1,382 @@
+"""Transactional runner for SQL scripts such as ``setup_database.sql``.
+
+The script is split into statements by a small tokenizer that understands
+quoted strings, ``--``/``#``/``/* */`` comments and the mysql client's
+``DELIMITER`` command, so a ``;`` inside a string or comment never splits a
+statement. Each statement is identified by a checksum of its text with
+comments and insignificant whitespace removed, plus an occurrence number
+that tells identical statements in one script apart.
+
+Statements run on one connection:
+
+- ``USE``, ``SET`` and ``CREATE DATABASE`` set up the session and run every time.
+- DDL runs on its own (MySQL commits it implicitly anyway).
+- Consecutive data statements run in batched transactions of up to
+  ``SCRIPT_BATCH_SIZE`` statements. Consecutive single-table
+  ``INSERT ... VALUES`` statements are merged into multi-row inserts.
+
+The checksums of applied statements are recorded in ``sql_script_log`` in
+the same transaction as the statements, so rerunning a script skips
+everything that already ran and resumes after a failure. Changing a
+statement gives it a new checksum, so it runs again.
+
+Usage: python sql_script.py [script]   (default: setup_database.sql, against the configured MySQL server)
+"""
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, Column, String, Integer, DateTime, Float, select, insert
+
+SCRIPT_BATCH_SIZE = int(os.environ.get("SCRIPT_BATCH_SIZE", "500"))
+# Most INSERT statements merged into one multi-row INSERT
+MERGE_MAX_ROWS = 1000
+
+_metadata = MetaData()
+sql_script_log = Table(
+    "sql_script_log", _metadata,
+    Column("script", String(200), primary_key=True),
+    Column("checksum", String(64), primary_key=True),
+    # 1 for the first statement with this checksum in the script, 2 for the next identical one, ...
+    Column("occurrence", Integer, primary_key=True, autoincrement=False),
+    Column("statement", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    Column("elapsed_ms", Float, nullable=False)
+)
+
+# Optional MySQL version comment, as in mysqldump's /*!40101 SET NAMES utf8 */
+SESSION_PATTERN = re.compile(r"^(?:/\*!\d*\s*)?(USE|SET)\b|^CREATE\s+(DATABASE|SCHEMA)\b", re.IGNORECASE)
+DDL_PATTERN = re.compile(r"^(?:/\*!\d*\s*)?(CREATE|ALTER|DROP|RENAME|TRUNCATE)\b", re.IGNORECASE)
+INSERT_VALUES_PATTERN = re.compile(
+    r"^(INSERT\s+(?:IGNORE\s+)?INTO\s+[\w`.\"]+\s*\([^)]*\)\s*VALUES)\s*(\(.*\))$", re.IGNORECASE | re.DOTALL
+)
+DELIMITER_PATTERN = re.compile(r"[ \t]*DELIMITER[ \t]+(\S+)[ \t]*(\r?\n|$)", re.IGNORECASE)
+
+
+class Statement:
+    """One statement of a script: its normalized SQL, starting line, kind, checksum and occurrence."""
+
+    __slots__ = ('sql', 'line', 'kind', 'checksum', 'occurrence')
+
+    def __init__(self, sql: str, line: int):
+        self.sql = sql
+        self.line = line
+        if SESSION_PATTERN.match(sql):
+            self.kind = 'session'
+        elif DDL_PATTERN.match(sql):
+            self.kind = 'ddl'
+        else:
+            self.kind = 'dml'
+        self.checksum = hashlib.sha256(sql.encode()).hexdigest()
+        self.occurrence = 1
+
+    @property
+    def key(self) -> tuple:
+        """Identity of the statement within its script, as recorded in ``sql_script_log``."""
+        return self.checksum, self.occurrence
+
+    def preview(self, length: int = 80) -> str:
+        return self.sql if len(self.sql) <= length else self.sql[:length - 3] + "..."
+
+
+def parse_script(script: str) -> list:
+    """Split ``script`` into statements, dropping comments and collapsing whitespace outside quotes.
+
+    MySQL ``/*! ... */`` executable comments are kept.
+    """
+    statements = []
+    seen = {}
+    delimiter = ";"
+    parts = []
+    line = 1
+    start_line = None
+    pending_space = False
+    i, n = 0, len(script)
+
+    def emit(text: str):
+        nonlocal pending_space
+        if pending_space and parts:
+            parts.append(" ")
+        pending_space = False
+        parts.append(text)
+
+    def finish():
+        nonlocal parts, start_line, pending_space
+        sql = "".join(parts).strip()
+        if sql:
+            statement = Statement(sql, start_line)
+            statement.occurrence = seen[statement.checksum] = seen.get(statement.checksum, 0) + 1
+            statements.append(statement)
+        parts, start_line, pending_space = [], None, False
+
+    while i < n:
+        char = script[i]
+        at_line_start = i == 0 or script[i - 1] == "\n"
+        if at_line_start and not parts:
+            match = DELIMITER_PATTERN.match(script, i)
+            if match:
+                delimiter = match.group(1)
+                line += match.group(0).count("\n")
+                i = match.end()
+                continue
+        if script.startswith(delimiter, i):
+            finish()
+            i += len(delimiter)
+            continue
+        if char == "\n":
+            line += 1
+        if char in " \t\r\n":
+            pending_space = True
+            i += 1
+            continue
+        if char == "#" or (script.startswith("--", i) and (i + 2 >= n or script[i + 2] in " \t\r\n")):
+            end = script.find("\n", i)
+            i = n if end == -1 else end
+            pending_space = True
+            continue
+        if script.startswith("/*", i):
+            end = script.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            comment = script[i:end]
+            line += comment.count("\n")
+            if comment.startswith("/*!"):
+                if start_line is None:
+                    start_line = line
+                emit(comment)
+            else:
+                pending_space = True
+            i = end
+            continue
+        if start_line is None:
+            start_line = line
+        if char in "'\"`":
+            # Quoted string or identifier; backslash escapes, a doubled quote reopens the string
+            j = i + 1
+            while j < n:
+                if script[j] == "\\" and char != "`":
+                    j += 2
+                    continue
+                if script[j] == char:
+                    break
+                j += 1
+            quoted = script[i:j + 1]
+            line += quoted.count("\n")
+            emit(quoted)
+            i = j + 1
+            continue
+        j = i
+        while j < n and script[j] not in " \t\r\n'\"`#/-" and not script.startswith(delimiter, j):
+            j += 1
+        if j == i:
+            j = i + 1
+        emit(script[i:j])
+        i = j
+    finish()
+    return statements
+
+
+_script_cache = {}
+_script_cache_lock = threading.Lock()
+
+
+def load_script(path: str):
+    """The text and parsed statements of the script at ``path``, re-read only when the file changes."""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _script_cache_lock:
+        cached = _script_cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+    with open(path, "r") as f:
+        text = f.read()
+    statements = parse_script(text)
+    with _script_cache_lock:
+        _script_cache[path] = (signature, text, statements)
+    return text, statements
+
+
+def _merge_inserts(statements: list) -> list:
+    """Group consecutive ``INSERT INTO t (cols) VALUES (...)`` statements for the same table and columns.
+
+    Returns (sql, statements) pairs; merged groups become one multi-row insert.
+    """
+    groups = []
+    head, rows = None, 0
+    for statement in statements:
+        match = INSERT_VALUES_PATTERN.match(statement.sql)
+        # ON DUPLICATE KEY UPDATE clauses would be ambiguous once merged
+        if match and not re.search(r"\)\s*ON\s+DUPLICATE\s+KEY", match.group(2), re.IGNORECASE):
+            this_head = " ".join(match.group(1).upper().split())
+            if groups and this_head == head and rows < MERGE_MAX_ROWS:
+                groups[-1][1].append(statement)
+                groups[-1][2].append(match.group(2))
+                rows += 1
+                continue
+            groups.append((match.group(1), [statement], [match.group(2)]))
+            head, rows = this_head, 1
+        else:
+            groups.append((None, [statement], None))
+            head, rows = None, 0
+    merged = []
+    for prefix, members, values in groups:
+        if prefix is None or len(members) == 1:
+            merged.extend((member.sql, [member]) for member in members)
+        else:
+            merged.append((f"{prefix} {', '.join(values)}", members))
+    return merged
+
+
+def _log_ready(conn) -> bool:
+    """Whether applied statements can be recorded yet (on MySQL, only once a database is selected)."""
+    if conn.dialect.name == 'mysql' and conn.exec_driver_sql("SELECT DATABASE()").scalar() is None:
+        return False
+    sql_script_log.create(bind=conn, checkfirst=True)
+    return True
+
+
+def run_script(conn, statements: list, script: str, batch_size: int = SCRIPT_BATCH_SIZE) -> dict:
+    """Run ``statements`` on ``conn``, skipping those already recorded as applied for ``script``.
+
+    Returns a report with one entry per statement: line, kind, status
+    (applied, skipped or failed), elapsed ms and affected rows. Statements that
+    were merged into one multi-row insert share its timing and row count. A
+    failure rolls back the batch it belongs to and stops the run; the report's
+    ``error`` names the failing statement, or the lines of the batch when
+    recording or committing it failed.
+    """
+    started = time.perf_counter()
+    entries = []
+    report = {'script': script, 'applied': 0, 'skipped': 0, 'failed': 0, 'error': None, 'statements': entries}
+    applied = None
+
+    def entry(statement, status, elapsed_ms=None, rows=None):
+        entries.append({'line': statement.line, 'kind': statement.kind, 'statement': statement.preview(),
+                        'status': status, 'ms': None if elapsed_ms is None else round(elapsed_ms, 2), 'rows': rows})
+        report[status] += 1
+
+    def load_applied():
+        """Keys of the statements already applied, or None while the log table cannot be reached yet."""
+        nonlocal applied
+        if applied is None:
+            if _log_ready(conn):
+                applied = set(conn.execute(
+                    select(sql_script_log.c.checksum, sql_script_log.c.occurrence)
+                    .where(sql_script_log.c.script == script)
+                ).tuples())
+            conn.commit()
+        return applied
+
+    def run_group(group: list) -> bool:
+        """Run one transaction (a DDL or session statement, or a batch of data statements); False on failure."""
+        pairs = _merge_inserts(group) if group[0].kind == 'dml' else [(group[0].sql, group)]
+        results = []
+        # The statements being executed; None once they all ran and the batch is recorded and committed
+        running = None
+        transaction = conn.begin()
+        try:
+            for sql, members in pairs:
+                running = members
+                statement_started = time.perf_counter()
+                result = conn.exec_driver_sql(sql)
+                elapsed_ms = (time.perf_counter() - statement_started) * 1000
+                rows = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else None
+                results.append((members, elapsed_ms, rows))
+            running = None
+            recorded = [(member, elapsed_ms / len(members)) for members, elapsed_ms, _ in results for member in members
+                        if member.kind != 'session']
+            if recorded and applied is not None:
+                now = datetime.now()
+                conn.execute(insert(sql_script_log), [
+                    {'script': script, 'checksum': member.checksum, 'occurrence': member.occurrence,
+                     'statement': member.preview(200),
+                     'applied_at': now, 'elapsed_ms': elapsed_ms}
+                    for member, elapsed_ms in recorded
+                ])
+            transaction.commit()
+        except Exception as e:
+            try:
+                transaction.rollback()
+            except Exception:
+                # The connection is gone; the server has discarded the transaction
+                pass
+            if running is not None:
+                entry(running[0], 'failed')
+                report['error'] = f"Line {running[0].line}: {e}"
+            else:
+                # Every statement ran, but recording or committing the batch failed, so none of it applied
+                for statement in group:
+                    entry(statement, 'failed')
+                report['error'] = f"Lines {group[0].line}-{group[-1].line} (recording the batch): {e}"
+            return False
+        for members, elapsed_ms, rows in results:
+            for member in members:
+                entry(member, 'applied', elapsed_ms, rows)
+        if applied is not None:
+            applied.update(member.key for member, _ in recorded)
+        return True
+
+    batch = []
+    for statement in statements:
+        if statement.kind != 'session':
+            known = load_applied()
+            if known is not None and statement.key in known:
+                entry(statement, 'skipped')
+                continue
+            if statement.kind == 'dml':
+                batch.append(statement)
+                if len(batch) < batch_size:
+                    continue
+                statement = None
+        # Anything that is not batched (session statements, DDL) ends the current batch
+        if batch:
+            ok = run_group(batch)
+            batch = []
+            if not ok:
+                break
+        if statement is not None and not run_group([statement]):
+            break
+    else:
+        if batch:
+            run_group(batch)
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def server_url():
+    """URL of the configured MySQL server without a database, so a script can create and select it."""
+    from sqlalchemy.engine import URL
+    from database import MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_PORT
+    return URL.create("mysql+pymysql", username=MYSQL_USER, password=MYSQL_PASSWORD,
+                      host=MYSQL_HOST, port=MYSQL_PORT)
+
+
+def run_script_file(path: str, url=None) -> dict:
+    """Parse (cached) and run the script at ``path`` on a dedicated connection to ``url``."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+    _, statements = load_script(path)
+    # A private, unpooled connection: USE must not leak into the application's pool
+    connect_args = {'connect_timeout': 10} if url is None else {}
+    engine = create_engine(url or server_url(), poolclass=NullPool, connect_args=connect_args)
+    try:
+        with engine.connect() as conn:
+            return run_script(conn, statements, os.path.basename(path))
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "setup_database.sql"
+    report = run_script_file(path)
+    for item in report['statements']:
+        ms = "" if item['ms'] is None else f"{item['ms']:.2f} ms"
+        print(f"{item['line']:>5}  {item['status']:8} {ms:>12}  {item['statement']}")
+    print(f"{report['applied']} applied, {report['skipped']} skipped, {report['failed']} failed in {report['seconds']}s")
+    if report['error']:
+        print(report['error'])
+        sys.exit(1)
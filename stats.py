@@ -0,0 +1,183 @@
+import sys
+
+from sqlalchemy import event, select, func, delete, update, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import attributes
+
+from database import SessionLocal, session_scope, Student, Teacher, StatCount
+
+# Columns whose value distributions the dashboard charts, per table
+STATS_DIMENSIONS = {
+    Student: ('students', ['department', 'year']),
+    Teacher: ('teachers', ['department'])
+}
+
+# Dimension holding the row count of each entity; its presence marks the stats as built
+TOTAL = 'total'
+
+
+def _bump(connection, entity: str, dimension: str, value, delta: int):
+    """Add ``delta`` to one counter, creating it if needed, in one atomic upsert.
+
+    UPDATE-then-INSERT would let two concurrent writers both miss the row and
+    the second INSERT fail on the primary key, aborting its transaction.
+    """
+    value = '' if value is None else str(value)
+    row = {'entity': entity, 'dimension': dimension, 'value': value, 'count': delta}
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        statement = mysql_insert(StatCount).values(**row)
+        statement = statement.on_duplicate_key_update(count=StatCount.count + statement.inserted.count)
+    elif dialect == 'sqlite':
+        statement = sqlite_insert(StatCount).values(**row)
+        statement = statement.on_conflict_do_update(
+            index_elements=[StatCount.entity, StatCount.dimension, StatCount.value],
+            set_={'count': StatCount.count + statement.excluded.count}
+        )
+    else:
+        key = (StatCount.entity == entity) & (StatCount.dimension == dimension) & (StatCount.value == value)
+        result = connection.execute(update(StatCount).where(key).values(count=StatCount.count + delta))
+        if result.rowcount == 0:
+            connection.execute(insert(StatCount).values(**row))
+        return
+    connection.execute(statement)
+
+
+def _built(connection, entity: str) -> bool:
+    return connection.execute(
+        select(StatCount.count).where(StatCount.entity == entity, StatCount.dimension == TOTAL)
+    ).first() is not None
+
+
+def _on_insert(mapper, connection, target):
+    entity, dimensions = STATS_DIMENSIONS[type(target)]
+    if not _built(connection, entity):
+        return  # the first read rebuilds everything from the base table
+    _bump(connection, entity, TOTAL, '', 1)
+    for dimension in dimensions:
+        _bump(connection, entity, dimension, getattr(target, dimension), 1)
+
+
+def _on_delete(mapper, connection, target):
+    entity, dimensions = STATS_DIMENSIONS[type(target)]
+    if not _built(connection, entity):
+        return
+    _bump(connection, entity, TOTAL, '', -1)
+    for dimension in dimensions:
+        _bump(connection, entity, dimension, getattr(target, dimension), -1)
+
+
+def _on_update(mapper, connection, target):
+    entity, dimensions = STATS_DIMENSIONS[type(target)]
+    if not _built(connection, entity):
+        return
+    for dimension in dimensions:
+        history = attributes.get_history(target, dimension)
+        if history.has_changes():
+            for old in history.deleted:
+                _bump(connection, entity, dimension, old, -1)
+            for new in history.added:
+                _bump(connection, entity, dimension, new, 1)
+
+
+for model in STATS_DIMENSIONS:
+    event.listen(model, 'after_insert', _on_insert)
+    event.listen(model, 'after_delete', _on_delete)
+    event.listen(model, 'after_update', _on_update)
+
+
+def record_bulk_insert(connection, model, rows: list):
+    """Update the counters for rows inserted with Core ``insert`` (which skips the ORM listeners)."""
+    entity, dimensions = STATS_DIMENSIONS[model]
+    if not rows or not _built(connection, entity):
+        return
+    _bump(connection, entity, TOTAL, '', len(rows))
+    for dimension in dimensions:
+        counts = {}
+        for row in rows:
+            counts[row[dimension]] = counts.get(row[dimension], 0) + 1
+        for value, count in counts.items():
+            _bump(connection, entity, dimension, value, count)
+
+
+def compute_stats(db) -> dict:
+    """Count every tracked dimension straight from the base tables with GROUP BY."""
+    counts = {}
+    for model, (entity, dimensions) in STATS_DIMENSIONS.items():
+        counts[(entity, TOTAL, '')] = db.execute(select(func.count()).select_from(model)).scalar()
+        for dimension in dimensions:
+            column = getattr(model, dimension)
+            for value, count in db.execute(select(column, func.count()).group_by(column)).all():
+                counts[(entity, dimension, '' if value is None else str(value))] = count
+    return counts
+
+
+def refresh_stats():
+    """Rebuild the materialized counts from the base tables in one transaction."""
+    with session_scope() as db:
+        counts = compute_stats(db)
+        db.execute(delete(StatCount))
+        db.execute(insert(StatCount), [
+            {'entity': entity, 'dimension': dimension, 'value': value, 'count': count}
+            for (entity, dimension, value), count in counts.items()
+        ])
+        db.commit()
+    return counts
+
+
+def check_stats() -> list:
+    """Compare the materialized counts with GROUP BY results; returns mismatches as (key, stored, actual)."""
+    db = SessionLocal()
+    try:
+        actual = compute_stats(db)
+        stored = {
+            (row.entity, row.dimension, row.value): row.count
+            for row in db.execute(select(StatCount)).scalars()
+            if row.count != 0
+        }
+    finally:
+        db.close()
+    keys = set(actual) | set(stored)
+    return sorted(
+        (key, stored.get(key, 0), actual.get(key, 0))
+        for key in keys
+        if stored.get(key, 0) != actual.get(key, 0)
+    )
+
+
+def get_dashboard_stats() -> dict:
+    """Return per-entity totals and value counts for the dashboard from the materialized table."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(StatCount.entity, StatCount.dimension, StatCount.value, StatCount.count)).all()
+    finally:
+        db.close()
+    built = {entity for entity, dimension, _, _ in rows if dimension == TOTAL}
+    if len(built) < len(STATS_DIMENSIONS):
+        refresh_stats()
+        return get_dashboard_stats()
+
+    stats = {entity: {'total': 0, **{d: {} for d in dimensions}} for entity, dimensions in STATS_DIMENSIONS.values()}
+    for entity, dimension, value, count in rows:
+        if dimension == TOTAL:
+            stats[entity]['total'] = count
+        elif count > 0:
+            stats[entity][dimension][int(value) if dimension == 'year' else value] = count
+    for entity, dimensions in STATS_DIMENSIONS.values():
+        for dimension in dimensions:
+            # Largest groups first, like value_counts()
+            stats[entity][dimension] = dict(sorted(stats[entity][dimension].items(), key=lambda item: -item[1]))
+    return stats
+
+
+if __name__ == "__main__":
+    # Consistency job: python stats.py [--refresh]
+    mismatches = check_stats()
+    for key, stored, actual in mismatches:
+        print(f"{'/'.join(key)}: stored {stored}, actual {actual}")
+    if "--refresh" in sys.argv or mismatches:
+        refresh_stats()
+        print("Dashboard statistics rebuilt")
+    else:
+        print("Dashboard statistics are consistent")
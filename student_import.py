@@ -0,0 +1,116 @@
+import os
+import time
+from typing import Iterator
+
+import pandas as pd
+from sqlalchemy import insert
+
+from database import session_scope, Student
+from roster_cache import student_roster
+from stats import record_bulk_insert
+from validation import validate_students_frame
+
+# Rows read from the file at a time, and rows written per INSERT/transaction
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+
+IMPORT_COLUMNS = ['Name', 'Department', 'Year', 'Email', 'Phone']
+
+
+def read_chunks(file, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Stream a CSV or XLSX upload as DataFrames of at most ``chunk_size`` rows, all values as strings."""
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("Reading Excel files requires openpyxl (pip install openpyxl)")
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(value).strip() if value is not None else '' for value in next(rows, [])]
+            chunk = []
+            for row in rows:
+                chunk.append(['' if value is None else str(value) for value in row])
+                if len(chunk) == chunk_size:
+                    yield pd.DataFrame(chunk, columns=header)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+    else:
+        yield from pd.read_csv(file, dtype=str, keep_default_na=False, chunksize=chunk_size)
+
+
+def validate_chunk(chunk: pd.DataFrame, first_row: int):
+    """Validate a chunk; returns (valid records, their row numbers, (row, message) errors).
+
+    ``first_row`` is the spreadsheet row number of the chunk's first record
+    (the header is row 1), so errors point at the row the user sees.
+    """
+    chunk = chunk.rename(columns=lambda c: str(c).strip().title())
+    missing = [c for c in IMPORT_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    chunk = chunk[IMPORT_COLUMNS].apply(lambda column: column.str.strip())
+    mask = validate_students_frame(chunk)
+
+    rows = pd.Series(range(first_row, first_row + len(chunk)), index=chunk.index)
+    invalid = ~mask['valid']
+    errors = list(zip(rows[invalid].tolist(), mask['error'][invalid].tolist()))
+
+    valid = chunk[mask['valid']]
+    # Valid years are whole numbers, possibly written as '2.0', so convert through the numeric value
+    years = pd.to_numeric(valid['Year']).astype(int)
+    records = [
+        {'name': name, 'department': department, 'year': year, 'email': email, 'phone': phone}
+        for name, department, year, email, phone in zip(
+            valid['Name'], valid['Department'], years.tolist(), valid['Email'], valid['Phone']
+        )
+    ]
+    return records, list(rows[mask['valid']]), errors
+
+
+def insert_batch(records: list):
+    """Insert one batch with a single executemany INSERT in its own transaction."""
+    with session_scope() as db:
+        connection = db.connection()
+        connection.execute(insert(Student), records)
+        record_bulk_insert(connection, Student, records)
+        db.commit()
+
+
+def import_students(file, filename: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Validate and insert every student in a CSV/XLSX file, batch by batch.
+
+    Invalid rows are skipped and reported; a batch that fails in the
+    database is rolled back and all of its rows are reported with the error.
+    """
+    started = time.perf_counter()
+    rows_read = 0
+    inserted = 0
+    errors = []
+    for chunk in read_chunks(file, filename, chunk_size):
+        records, row_numbers, chunk_errors = validate_chunk(chunk, first_row=rows_read + 2)
+        rows_read += len(chunk)
+        errors.extend(chunk_errors)
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            try:
+                insert_batch(batch)
+                inserted += len(batch)
+            except Exception as e:
+                errors.extend((row, f"Database error: {e}") for row in row_numbers[start:start + batch_size])
+
+    if inserted:
+        student_roster.invalidate()
+    seconds = time.perf_counter() - started
+    return {
+        'rows_read': rows_read,
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': pd.DataFrame(sorted(errors), columns=['Row', 'Error']),
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(inserted / seconds) if seconds else 0
+    }
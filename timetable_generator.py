@@ -0,0 +1,294 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import time as clock
+from typing import List, Optional
+
+from sqlalchemy import select, insert
+
+from clash_detection import invalidate_schedule_index
+from database import Course, Teacher, ClassSchedule
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+# Courses whose placement is retried by relocating already-placed courses, per unplaced course
+REPAIR_ATTEMPTS = 20
+
+
+def make_slots(days: List[str], first_hour: int = 8, last_hour: int = 17, minutes: int = 60) -> list:
+    """Teaching slots as (day, start_time, end_time), ``minutes`` long, between the given hours."""
+    slots = []
+    for day in days:
+        start = first_hour * 60
+        while start + minutes <= last_hour * 60:
+            end = start + minutes
+            slots.append((day, clock(start // 60, start % 60), clock(end // 60, end % 60)))
+            start = end
+    return slots
+
+
+def eligible_teachers(course: dict, teachers: list) -> list:
+    """Teachers whose subjects mention the course title or code, else the course's department."""
+    wanted = {course['title'].lower(), course['course_code'].lower()}
+    matches = [
+        t for t in teachers
+        if any(w in s.strip().lower() or s.strip().lower() in w for w in wanted for s in t['subjects'].split(',') if s.strip())
+    ]
+    return matches or [t for t in teachers if t['department'] == course['department']]
+
+
+class Timetable:
+    """Partial timetable with teacher/room occupancy per slot."""
+
+    def __init__(self, slots: list, rooms: list, busy_teachers=(), busy_rooms=()):
+        self.slots = slots
+        self.rooms = rooms
+        self.days = []
+        self.slots_by_day = {}
+        for i, (day, _, _) in enumerate(slots):
+            if day not in self.slots_by_day:
+                self.days.append(day)
+            self.slots_by_day.setdefault(day, []).append(i)
+        self.teacher_busy = set(busy_teachers)  # (teacher_id, slot index)
+        self.room_busy = set(busy_rooms)  # (room, slot index)
+        self.placements = {}  # course id -> (teacher id, [(slot index, room), ...])
+        self.teacher_load = {}
+
+    def sessions_needed(self, course: dict) -> int:
+        return max(1, min(int(course['credit_hours']), len(self.days)))
+
+    def try_place(self, course: dict, teacher: dict) -> Optional[list]:
+        """Pick one free (slot, room) per session on distinct days, or None if the teacher cannot fit."""
+        teacher_id = teacher['id']
+        chosen = []
+        # Days where the teacher is least busy first, to spread the load across the week
+        days = sorted(self.days, key=lambda d: sum((teacher_id, i) in self.teacher_busy for i in self.slots_by_day[d]))
+        for day in days:
+            for slot in self.slots_by_day[day]:
+                if (teacher_id, slot) in self.teacher_busy:
+                    continue
+                room = next((r for r in self.rooms if (r, slot) not in self.room_busy), None)
+                if room is not None:
+                    chosen.append((slot, room))
+                    break
+            if len(chosen) == self.sessions_needed(course):
+                return chosen
+        return None
+
+    def commit(self, course: dict, teacher: dict, sessions: list):
+        for slot, room in sessions:
+            self.teacher_busy.add((teacher['id'], slot))
+            self.room_busy.add((room, slot))
+        self.placements[course['id']] = (teacher['id'], sessions)
+        self.teacher_load[teacher['id']] = self.teacher_load.get(teacher['id'], 0) + len(sessions)
+
+    def remove(self, course_id: int):
+        teacher_id, sessions = self.placements.pop(course_id)
+        for slot, room in sessions:
+            self.teacher_busy.discard((teacher_id, slot))
+            self.room_busy.discard((room, slot))
+        self.teacher_load[teacher_id] -= len(sessions)
+        return teacher_id, sessions
+
+    def place(self, course: dict, candidates: list) -> bool:
+        for teacher in sorted(candidates, key=lambda t: self.teacher_load.get(t['id'], 0)):
+            sessions = self.try_place(course, teacher)
+            if sessions:
+                self.commit(course, teacher, sessions)
+                return True
+        return False
+
+
+def solve(courses: list, teachers: list, rooms: list, slots: list,
+          busy_teachers=(), busy_rooms=(), candidates: Optional[dict] = None) -> dict:
+    """Build a clash-free timetable with a greedy pass followed by local-search repair.
+
+    Courses with the fewest eligible teachers and the most sessions are
+    placed first. Each course that still does not fit is retried by
+    temporarily removing a placed course that shares a candidate teacher,
+    placing the stuck course, and re-placing the removed one; the move is
+    kept only if both fit. ``candidates`` maps course IDs to their eligible
+    teachers when the caller has already worked them out.
+    """
+    table = Timetable(slots, rooms, busy_teachers, busy_rooms)
+    if candidates is None:
+        candidates = {c['id']: eligible_teachers(c, teachers) for c in courses}
+    by_id = {c['id']: c for c in courses}
+    order = sorted(courses, key=lambda c: (len(candidates[c['id']]), -table.sessions_needed(c)))
+
+    unplaced = [c for c in order if not candidates[c['id']] or not table.place(c, candidates[c['id']])]
+
+    still_unplaced = []
+    for course in unplaced:
+        placed = False
+        teacher_ids = {t['id'] for t in candidates[course['id']]}
+        blockers = [cid for cid, (tid, _) in table.placements.items() if tid in teacher_ids][:REPAIR_ATTEMPTS]
+        for blocker_id in blockers:
+            old_teacher_id, old_sessions = table.remove(blocker_id)
+            if table.place(course, candidates[course['id']]):
+                if table.place(by_id[blocker_id], candidates[blocker_id]):
+                    placed = True
+                    break
+                table.remove(course['id'])
+            old_teacher = next(t for t in teachers if t['id'] == old_teacher_id)
+            table.commit(by_id[blocker_id], old_teacher, old_sessions)
+        if not placed:
+            still_unplaced.append(course)
+
+    return {
+        'placements': table.placements,
+        'unscheduled': [c['id'] for c in still_unplaced]
+    }
+
+
+def _solve_job(args):
+    return solve(*args)
+
+
+def _independent_groups(courses: list, teachers: list, candidates: dict) -> list:
+    """Split courses into groups that share no eligible teacher; returns (courses, teachers) per group."""
+    parent = {t['id']: t['id'] for t in teachers}
+
+    def find(teacher_id):
+        while parent[teacher_id] != teacher_id:
+            parent[teacher_id] = parent[parent[teacher_id]]
+            teacher_id = parent[teacher_id]
+        return teacher_id
+
+    for course in courses:
+        ids = [t['id'] for t in candidates[course['id']]]
+        for teacher_id in ids[1:]:
+            parent[find(teacher_id)] = find(ids[0])
+
+    groups = {}
+    for course in courses:
+        # Courses without any candidate cannot be placed; they share a group and come back unscheduled
+        key = find(candidates[course['id']][0]['id']) if candidates[course['id']] else None
+        groups.setdefault(key, ([], []))[0].append(course)
+    for teacher in teachers:
+        key = find(teacher['id'])
+        if key in groups:
+            groups[key][1].append(teacher)
+    return list(groups.values())
+
+
+def _split_rooms(rooms: list, demands: list) -> list:
+    """Give each job one room, and the rest by largest remainder of its share of ``demands``; never over-allocates."""
+    if not sum(demands):
+        demands = [1] * len(demands)
+    spare = len(rooms) - len(demands)
+    total = sum(demands)
+    quotas = [spare * demand / total for demand in demands]
+    counts = [1 + int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(demands)), key=lambda i: quotas[i] - int(quotas[i]), reverse=True)
+    for i in by_remainder[:len(rooms) - sum(counts)]:
+        counts[i] += 1
+    shares, start = [], 0
+    for count in counts:
+        shares.append(rooms[start:start + count])
+        start += count
+    return shares
+
+
+def generate_timetable(courses: list, teachers: list, rooms: list, slots: list, semester: str,
+                       busy_teachers=(), busy_rooms=(), parallel: bool = False,
+                       workers: Optional[int] = None) -> dict:
+    """Generate class schedules for ``courses``; returns {'schedules', 'unscheduled', 'seconds'}.
+
+    With ``parallel``, courses are split into groups that share no eligible
+    teacher (the same eligibility rule as the single solve), and the groups
+    are packed into up to ``workers`` jobs solved in separate processes.
+    Rooms are split between the jobs in proportion to the sessions they need,
+    so the partial timetables cannot clash; a job can then run out of rooms
+    where one big solve would not. If the courses form a single group, or
+    there are fewer rooms than jobs, it falls back to one solve.
+
+    Worker processes are spawned rather than forked, so this is safe to call
+    from a multi-threaded server such as Streamlit.
+    """
+    started = time.perf_counter()
+    jobs, candidates = [], None
+    if parallel:
+        # The same eligibility rule as one big solve, so each course sees the same candidates in its job
+        candidates = {c['id']: eligible_teachers(c, teachers) for c in courses}
+        groups = _independent_groups(courses, teachers, candidates)
+        demand = lambda group: sum(max(1, int(c['credit_hours'])) for c in group[0])
+        job_count = min(workers or os.cpu_count() or 1, len(groups), len(rooms))
+        if job_count > 1:
+            # Largest groups first, each onto the least loaded job
+            packed = [([], [], 0) for _ in range(job_count)]
+            for group in sorted(groups, key=demand, reverse=True):
+                i = min(range(job_count), key=lambda j: packed[j][2])
+                packed[i] = (packed[i][0] + group[0], packed[i][1] + group[1], packed[i][2] + demand(group))
+            shares = _split_rooms(rooms, [load for _, _, load in packed])
+            jobs = [
+                (job_courses, job_teachers, share, slots, busy_teachers,
+                 [(r, s) for r, s in busy_rooms if r in share], {c['id']: candidates[c['id']] for c in job_courses})
+                for (job_courses, job_teachers, _), share in zip(packed, shares)
+            ]
+    if jobs:
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(_solve_job, jobs))
+    else:
+        results = [solve(courses, teachers, rooms, slots, busy_teachers, busy_rooms, candidates)]
+
+    schedules, unscheduled = [], []
+    for result in results:
+        unscheduled.extend(result['unscheduled'])
+        for course_id, (teacher_id, sessions) in result['placements'].items():
+            for slot, room in sessions:
+                day, start_time, end_time = slots[slot]
+                schedules.append({
+                    'course_id': course_id,
+                    'teacher_id': teacher_id,
+                    'day_of_week': day,
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'room_number': room,
+                    'semester': semester
+                })
+    return {'schedules': schedules, 'unscheduled': unscheduled, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def load_generator_inputs(db, semester: str, rooms: list, slots: list) -> dict:
+    """Courses and teachers from the database, plus occupancy from the semester's existing schedules."""
+    courses = [
+        {'id': c.id, 'course_code': c.course_code, 'title': c.title, 'department': c.department,
+         'credit_hours': c.credit_hours}
+        for c in db.execute(select(Course)).scalars()
+    ]
+    teachers = [
+        {'id': t.id, 'name': t.name, 'department': t.department, 'subjects': t.subjects}
+        for t in db.execute(select(Teacher)).scalars()
+    ]
+    scheduled = set()
+    busy_teachers, busy_rooms = set(), set()
+    existing = db.execute(
+        select(ClassSchedule.course_id, ClassSchedule.teacher_id, ClassSchedule.room_number,
+               ClassSchedule.day_of_week, ClassSchedule.start_time, ClassSchedule.end_time)
+        .where(ClassSchedule.semester == semester)
+    ).all()
+    for course_id, teacher_id, room, day, start_time, end_time in existing:
+        scheduled.add(course_id)
+        for i, (slot_day, slot_start, slot_end) in enumerate(slots):
+            if slot_day == day and slot_start < end_time and start_time < slot_end:
+                busy_teachers.add((teacher_id, i))
+                busy_rooms.add((room, i))
+    return {
+        # Courses that already have classes this semester are left alone
+        'courses': [c for c in courses if c['id'] not in scheduled],
+        'teachers': teachers,
+        'busy_teachers': busy_teachers,
+        'busy_rooms': busy_rooms
+    }
+
+
+def save_timetable(db, schedules: list) -> int:
+    """Insert generated schedules in one transaction."""
+    if schedules:
+        db.execute(insert(ClassSchedule), schedules)
+        db.commit()
+        # Core inserts skip the ORM events that keep the clash index current
+        invalidate_schedule_index()
+    return len(schedules)
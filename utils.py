@@ -1,33 +1,37 @@
-import streamlit as st
-import pandas as pd
-import re
-from database import init_db, get_db, SessionLocal, Student, Teacher, User
+from database import bootstrap_db, get_db, SessionLocal, Student, Teacher, User
+from roster_cache import student_roster, teacher_roster
+from bulk_read import fetch_frame, STUDENT_COLUMNS, TEACHER_COLUMNS
+from validation import EMAIL_RE, PHONE_RE, VALID_YEARS, parse_year
+from write_queue import get_write_queue
+import stats  # registers the listeners that keep dashboard counts current
 
 def initialize_session_state():
     """Initialize session state and database."""
-    # Initialize database
-    init_db()
-    
-    # Initialize session state variables
-    if 'students' not in st.session_state:
-        st.session_state.students = pd.DataFrame(columns=[
-            'ID', 'Name', 'Department', 'Year', 'Email', 'Phone'
-        ])
-    if 'teachers' not in st.session_state:
-        st.session_state.teachers = pd.DataFrame(columns=[
-            'ID', 'Name', 'Department', 'Subjects', 'Email', 'Phone'
-        ])
-    
-    # Load data from database
-    load_data_from_database()
+    # Initialize database (once per process, not on every rerun)
+    bootstrap_db()
+    # The rosters live in the process-wide roster cache (used for has_id); pages query
+    # the database for what they show, so nothing is copied into session state
 
 def validate_email(email):
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return bool(re.match(pattern, email))
+    return bool(EMAIL_RE.fullmatch(email))
 
 def validate_phone(phone):
-    pattern = r'^\d{10,11}$'  # Accept 10 or 11 digits
-    return bool(re.match(pattern, phone))
+    return bool(PHONE_RE.fullmatch(phone))
+
+# IDs are stored in INT columns; 0 is left out because MySQL turns it into an auto-increment value
+MAX_ID = 2 ** 31 - 1
+
+def parse_id(value):
+    """A form ID as an int, or None unless it is a plain ASCII number from 1 to MAX_ID.
+
+    '²'.isdigit() is True, but int('²') fails; the range check stops an ID the
+    column cannot hold from being accepted and then failing in the write queue.
+    """
+    value = str(value).strip()
+    if not (value.isascii() and value.isdigit()) or len(value) > len(str(MAX_ID)):
+        return None
+    value = int(value)
+    return value if 1 <= value <= MAX_ID else None
 
 def validate_student_data(id, name, department, year, email, phone):
     if not id or not name or not department or not year:
@@ -36,7 +40,12 @@ def validate_student_data(id, name, department, year, email, phone):
         return False, "Invalid email format"
     if not validate_phone(phone):
         return False, "Phone number must be 10 or 11 digits"
-    if id in st.session_state.students['ID'].values:
+    if parse_year(year) not in VALID_YEARS:
+        return False, "Year must be 1, 2, 3 or 4"
+    student_id = parse_id(id)
+    if student_id is None:
+        return False, f"Student ID must be a number from 1 to {MAX_ID}"
+    if student_roster.has_id(student_id):
         return False, "Student ID already exists"
     return True, "Valid"
 
@@ -47,89 +56,20 @@ def validate_teacher_data(id, name, department, subjects, email, phone):
         return False, "Invalid email format"
     if not validate_phone(phone):
         return False, "Phone number must be 10 or 11 digits"
-    if id in st.session_state.teachers['ID'].values:
+    teacher_id = parse_id(id)
+    if teacher_id is None:
+        return False, f"Teacher ID must be a number from 1 to {MAX_ID}"
+    if teacher_roster.has_id(teacher_id):
         return False, "Teacher ID already exists"
     return True, "Valid"
 
-def load_data_from_database():
-    """Load data from database to session state for compatibility."""
-    db = SessionLocal()
-    try:
-        # Load students
-        students = db.query(Student).all()
-        student_data = []
-        for student in students:
-            student_data.append({
-                'ID': str(student.id),
-                'Name': student.name,
-                'Department': student.department,
-                'Year': student.year,
-                'Email': student.email,
-                'Phone': student.phone
-            })
-        st.session_state.students = pd.DataFrame(student_data) if student_data else pd.DataFrame(columns=[
-            'ID', 'Name', 'Department', 'Year', 'Email', 'Phone'
-        ])
-        
-        # Load teachers
-        teachers = db.query(Teacher).all()
-        teacher_data = []
-        for teacher in teachers:
-            teacher_data.append({
-                'ID': str(teacher.id),
-                'Name': teacher.name,
-                'Department': teacher.department,
-                'Subjects': teacher.subjects,
-                'Email': teacher.email,
-                'Phone': teacher.phone
-            })
-        st.session_state.teachers = pd.DataFrame(teacher_data) if teacher_data else pd.DataFrame(columns=[
-            'ID', 'Name', 'Department', 'Subjects', 'Email', 'Phone'
-        ])
-    finally:
-        db.close()
-
-def get_all_students():
+def get_all_students(chunk_size=None):
     """Get all students from the database."""
-    db = SessionLocal()
-    try:
-        students = db.query(Student).all()
-        student_data = []
-        for student in students:
-            student_data.append({
-                'ID': str(student.id),
-                'Name': student.name,
-                'Department': student.department,
-                'Year': student.year,
-                'Email': student.email,
-                'Phone': student.phone
-            })
-        return pd.DataFrame(student_data) if student_data else pd.DataFrame(columns=[
-            'ID', 'Name', 'Department', 'Year', 'Email', 'Phone'
-        ])
-    finally:
-        db.close()
+    return fetch_frame(STUDENT_COLUMNS, chunk_size=chunk_size)
 
-def get_all_teachers():
+def get_all_teachers(chunk_size=None):
     """Get all teachers from the database."""
-    db = SessionLocal()
-    try:
-        teachers = db.query(Teacher).all()
-        teacher_data = []
-        for teacher in teachers:
-            teacher_data.append({
-                'ID': str(teacher.id),
-                'Name': teacher.name,
-                'Department': teacher.department,
-                'Subjects': teacher.subjects,
-                'Email': teacher.email,
-                'Phone': teacher.phone
-            })
-        return pd.DataFrame(teacher_data) if teacher_data else pd.DataFrame(columns=[
-            'ID', 'Name', 'Department', 'Subjects', 'Email', 'Phone'
-        ])
-    finally:
-        db.close()
+    return fetch_frame(TEACHER_COLUMNS, chunk_size=chunk_size)
         
 def add_student_to_db(student_data):
     """Add a student to the database."""
@@ -144,6 +84,7 @@ def add_student_to_db(student_data):
         )
         db.add(new_student)
         db.commit()
+        student_roster.invalidate()
         return True, "Student added successfully to database"
     except Exception as e:
         db.rollback()
@@ -164,9 +105,34 @@ def add_teacher_to_db(teacher_data):
         )
         db.add(new_teacher)
         db.commit()
+        teacher_roster.invalidate()
         return True, "Teacher added successfully to database"
     except Exception as e:
         db.rollback()
         return False, f"Database error: {str(e)}"
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def queue_student(student_data):
+    """Accept a validated student form; the write-behind queue saves it to the database in the background."""
+    get_write_queue().enqueue('students', {
+        'id': int(student_data['ID']),
+        'name': student_data['Name'],
+        'department': student_data['Department'],
+        'year': int(student_data['Year']),
+        'email': student_data['Email'],
+        'phone': student_data['Phone']
+    })
+    return True, "Student added successfully!"
+
+def queue_teacher(teacher_data):
+    """Accept a validated teacher form; the write-behind queue saves it to the database in the background."""
+    get_write_queue().enqueue('teachers', {
+        'id': int(teacher_data['ID']),
+        'name': teacher_data['Name'],
+        'department': teacher_data['Department'],
+        'subjects': teacher_data['Subjects'],
+        'email': teacher_data['Email'],
+        'phone': teacher_data['Phone']
+    })
+    return True, "Teacher added successfully!"
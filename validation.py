@@ -0,0 +1,106 @@
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (enables the Arrow string kernels below)
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = "string"
+
+# ASCII-only classes: the Arrow kernels run these patterns with RE2, where \w and \d are
+# ASCII, so spelling the classes out keeps the form and frame validators in agreement
+EMAIL_PATTERN = r'^[A-Za-z0-9_.-]+@[A-Za-z0-9_.-]+\.[A-Za-z0-9_]+$'
+PHONE_PATTERN = r'^[0-9]{10,11}$'  # Accept 10 or 11 digits
+# A whole number, optionally written as a float the way spreadsheet exports do ('2.0')
+YEAR_PATTERN = r'^[0-9]+(\.0+)?$'
+EMAIL_RE = re.compile(EMAIL_PATTERN, re.ASCII)
+PHONE_RE = re.compile(PHONE_PATTERN, re.ASCII)
+YEAR_RE = re.compile(YEAR_PATTERN, re.ASCII)
+VALID_YEARS = {1, 2, 3, 4}
+
+# Checks in reporting order; the first failing check gives a row's error message
+STUDENT_CHECKS = [
+    ('missing_fields', "All fields are required"),
+    ('invalid_email', "Invalid email format"),
+    ('invalid_phone', "Phone number must be 10 or 11 digits"),
+    ('invalid_year', "Year must be 1, 2, 3 or 4"),
+    ('duplicate_id', "Student ID already exists")
+]
+
+TEACHER_CHECKS = [
+    ('missing_fields', "All fields are required"),
+    ('invalid_email', "Invalid email format"),
+    ('invalid_phone', "Phone number must be 10 or 11 digits"),
+    ('duplicate_id', "Teacher ID already exists")
+]
+
+
+def _text(frame: pd.DataFrame, column: str) -> pd.Series:
+    """A column as stripped strings with missing values as ''."""
+    return frame[column].astype(STRING_DTYPE).fillna('').str.strip()
+
+
+def _matches(series: pd.Series, pattern: str) -> pd.Series:
+    return series.str.match(pattern).fillna(False).astype(bool)
+
+
+def parse_year(value):
+    """A year as an int, or None unless it is a whole number ('2' or '2.0', not '2.5' or '1e0')."""
+    value = str(value).strip()
+    if not YEAR_RE.fullmatch(value):
+        return None
+    return int(float(value))
+
+
+def _duplicate_ids(frame: pd.DataFrame, existing_ids) -> pd.Series:
+    """IDs already in ``existing_ids`` (hash-set lookup) or repeated earlier in the frame."""
+    if 'ID' not in frame.columns:
+        return pd.Series(False, index=frame.index)
+    ids = _text(frame, 'ID')
+    duplicate = ids.duplicated(keep='first') & (ids != '')
+    if existing_ids:
+        duplicate |= ids.isin(existing_ids)
+    return duplicate.astype(bool)
+
+
+def _finish(mask: pd.DataFrame, checks: list) -> pd.DataFrame:
+    error = pd.Series('', index=mask.index, dtype=object)
+    for column, message in reversed(checks):
+        error = error.mask(mask[column], message)
+    mask['error'] = error
+    mask['valid'] = error == ''
+    return mask
+
+
+def validate_students_frame(frame: pd.DataFrame, existing_ids=None) -> pd.DataFrame:
+    """Validate every student row at once.
+
+    Returns a mask frame aligned with ``frame``: one boolean column per
+    check (True = failed), plus ``error`` (first failure, '' if none) and
+    ``valid``. ``existing_ids`` is a set of IDs that are already taken.
+    """
+    required = [c for c in ['ID', 'Name', 'Department', 'Year'] if c in frame.columns]
+    year_text = _text(frame, 'Year')
+    year = pd.to_numeric(year_text.where(_matches(year_text, YEAR_PATTERN)), errors='coerce')
+    mask = pd.DataFrame({
+        'missing_fields': pd.concat([_text(frame, c) == '' for c in required], axis=1).any(axis=1).astype(bool),
+        'invalid_email': ~_matches(_text(frame, 'Email'), EMAIL_PATTERN),
+        'invalid_phone': ~_matches(_text(frame, 'Phone'), PHONE_PATTERN),
+        'invalid_year': ~year.isin(VALID_YEARS),
+        'duplicate_id': _duplicate_ids(frame, existing_ids)
+    }, index=frame.index)
+    return _finish(mask, STUDENT_CHECKS)
+
+
+def validate_teachers_frame(frame: pd.DataFrame, existing_ids=None) -> pd.DataFrame:
+    """Validate every teacher row at once; see ``validate_students_frame`` for the result layout."""
+    required = [c for c in ['ID', 'Name', 'Department', 'Subjects'] if c in frame.columns]
+    mask = pd.DataFrame({
+        'missing_fields': pd.concat([_text(frame, c) == '' for c in required], axis=1).any(axis=1).astype(bool),
+        'invalid_email': ~_matches(_text(frame, 'Email'), EMAIL_PATTERN),
+        'invalid_phone': ~_matches(_text(frame, 'Phone'), PHONE_PATTERN),
+        'duplicate_id': _duplicate_ids(frame, existing_ids)
+    }, index=frame.index)
+    return _finish(mask, TEACHER_CHECKS)
+
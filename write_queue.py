@@ -0,0 +1,246 @@
+"""Write-behind queue for student and teacher form submissions.
+
+A submit appends the row to a durable local journal (a SQLite file in WAL
+mode) and returns; a background thread drains the journal into the
+``students``/``teachers`` tables in batched transactions. Rows survive a
+crash or restart between submit and flush: whatever is left in the
+journal is flushed when the next worker starts. Accepted rows are handed
+to the shared roster cache straight away, so duplicate-ID checks and the
+roster see them before they reach the database.
+
+A batch rejected by the database (constraint or data errors) is retried
+row by row; rows that still fail are moved to the journal's ``failed``
+table with the error, and the roster is reloaded from the database. If the
+database is unreachable the rows simply stay journaled and are retried.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from sqlalchemy import insert, exc
+
+from database import session_scope, Student, Teacher
+from roster_cache import student_roster, teacher_roster
+from stats import record_bulk_insert
+
+WRITE_QUEUE_PATH = os.environ.get("WRITE_QUEUE_PATH", "write_queue.db")
+WRITE_BATCH_SIZE = int(os.environ.get("WRITE_BATCH_SIZE", "500"))
+# Longest a submitted row waits for more rows to share its transaction
+WRITE_FLUSH_INTERVAL = float(os.environ.get("WRITE_FLUSH_INTERVAL", "0.2"))
+# Claims older than this belong to a worker that died mid-flush and are released
+CLAIM_TIMEOUT = 60.0
+# Pause before retrying after the database could not be reached
+RETRY_DELAY = 5.0
+
+# Errors that reject individual rows rather than the whole connection
+ROW_ERRORS = (exc.IntegrityError, exc.DataError)
+
+TARGETS = {
+    'students': (Student, student_roster),
+    'teachers': (Teacher, teacher_roster)
+}
+
+
+class WriteBehindQueue:
+    """Durable journal of pending inserts plus the worker thread that flushes it."""
+
+    def __init__(self, path: str = WRITE_QUEUE_PATH, batch_size: int = WRITE_BATCH_SIZE,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._token = uuid.uuid4().hex
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._worker = None
+        self.enqueued = 0
+        self.flushed = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_ms = 0.0
+        with self._lock:
+            # In WAL mode synchronous=NORMAL keeps appends across an app crash without an fsync per row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queue ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, target TEXT NOT NULL, payload TEXT NOT NULL, "
+                "enqueued_at REAL NOT NULL, claimed_by TEXT, claimed_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS failed ("
+                "seq INTEGER PRIMARY KEY, target TEXT NOT NULL, payload TEXT NOT NULL, "
+                "error TEXT NOT NULL, failed_at REAL NOT NULL)"
+            )
+
+    def enqueue(self, target: str, record: dict):
+        """Journal one row for ``target`` ('students' or 'teachers') and return without touching the database."""
+        roster = TARGETS[target][1]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO queue (target, payload, enqueued_at) VALUES (?, ?, ?)",
+                (target, json.dumps(record), time.time())
+            )
+            self.enqueued += 1
+        roster.append([record])
+        self._ensure_worker()
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    def _claim(self) -> list:
+        """Rows this worker already holds (after a failed flush), else a new batch of the oldest unclaimed rows."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                held = "SELECT seq, target, payload FROM queue WHERE claimed_by = ? ORDER BY seq"
+                rows = self._conn.execute(held, (self._token,)).fetchall()
+                if not rows:
+                    self._conn.execute(
+                        "UPDATE queue SET claimed_by = NULL WHERE claimed_by IS NOT NULL AND claimed_at < ?",
+                        (now - CLAIM_TIMEOUT,)
+                    )
+                    self._conn.execute(
+                        "UPDATE queue SET claimed_by = ?, claimed_at = ? WHERE seq IN ("
+                        "SELECT seq FROM queue WHERE claimed_by IS NULL ORDER BY seq LIMIT ?)",
+                        (self._token, now, self.batch_size)
+                    )
+                    rows = self._conn.execute(held, (self._token,)).fetchall()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(seq, target, json.loads(payload)) for seq, target, payload in rows]
+
+    def _insert(self, target: str, records: list):
+        model = TARGETS[target][0]
+        with session_scope() as db:
+            connection = db.connection()
+            connection.execute(insert(model), records)
+            record_bulk_insert(connection, model, records)
+            db.commit()
+
+    def _flush_batch(self, rows: list):
+        started = time.perf_counter()
+        done, failures = [], []
+        try:
+            for target in TARGETS:
+                group = [(seq, record) for seq, t, record in rows if t == target]
+                if not group:
+                    continue
+                try:
+                    self._insert(target, [record for _, record in group])
+                    done.extend(seq for seq, _ in group)
+                except ROW_ERRORS:
+                    # Find the offending rows so the rest of the batch still lands
+                    for seq, record in group:
+                        try:
+                            self._insert(target, [record])
+                            done.append(seq)
+                        except ROW_ERRORS as e:
+                            failures.append((seq, target, record, str(e.orig)))
+        finally:
+            # Record what landed even if the database went away part-way through
+            self._finish_batch(done, failures, started)
+
+    def _finish_batch(self, done: list, failures: list, started: float):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM queue WHERE seq = ?", [(seq,) for seq in done])
+            for seq, target, record, error in failures:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO failed (seq, target, payload, error, failed_at) VALUES (?, ?, ?, ?, ?)",
+                    (seq, target, json.dumps(record), error, time.time())
+                )
+                self._conn.execute("DELETE FROM queue WHERE seq = ?", (seq,))
+            self._conn.execute("COMMIT")
+            self.flushed += len(done)
+            self.failed += len(failures)
+            self.batches += 1
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+        for target in {target for _, target, _, _ in failures}:
+            # The roster already counts rows that never made it; drop them and reload it from the database
+            roster = TARGETS[target][1]
+            roster.discard([record for _, t, record, _ in failures if t == target])
+            roster.invalidate(full=True)
+
+    def _run(self):
+        while True:
+            rows = self._claim()
+            if rows:
+                try:
+                    self._flush_batch(rows)
+                except Exception as e:
+                    # Database unreachable: the rows stay journaled and claimed by this worker until it succeeds
+                    print(f"Write-behind flush failed, retrying: {e}")
+                    time.sleep(RETRY_DELAY)
+                    continue
+                if len(rows) == self.batch_size:
+                    continue
+            with self._wakeup:
+                self._wakeup.wait(self.flush_interval)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._worker_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._worker.start()
+
+    def start(self):
+        """Start the worker, flushing anything journaled before a restart."""
+        self._ensure_worker()
+
+    def wait_until_flushed(self, timeout: float = 30.0) -> bool:
+        """Block until the journal is empty (or ``timeout`` passes); returns True if it is."""
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            if time.monotonic() >= deadline:
+                return False
+            self._ensure_worker()
+            with self._wakeup:
+                self._wakeup.notify()
+            time.sleep(0.01)
+        return True
+
+    def failed_rows(self, limit: int = 100) -> list:
+        """Most recent rows that could not be inserted, as (target, record, error, failed_at)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT target, payload, error, failed_at FROM failed ORDER BY seq DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [(target, json.loads(payload), error, failed_at) for target, payload, error, failed_at in rows]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'pending': self._conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0],
+                'enqueued': self.enqueued,
+                'flushed': self.flushed,
+                'failed': self.failed,
+                'batches': self.batches,
+                'last_batch_ms': round(self.last_batch_ms, 2)
+            }
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """The process-wide queue; its worker starts with it and picks up rows left by a previous run."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteBehindQueue()
+                _queue.start()
+    return _queue